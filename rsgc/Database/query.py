@@ -325,6 +325,24 @@ class Connector(object):
         else:
             return None
 
+    def get_all_reaction_compounds(self):
+        '''
+        Streams (reaction ID, compound ID, is product) for every reactant
+        and product in the database in one pass over reaction_compound
+        '''
+        query = "select reaction_ID, cpd_ID, is_prod from reaction_compound where is_prod in (0, 1)"
+        conn, cnx = self.connect_to_database()
+        Q, cnx = test_db_4_error(conn, cnx, query, self.database, 0)
+        if Q == 'Errored' or Q is None:
+            return
+        while True:
+            hits = Q.fetchmany(10000)
+            if not hits:
+                break
+            for hit in hits:
+                yield hit
+        conn.close()
+
     def get_products(self, reaction_ID):
         '''Retrieves products (compound IDs) of a given reaction'''
         if reaction_ID.strip() == "":
@@ -356,6 +374,17 @@ class Connector(object):
         else:
             return None
 
+    def get_all_model_compounds(self):
+        '''Retrieves compounds (compound IDs) that are in at least one metabolic model'''
+        query = "select distinct cpd_ID from model_compound"
+        conn, cnx = self.connect_to_database()
+        Q, cnx = test_db_4_error(conn, cnx, query, self.database, 0)
+        hits = fetching_all_query_results(Q, conn, cnx, self.database, query, 0)
+        if hits != 'Errored' and hits is not None:
+            return [i[0] for i in hits]
+        else:
+            return None
+
     def get_all_compounds(self):
         '''Retrieves all compounds in the database'''
         query = "select ID from compound"
@@ -433,6 +462,18 @@ class Connector(object):
         else:
             return str(None)
 
+    def is_reversible_all_reactions(self):
+        '''Retrieves reversibility information of every reaction independent of model'''
+        query = "select reaction_ID, is_reversible from reaction_reversibility"
+        conn, cnx = self.connect_to_database()
+        Q, cnx = test_db_4_error(conn, cnx, query, self.database, 0)
+        hits = fetching_all_query_results(Q, conn, cnx, self.database, query, 0)
+        reversibility = {}
+        if hits != 'Errored' and hits is not None:
+            for reaction_ID, is_reversible in hits:
+                reversibility.setdefault(reaction_ID, str(is_reversible))
+        return reversibility
+
     def get_genes(self, reaction_ID, organism_ID):
         '''Retrieves gene associations for a reaction
              of a given metabolic network (model ID)'''
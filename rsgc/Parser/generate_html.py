@@ -178,7 +178,7 @@ class HtmlOutput(object):
                             self.opt_path[larray[0]][orgid]["sol"][temparray[1]]["rxn"][rxnid]["prod"].append(prod[2])
                         else:
                             self.opt_path[larray[0]][orgid]["sol"][temparray[1]]["rxn"][rxnid]["prod"].append(prod[1])
-                elif line.startswith("No paths"):
+                elif line.startswith("No paths") or line.startswith("TIMEOUT"):
                     pass
                 elif line != "":
                     rxncounter+=1
@@ -8,6 +8,8 @@ import os
 import csv
 import openpyxl
 import shutil
+from rsgc.Parser import output_writer as ow
+from rsgc.Parser import run_journal as rj
 csv.field_size_limit(sys.maxsize)
 
 def verbose_print(verbose, line):
@@ -16,8 +18,12 @@ def verbose_print(verbose, line):
 
 class Output(object):
     """Opens and fills output files produced by software"""
-    def __init__(self, db, output_path, media, verbose, FBA=False, KO=False, timer_output=False, raw_solutions=True, GC=False):
-        '''Initialize class: generates new output files for this analysis of rs'''
+    def __init__(self, db, output_path, media, verbose, FBA=False, KO=False, timer_output=False, raw_solutions=True, GC=False,
+                 resume=False):
+        '''
+        Initialize class: generates new output files for this analysis of rs
+        (when a run is resumed output files are kept and appended to)
+        '''
         self.DB = db
         self.verbose = verbose
         self.FBA = FBA
@@ -25,41 +31,77 @@ class Output(object):
         self.media = media
         self.timer_output = timer_output
         self.output_path = output_path
-        self.optimal_paths = open(os.path.join(output_path, 'optimal_pathways.txt'), 'w')
+        mode = 'a' if resume else 'w'
+        self.optimal_paths = open(os.path.join(output_path, 'optimal_pathways.txt'), mode)
         self.optimal_paths.close()
         if self.FBA:
-            self.flux_ouptput = open(os.path.join(output_path, 'flux_output.txt'), 'w')
-            self.flux_individual_output = open(os.path.join(output_path, 'flux_individualfluxes_output.txt'), 'w')
-            self.theoyield = open(os.path.join(output_path, 'theoretical_yield.txt'), 'w')
+            self.flux_ouptput = open(os.path.join(output_path, 'flux_output.txt'), mode)
+            self.flux_individual_output = open(os.path.join(output_path, 'flux_individualfluxes_output.txt'), mode)
+            self.theoyield = open(os.path.join(output_path, 'theoretical_yield.txt'), mode)
 
             self.flux_ouptput.close()
             self.flux_individual_output.close()
             self.theoyield.close()
 
         if self.KO:
-            self.essentialrxns = open(os.path.join(output_path,'essentialrxns_output.txt'), 'w')
-            self.fluxKO_ouptput = open(os.path.join(output_path, 'fluxKO_output.txt'), 'w')
-            self.fluxKO_ty_output = open(os.path.join(output_path, 'fluxKO_theoreticalyields_output.txt'), 'w')
-            self.fluxKO_in_ty_output = open(os.path.join(output_path, 'fluxKO_increased_theoreticalyields_output.txt'), 'w')
+            self.essentialrxns = open(os.path.join(output_path,'essentialrxns_output.txt'), mode)
+            self.fluxKO_ouptput = open(os.path.join(output_path, 'fluxKO_output.txt'), mode)
+            self.fluxKO_ty_output = open(os.path.join(output_path, 'fluxKO_theoreticalyields_output.txt'), mode)
+            self.fluxKO_in_ty_output = open(os.path.join(output_path, 'fluxKO_increased_theoreticalyields_output.txt'), mode)
             self.fluxKO_in_ty_output.close()
             self.essentialrxns.close()
             self.fluxKO_ty_output.close()
             self.fluxKO_ouptput.close()
 
         if self.timer_output:
-            self.timer_output_file = open(os.path.join(output_path, 'timer_output.txt'), 'w')
-            self.timer_output_file.write('#Functions\tseconds\tminutes\n')
+            self.timer_output_file = open(os.path.join(output_path, 'timer_output.txt'), mode)
+            if self.timer_output_file.tell() == 0:
+                self.timer_output_file.write('#Functions\tseconds\tminutes\n')
             self.timer_output_file.close()
 
         if raw_solutions:
             try:
                 os.mkdir(os.path.join(output_path, 'raw_compound_solutions'))
             except OSError:
-                shutil.rmtree(os.path.join(output_path, 'raw_compound_solutions'))
-                os.mkdir(os.path.join(output_path, 'raw_compound_solutions'))
+                if not resume:
+                    shutil.rmtree(os.path.join(output_path, 'raw_compound_solutions'))
+                    os.mkdir(os.path.join(output_path, 'raw_compound_solutions'))
 
         self.GC = GC
-            
+        self.writer = None
+
+    def start_writer(self, flush_interval=ow.FLUSH_INTERVAL, journal=False):
+        '''
+        Records of all processes are written to output files by one writer
+        process until stop_writer is called (otherwise files are appended to directly),
+        with journal completed targets are recorded in the journal of the run
+        '''
+        self.writer = ow.OutputWriter(flush_interval=flush_interval,
+                                      journal=os.path.join(self.output_path, rj.JOURNAL_FILE) if journal else None)
+        self.writer.start()
+
+    def stop_writer(self):
+        '''Write remaining records to output files and stop writer process'''
+        if self.writer:
+            self.writer.stop()
+            self.writer = None
+
+    def _write(self, file_name, text, header=None):
+        '''Append record to output file (header is written first if the file is empty)'''
+        filename = os.path.join(self.output_path, file_name)
+        if self.writer:
+            self.writer.write(filename, text, header)
+        else:
+            with open(filename, 'a') as fout:
+                if header and os.path.getsize(filename) == 0:
+                    text = header+text
+                fout.write(text)
+
+    def output_target_done(self, target_info):
+        '''Record that all output of target is sent to the writer process (used to resume the run)'''
+        if self.writer:
+            self.writer.write_journal(rj.done_line(target_info))
+
     def generate_gc_directory(self):
         self.GC_output_path = os.path.join(self.output_path, 'gene_compatibility')
         try:
@@ -70,8 +112,7 @@ class Output(object):
             pass
 
     def output_timer(self, print_statement):
-        with open(os.path.join(self.output_path,'timer_output.txt'), 'a') as fout:
-            fout.write(print_statement)
+        self._write('timer_output.txt', print_statement)
 
     def output_final_targets(self, targets, tan_threshold):
         with open(os.path.join(self.output_path, 'finallist_targets_{}_threshold.txt'.format(tan_threshold)), 'w') as fout:
@@ -137,88 +178,124 @@ class Output(object):
         organism to get a target compound, this file is only generated all organisms
         are being examined to see if they can produce target compound
         '''
-        with open(self.output_path+'/'+'path_length_all_organism_'+target_compound_ID+'.txt', 'a') as self.all_organisms:
-            self.all_organisms.write('{} reaction steps need to be added to get {} in organism {} ({})\n'.format(pathlength,
-                                                                                                                 target_compound_ID,
-                                                                                                                 ','.join(orgs),
-                                                                                                                 ','.join(org_names)))
+        self._write('path_length_all_organism_'+target_compound_ID+'.txt',
+                    '{} reaction steps need to be added to get {} in organism {} ({})\n'.format(pathlength,
+                                                                                               target_compound_ID,
+                                                                                               ','.join(orgs),
+                                                                                               ','.join(org_names)))
     def output_compound_natively_present_in_target_organism(self, target_info):
         '''
         Outputs information if a target compound is already present in an organism
         '''
-        with open(self.output_path+'/optimal_pathways.txt', 'a') as self.optimal_paths:
-            verbose_print(self.verbose, 'STATUS:\t{} in species {} already'.format(target_info[0], target_info[2]))
-            self.optimal_paths.write('{} in species {} already\n'.format(target_info[0], target_info[2]))
+        verbose_print(self.verbose, 'STATUS:\t{} in species {} already'.format(target_info[0], target_info[2]))
+        self._write('optimal_pathways.txt', '{} in species {} already\n'.format(target_info[0], target_info[2]))
 
-    def output_shortest_paths(self, target_info, temp_rxns):
+    def output_shortest_paths(self, target_info, temp_rxns, reason=None):
         #self.optimal_paths = optimal_paths
         # self.optimal_paths = open(self.output_path+'/optimal_pathways.txt', 'a')
         '''
         Outputs reactions and compounds that need to be
+        added to an organism to get target compound (reason code
+        is added to the line of targets without paths)
+        '''
+        t = target_info[0]
+        target_org = target_info[2]
+        if len(temp_rxns) == 0:
+            line = 'No paths could be found to get to target compound {} {} in target organism {}'.format(t,
+                                                                                                         self.DB.get_compound_name(t),
+                                                                                                         self.DB.get_organism_name(target_org))
+            if reason:
+                line += '\t'+reason
+            verbose_print(self.verbose, '\nSTATUS:\t'+line)
+            self._write('optimal_pathways.txt', line+'\n')
+        else:
+            lines = [self.shortest_paths_header(target_info)]
+            for count, os_dict in list(temp_rxns.items()):
+                lines.append(self.shortest_path_solution(count, os_dict))
+            self._write('optimal_pathways.txt', ''.join(lines))
+
+    def output_target_timeout(self, target_info, number_pathways):
+        '''
+        Outputs TIMEOUT line after the pathways of a target that reached
+        its time limit (pathways identified before the limit are listed)
+        '''
+        line = 'TIMEOUT for target compound {} {} in target organism {}, {} pathways identified before the time limit'.format(target_info[0],
+                                                                                                                          self.DB.get_compound_name(target_info[0]),
+                                                                                                                          self.DB.get_organism_name(target_info[2]),
+                                                                                                                          number_pathways)
+        verbose_print(self.verbose, 'STATUS:\t'+line)
+        self._write('optimal_pathways.txt', line+'\n')
+
+    def output_shortest_paths_header(self, target_info):
+        '''
+        Outputs header for the pathways of a target compound (pathways
+        are added with output_shortest_path_solution as they are identified)
+        '''
+        self._write('optimal_pathways.txt', self.shortest_paths_header(target_info))
+
+    def output_shortest_path_solution(self, count, os_dict):
+        '''
+        Outputs reactions and compounds of one pathway that need to be
         added to an organism to get target compound
         '''
+        self._write('optimal_pathways.txt', self.shortest_path_solution(count, os_dict))
+
+    def shortest_paths_header(self, target_info):
+        '''Header for the pathways of a target compound'''
         t = target_info[0]
         target_org = target_info[2]
-        with open(self.output_path+'/optimal_pathways.txt', 'a') as self.optimal_paths:
-            if len(temp_rxns) == 0:
-                verbose_print(self.verbose, '\nSTATUS:\tNo paths could be found to get to target compound {} {} in target organism {}'.format(t,
-                                                                                                              self.DB.get_compound_name(t),
-                                                                                                              self.DB.get_organism_name(target_org)))
-
-                self.optimal_paths.write('No paths could be found to get to target compound {} {} in target organism {}\n'.format(t,
-                                                                                                                                  self.DB.get_compound_name(t),
-                                                                                                                                  self.DB.get_organism_name(target_org)))
+        verbose_print(self.verbose, '\nSTATUS:\tSHORTEST PATH FOR {} {} in target organism {}'.format(t, re.sub(" ", "-", self.DB.get_compound_name(t)),
+                                                                        self.DB.get_organism_name(target_org)))
+        return '\nSHORTEST PATH FOR {} {} in target organism {}\n'.format(t, re.sub(" ", "-", self.DB.get_compound_name(t)),
+                                                                        self.DB.get_organism_name(target_org))
+
+    def shortest_path_solution(self, count, os_dict):
+        '''Reactions and compounds of one pathway'''
+        verbose_print(self.verbose, '\nSTATUS:\tSolution {}'.format(count))
+        lines = ['Solution {}\n'.format(count)]
+        for r in os_dict:
+            if r.endswith('_s'):
+                verbose_print(self.verbose, 'STATUS:\t\t'.join([r, os_dict[r]['name'], os_dict[r]['direction']]))
+                lines.append('\t'.join([r, os_dict[r]['name'],
+                                        os_dict[r]['direction'],
+                                        ','.join(self.DB.get_solvents(r))+':solvents',
+                                        ','.join(self.DB.get_catalysts(r))+':catalysts',
+                                        ','.join(self.DB.get_time(r))+':time',
+                                        ','.join(self.DB.get_temperature(r))+':temperature',
+                                        ','.join(self.DB.get_pressure(r))+':pressure',
+                                        ','.join(self.DB.get_yield(r))+':yield',
+                                        ','.join(self.DB.get_reference(r))+':reference'])+ '\n')
             else:
-                verbose_print(self.verbose, '\nSTATUS:\tSHORTEST PATH FOR {} {} in target organism {}'.format(t, re.sub(" ", "-", self.DB.get_compound_name(t)),
-                                                                                self.DB.get_organism_name(target_org)))
-                self.optimal_paths.write('\nSHORTEST PATH FOR {} {} in target organism {}\n'.format(t, re.sub(" ", "-", self.DB.get_compound_name(t)),
-                                                                                                    self.DB.get_organism_name(target_org)))
-                for count, os_dict in list(temp_rxns.items()):
-                    verbose_print(self.verbose, '\nSTATUS:\tSolution {}'.format(count))
-                    self.optimal_paths.write('Solution {}\n'.format(count))
-                    for r in os_dict:
-                        if r.endswith('_s'):
-                            verbose_print(self.verbose, 'STATUS:\t\t'.join([r, os_dict[r]['name'], os_dict[r]['direction']]))
-                            self.optimal_paths.write('\t'.join([r, os_dict[r]['name'],
-                                                                os_dict[r]['direction'],
-                                                                ','.join(self.DB.get_solvents(r))+':solvents',
-                                                                ','.join(self.DB.get_catalysts(r))+':catalysts',
-                                                                ','.join(self.DB.get_time(r))+':time',
-                                                                ','.join(self.DB.get_temperature(r))+':temperature',
-                                                                ','.join(self.DB.get_pressure(r))+':pressure',
-                                                                ','.join(self.DB.get_yield(r))+':yield',
-                                                                ','.join(self.DB.get_reference(r))+':reference'])+ '\n')
-                        else:
-                            proteins = self.DB.get_proteins(r, os_dict[r]['organisms'][0])
-                            proteins = re.sub('\(', '', proteins)
-                            proteins = re.sub('\)', '', proteins)
-                            proteinslist = proteins.split(' ')
-                            finalproteinlist = []
-                            for protein in proteinslist:
-                                finalproteinlist.append(protein)
-                            finalprotein = ' '.join(finalproteinlist)
-
-                            genes = self.DB.get_genes(r, os_dict[r]['organisms'][0])
-                            genes = re.sub('\(', '', genes)
-                            genes = re.sub('\)', '', genes)
-                            geneslist = genes.split(' ')
-                            finalgenelist = []
-                            for gene in geneslist:
-                                finalgenelist.append(gene)
-                            finalgene = ' '.join(finalgenelist)
-                            verbose_print(self.verbose, 'STATUS:\t\t'.join([r, os_dict[r]['name'], os_dict[r]['direction'], finalprotein, finalgene]))
-                            self.optimal_paths.write('\t'.join([r, os_dict[r]['name'],
-                                                                os_dict[r]['direction'], finalprotein, finalgene,
-                                                                str(len(os_dict[r]['organisms']))+
-                                                                ' number of species that contain this reaction',
-                                                                ','.join(os_dict[r]['organisms'])])+'\n')
-                        for react in os_dict[r]['reactants']:
-                            verbose_print(self.verbose, 'STATUS:\t\t{}\t{} reactants'.format(react, os_dict[r]['reactants'][react]))
-                            self.optimal_paths.write('\t{}\t{} reactants\n'.format(react,
-                                                                                    os_dict[r]['reactants'][react]))
-                        for prod in os_dict[r]['products']:
-                            verbose_print(self.verbose, 'STATUS:\t\t{}\t{} products'.format(prod, os_dict[r]['products'][prod]))
-                            self.optimal_paths.write('\t{}\t{} products\n'.format(prod, os_dict[r]['products'][prod]))
+                proteins = self.DB.get_proteins(r, os_dict[r]['organisms'][0])
+                proteins = re.sub('\(', '', proteins)
+                proteins = re.sub('\)', '', proteins)
+                proteinslist = proteins.split(' ')
+                finalproteinlist = []
+                for protein in proteinslist:
+                    finalproteinlist.append(protein)
+                finalprotein = ' '.join(finalproteinlist)
+
+                genes = self.DB.get_genes(r, os_dict[r]['organisms'][0])
+                genes = re.sub('\(', '', genes)
+                genes = re.sub('\)', '', genes)
+                geneslist = genes.split(' ')
+                finalgenelist = []
+                for gene in geneslist:
+                    finalgenelist.append(gene)
+                finalgene = ' '.join(finalgenelist)
+                verbose_print(self.verbose, 'STATUS:\t\t'.join([r, os_dict[r]['name'], os_dict[r]['direction'], finalprotein, finalgene]))
+                lines.append('\t'.join([r, os_dict[r]['name'],
+                                        os_dict[r]['direction'], finalprotein, finalgene,
+                                        str(len(os_dict[r]['organisms']))+
+                                        ' number of species that contain this reaction',
+                                        ','.join(os_dict[r]['organisms'])])+'\n')
+            for react in os_dict[r]['reactants']:
+                verbose_print(self.verbose, 'STATUS:\t\t{}\t{} reactants'.format(react, os_dict[r]['reactants'][react]))
+                lines.append('\t{}\t{} reactants\n'.format(react, os_dict[r]['reactants'][react]))
+            for prod in os_dict[r]['products']:
+                verbose_print(self.verbose, 'STATUS:\t\t{}\t{} products'.format(prod, os_dict[r]['products'][prod]))
+                lines.append('\t{}\t{} products\n'.format(prod, os_dict[r]['products'][prod]))
+        return ''.join(lines)
 
     def output_FBA(self, target_info, org_fbasolution, optimized_fba, comparisonresults, temp):
         '''
@@ -230,49 +307,51 @@ class Output(object):
             target = target_info[1]
         else:
             target = target_info[0]
-        with open(self.output_path+'/flux_individualfluxes_output.txt', 'a') as self.flux_individual_output:
-            verbose_print(self.verbose, 'STATUS:\tFBA Solutions for {}'.format(target))
-            verbose_print(self.verbose, 'STATUS:\t{}\t{} objective function solutions for wild-type and mutant'.format(round(org_fbasolution.objective_value, 2),
-                                                                                         round(optimized_fba.fbasol.objective_value, 2)))
-            verbose_print(self.verbose, 'STATUS:\tIndividual fluxes in the objective function (sink reactions are the target)')
-            for reaction in optimized_fba.objective_dict:
-                verbose_print(self.verbose,'STATUS:\t\t{} {}'.format(round(optimized_fba.fbasol.fluxes[reaction.id]), reaction.id))
-
-            self.flux_individual_output.write('FBA Solutions for {}'.format(target)+'\n')
-            self.flux_individual_output.write('{}\t{} objective function solutions for wild-type and mutant\n'.format(round(org_fbasolution.objective_value, 2),
-                                                                                                                      round(optimized_fba.fbasol.objective_value, 2)))
-            self.flux_individual_output.write('Individual fluxes in the objective function (sink reactions are the target)\n')
-            for reaction in optimized_fba.objective_dict:
-                self.flux_individual_output.write('\t{} {}\n'.format(round(optimized_fba.fbasol.fluxes[reaction.id]), reaction.id))
-
-            for x, value in list(optimized_fba.fbasol.fluxes.items()):
-                self.flux_individual_output.write('{}\t{}\n'.format(x, value))
-
-        with open(self.output_path+'/flux_output.txt', 'a') as self.flux_ouptput:
-            self.flux_ouptput.write('FBA Solutions for {}\n'.format(target))
-            self.flux_ouptput.write('{}\t{} objective function solutions for wild-type and mutant\n'.format(round(org_fbasolution.objective_value, 2),
-                                                                                                            round(optimized_fba.fbasol.objective_value, 2)))
-            self.flux_ouptput.write('\nFluxes that differ by 1.5 fold for reactions between wildtype and mutant:\n')
-            self.flux_ouptput.write('\t\t\twildtype flux\tmutantflux\n')
-            for x, fluxvalue in list(comparisonresults.fluxchange.items()):
-                self.flux_ouptput.write('\t{}\t{}\n'.format(x, fluxvalue))
-            self.flux_ouptput.write('\nFluxes for added reactions in mutant:'+'\n')
-            for r, value in list(comparisonresults.externalrxnfluxes.items()):
-                self.flux_ouptput.write('\t{}\t{}\n'.format(r, value))
-            if comparisonresults.maxpath == 'No added path':
-                verbose_print(self.verbose, 'STATUS:\t{} - compound could be produced in target organism'.format(comparisonresults.maxpath))
-                verbose_print(self.verbose, 'STATUS:\t\t {} production of target compound'.format(comparisonresults.maxflux))
-                self.flux_ouptput.write('\t {} - compound could be produced in target organism\n'.format(comparisonresults.maxpath))
-                self.flux_ouptput.write('\t {} production of target compound\n'.format(comparisonresults.maxflux))
-            else:
-                self.flux_ouptput.write('\nExternal pathway with most flux:\n')
-                self.flux_ouptput.write('\tPath {}\t{}\n\tTotal flux through path: {}\n'.format(comparisonresults.maxpath,
-                                                                                                list(temp[comparisonresults.maxpath].keys()),
-                                                                                                comparisonresults.maxflux))
-                verbose_print(self.verbose, 'STATUS:\tExternal pathway with most flux:')
-                verbose_print(self.verbose,'STATUS:\t\tPath {}\t{}\n\tTotal flux through path: {}'.format(comparisonresults.maxpath,
-                                                                             list(temp[comparisonresults.maxpath].keys()),
-                                                                             comparisonresults.maxflux))
+        lines = []
+        verbose_print(self.verbose, 'STATUS:\tFBA Solutions for {}'.format(target))
+        verbose_print(self.verbose, 'STATUS:\t{}\t{} objective function solutions for wild-type and mutant'.format(round(org_fbasolution.objective_value, 2),
+                                                                                     round(optimized_fba.fbasol.objective_value, 2)))
+        verbose_print(self.verbose, 'STATUS:\tIndividual fluxes in the objective function (sink reactions are the target)')
+        for reaction in optimized_fba.objective_dict:
+            verbose_print(self.verbose,'STATUS:\t\t{} {}'.format(round(optimized_fba.fbasol.fluxes[reaction.id]), reaction.id))
+
+        lines.append('FBA Solutions for {}'.format(target)+'\n')
+        lines.append('{}\t{} objective function solutions for wild-type and mutant\n'.format(round(org_fbasolution.objective_value, 2),
+                                                                                             round(optimized_fba.fbasol.objective_value, 2)))
+        lines.append('Individual fluxes in the objective function (sink reactions are the target)\n')
+        for reaction in optimized_fba.objective_dict:
+            lines.append('\t{} {}\n'.format(round(optimized_fba.fbasol.fluxes[reaction.id]), reaction.id))
+
+        for x, value in list(optimized_fba.fbasol.fluxes.items()):
+            lines.append('{}\t{}\n'.format(x, value))
+        self._write('flux_individualfluxes_output.txt', ''.join(lines))
+
+        lines = []
+        lines.append('FBA Solutions for {}\n'.format(target))
+        lines.append('{}\t{} objective function solutions for wild-type and mutant\n'.format(round(org_fbasolution.objective_value, 2),
+                                                                                             round(optimized_fba.fbasol.objective_value, 2)))
+        lines.append('\nFluxes that differ by 1.5 fold for reactions between wildtype and mutant:\n')
+        lines.append('\t\t\twildtype flux\tmutantflux\n')
+        for x, fluxvalue in list(comparisonresults.fluxchange.items()):
+            lines.append('\t{}\t{}\n'.format(x, fluxvalue))
+        lines.append('\nFluxes for added reactions in mutant:'+'\n')
+        for r, value in list(comparisonresults.externalrxnfluxes.items()):
+            lines.append('\t{}\t{}\n'.format(r, value))
+        if comparisonresults.maxpath == 'No added path':
+            verbose_print(self.verbose, 'STATUS:\t{} - compound could be produced in target organism'.format(comparisonresults.maxpath))
+            verbose_print(self.verbose, 'STATUS:\t\t {} production of target compound'.format(comparisonresults.maxflux))
+            lines.append('\t {} - compound could be produced in target organism\n'.format(comparisonresults.maxpath))
+            lines.append('\t {} production of target compound\n'.format(comparisonresults.maxflux))
+        else:
+            lines.append('\nExternal pathway with most flux:\n')
+            lines.append('\tPath {}\t{}\n\tTotal flux through path: {}\n'.format(comparisonresults.maxpath,
+                                                                                 list(temp[comparisonresults.maxpath].keys()),
+                                                                                 comparisonresults.maxflux))
+            verbose_print(self.verbose, 'STATUS:\tExternal pathway with most flux:')
+            verbose_print(self.verbose,'STATUS:\t\tPath {}\t{}\n\tTotal flux through path: {}'.format(comparisonresults.maxpath,
+                                                                         list(temp[comparisonresults.maxpath].keys()),
+                                                                         comparisonresults.maxflux))
+        self._write('flux_output.txt', ''.join(lines))
 
     def output_FBA_KOs(self, target_info, fbasolution, compound_dict, comparisonKOresults, temp):
         '''
@@ -283,21 +362,22 @@ class Output(object):
             target = target_info[1]
         else:
             target = target_info[0]
-        with open(self.output_path+'/fluxKO_output.txt', 'a') as self.fluxKO_ouptput:
-            self.fluxKO_ouptput.write('{} target compound\n'.format(target))
-            self.fluxKO_ouptput.write('Fluxes that differ by 1.5 fold for reactions between wildtype and mutant:\n')
-            for r, value in list(comparisonKOresults.fluxchange.items()):
-                self.fluxKO_ouptput.write('\t {} knockout\n'.format(r))
-                self.fluxKO_ouptput.write('\t\t\t\twildtype flux\tmutantflux\n')
-                for rk in value:
-                    self.fluxKO_ouptput.write('\t\t{}\t{}\n'.format(rk, value[rk]))
-                if comparisonKOresults.maxpath[r] == 'No added path':
-                    self.fluxKO_ouptput.write('\t\t{} - compound could be produced in target organism\n'.format(comparisonKOresults.maxpath[r]))
-                    self.fluxKO_ouptput.write('\t\t{} production of target compound\n'.format(comparisonKOresults.maxflux[r]))
-                else:
-                    self.fluxKO_ouptput.write('\t\tPath {}\t{}\n'.format(comparisonKOresults.maxpath[r],
-                                                                         list(temp[comparisonKOresults.maxpath[r]].keys())))
-                    self.fluxKO_ouptput.write('\t\t'+'Total flux through path: {}\n'.format(comparisonKOresults.maxflux[r]))
+        lines = []
+        lines.append('{} target compound\n'.format(target))
+        lines.append('Fluxes that differ by 1.5 fold for reactions between wildtype and mutant:\n')
+        for r, value in list(comparisonKOresults.fluxchange.items()):
+            lines.append('\t {} knockout\n'.format(r))
+            lines.append('\t\t\t\twildtype flux\tmutantflux\n')
+            for rk in value:
+                lines.append('\t\t{}\t{}\n'.format(rk, value[rk]))
+            if comparisonKOresults.maxpath[r] == 'No added path':
+                lines.append('\t\t{} - compound could be produced in target organism\n'.format(comparisonKOresults.maxpath[r]))
+                lines.append('\t\t{} production of target compound\n'.format(comparisonKOresults.maxflux[r]))
+            else:
+                lines.append('\t\tPath {}\t{}\n'.format(comparisonKOresults.maxpath[r],
+                                                        list(temp[comparisonKOresults.maxpath[r]].keys())))
+                lines.append('\t\t'+'Total flux through path: {}\n'.format(comparisonKOresults.maxflux[r]))
+        self._write('fluxKO_output.txt', ''.join(lines))
 
         objectivesol = fbasolution.fluxes['Sink_'+compound_dict[target]]
         glucose = True
@@ -323,51 +403,46 @@ class Output(object):
             except KeyError:
                 knockouts.append('NA')
 
-        with open(self.output_path+'/fluxKO_theoreticalyields_output.txt') as self.fluxKO_ty_output:
-            line = self.fluxKO_ty_output.readline()
+        self.ko_ty = '\t'.join(knockouts)
+        self._write('fluxKO_theoreticalyields_output.txt',
+                    target+'-'+self.DB.get_compound_name(target)+'\t'+target_info[2]+'-'+self.DB.get_organism_name(target_info[2])+'\t'+str(wt_ty)+'\t'+self.ko_ty+'\n',
+                    header='#Target ID\tOrganism ID\twild type theoretical yield\t'+'\t'.join(model_rxns)+'\n')
 
-        with open(self.output_path+'/fluxKO_theoreticalyields_output.txt', 'a') as self.fluxKO_ty_output:
-            if line.startswith('#'):
-                self.ko_ty = '\t'.join(knockouts)
-                self.fluxKO_ty_output.write(target+'-'+self.DB.get_compound_name(target)+'\t'+target_info[2]+'-'+self.DB.get_organism_name(target_info[2])+'\t'+str(wt_ty)+'\t'+self.ko_ty+'\n')
-            else:
-                self.fluxKO_ty_output.write('#Target ID\tOrganism ID\twild type theoretical yield\t'+'\t'.join(model_rxns)+'\n')
-                self.ko_ty = '\t'.join(knockouts)
-                self.fluxKO_ty_output.write(target+'-'+self.DB.get_compound_name(target)+'\t'+target_info[2]+'-'+self.DB.get_organism_name(target_info[2])+'\t'+str(wt_ty)+'\t'+self.ko_ty+'\n')                
-
-        with open(self.output_path+'/fluxKO_increased_theoreticalyields_output.txt', 'a') as self.fluxKO_in_ty_output:
-            if wt_ty != 'NA':
-                count = 0
-                for rko, value in list(comparisonKOresults.objective_function_ko.items()):
-                    if rko.startswith('EX'):
-                        pass
-                    else:
-                        if value > wt_ty:
-                            count+=1
-                            if count == 1:
-                                self.fluxKO_in_ty_output.write('Reaction knockouts that increase theoretical yield of {} of compound {} in organism {}\n'.format(wt_ty, 
-                                                                                                                                                             target+'-'+self.DB.get_compound_name(target),
-                                                                                                                                                             target_info[2]+'-'+self.DB.get_organism_name(target_info[2])))
-                                self.fluxKO_in_ty_output.write("reaction knockout ID\treaction knockout name\tcatalytic genes\tcatalytic proteins\treaction formula\tyield\n")
-                            self.fluxKO_in_ty_output.write("{}\t{}\t{}\t{}\t{}\t{}\n".format(rko, self.DB.get_reaction_name(rko),
-                                                                                             self.DB.get_genes(rko, target_info[2]),
-                                                                                             self.DB.get_proteins(rko, target_info[2]),
-                                                                                             ','.join(self.DB.get_reactants(rko))+'-->'+','.join(self.DB.get_products(rko)),
-                                                                                             value))
+        lines = []
+        if wt_ty != 'NA':
+            count = 0
+            for rko, value in list(comparisonKOresults.objective_function_ko.items()):
+                if rko.startswith('EX'):
+                    pass
+                else:
+                    if value > wt_ty:
+                        count+=1
+                        if count == 1:
+                            lines.append('Reaction knockouts that increase theoretical yield of {} of compound {} in organism {}\n'.format(wt_ty, 
+                                                                                                                                       target+'-'+self.DB.get_compound_name(target),
+                                                                                                                                       target_info[2]+'-'+self.DB.get_organism_name(target_info[2])))
+                            lines.append("reaction knockout ID\treaction knockout name\tcatalytic genes\tcatalytic proteins\treaction formula\tyield\n")
+                        lines.append("{}\t{}\t{}\t{}\t{}\t{}\n".format(rko, self.DB.get_reaction_name(rko),
+                                                                       self.DB.get_genes(rko, target_info[2]),
+                                                                       self.DB.get_proteins(rko, target_info[2]),
+                                                                       ','.join(self.DB.get_reactants(rko))+'-->'+','.join(self.DB.get_products(rko)),
+                                                                       value))
+        self._write('fluxKO_increased_theoreticalyields_output.txt', ''.join(lines))
  
     def output_essential_reactions(self, target_compound_ID, target_organism_ID, er):
         '''
         When reaction knockouts are performed, outputs all reactions that when removed
         cause decrease in target production
         '''
-        with open(self.output_path+'/essentialrxns_output.txt', 'a') as self.essentialrxns:
-            self.essentialrxns.write('Essential rxns for production of {} in {}\n'.format(target_compound_ID,
-                                                                                          target_organism_ID))
-            for rxn in er:
-                if rxn.startswith('EX'):
-                    pass
-                else:
-                    self.essentialrxns.write('{}\t{}\n'.format(rxn, self.DB.get_reaction_name(rxn)))
+        lines = []
+        lines.append('Essential rxns for production of {} in {}\n'.format(target_compound_ID,
+                                                                          target_organism_ID))
+        for rxn in er:
+            if rxn.startswith('EX'):
+                pass
+            else:
+                lines.append('{}\t{}\n'.format(rxn, self.DB.get_reaction_name(rxn)))
+        self._write('essentialrxns_output.txt', ''.join(lines))
 
     def output_theoretical_yield(self, target_compound_ID, target_organism_ID,
                                  fbasolution, compounds_dict):
@@ -439,20 +514,22 @@ class Output(object):
         else: 
             wt_ty = 'NA'
 
-        with open(self.output_path+'/theoretical_yield.txt', 'a') as self.theoyield:
-            if glucose and xylose:    
-                self.theoyield.write('{}---{}\t{}---{}\tGlucose Flux: {}\tXylose Flux: {}\tTarget Production: {}\tTheoretical Yield: {} mol {} /mol xylose+glucose\tBiomass Flux: {}\t Biomass Theoretical Yield {}/mol xylose+glucose\n'.format(target_compound_ID,
-                                                                                                                                                          self.DB.get_compound_name(target_compound_ID), target_organism_ID,
-                                                                                                                                                          self.DB.get_organism_name(target_organism_ID),
-                                                                                                                                                          glucoseimport, xyloseimport, round(objectivesol, 2),
-                                                                                                                                                          wt_ty, target_compound_ID, biomassrxn, bio_ty))
-            
-            else:
-                self.theoyield.write('{}---{}\t{}---{}\tGlucose Flux: {}\tTarget Production: {}\tTheoretical Yield: {} mol {} /mol glucose\tBiomass Flux: {}\t Biomass Theoretical Yield {}/mol glucose\n'.format(target_compound_ID,
-                                                                                                                                                          self.DB.get_compound_name(target_compound_ID), target_organism_ID,
-                                                                                                                                                          self.DB.get_organism_name(target_organism_ID),
-                                                                                                                                                          glucoseimport, round(objectivesol, 2),
-                                                                                                                                                          wt_ty, target_compound_ID, biomassrxn, bio_ty))
+        lines = []
+        if glucose and xylose:    
+            lines.append('{}---{}\t{}---{}\tGlucose Flux: {}\tXylose Flux: {}\tTarget Production: {}\tTheoretical Yield: {} mol {} /mol xylose+glucose\tBiomass Flux: {}\t Biomass Theoretical Yield {}/mol xylose+glucose\n'.format(target_compound_ID,
+                                                                                                                                              self.DB.get_compound_name(target_compound_ID), target_organism_ID,
+                                                                                                                                              self.DB.get_organism_name(target_organism_ID),
+                                                                                                                                              glucoseimport, xyloseimport, round(objectivesol, 2),
+                                                                                                                                              wt_ty, target_compound_ID, biomassrxn, bio_ty))
+
+        else:
+            lines.append('{}---{}\t{}---{}\tGlucose Flux: {}\tTarget Production: {}\tTheoretical Yield: {} mol {} /mol glucose\tBiomass Flux: {}\t Biomass Theoretical Yield {}/mol glucose\n'.format(target_compound_ID,
+                                                                                                                                              self.DB.get_compound_name(target_compound_ID), target_organism_ID,
+                                                                                                                                              self.DB.get_organism_name(target_organism_ID),
+                                                                                                                                              glucoseimport, round(objectivesol, 2),
+                                                                                                                                              wt_ty, target_compound_ID, biomassrxn, bio_ty))
+        self._write('theoretical_yield.txt', ''.join(lines))
+
     def convert_output_2_xlsx(self):
         '''converts txt files to output files'''
         verbose_print(self.verbose, '\nSTATUS:\tConverting output text files to xlsx format')
@@ -0,0 +1,116 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Single writer process for output files filled by worker processes'
+
+import os
+from multiprocessing import Process, Queue
+from timeit import default_timer as timer
+from rsgc.Parser import run_journal as rj
+try:
+    from queue import Empty
+except ImportError:
+    from Queue import Empty
+
+BUFFER_SIZE = 1024*1024
+FLUSH_INTERVAL = 5
+
+
+def _flush(files, done, journal):
+    '''
+    Flush output files, with a journal the files are synced to disk before the
+    DONE lines of completed targets and a checkpoint with the file sizes are added to it
+    '''
+    sizes = {}
+    for filename, fout in files.items():
+        fout.flush()
+        if journal:
+            os.fsync(fout.fileno())
+            sizes[os.path.relpath(filename, os.path.dirname(journal))] = os.fstat(fout.fileno()).st_size
+    if journal:
+        with open(journal, 'a') as fout:
+            fout.write(''.join(done)+rj.checkpoint_line(sizes))
+            fout.flush()
+            os.fsync(fout.fileno())
+    del done[:]
+
+
+def _write_records(record_queue, buffer_size, flush_interval, journal=None):
+    '''
+    Writes (filename, text, header) records from record_queue until None is
+    retrieved, files are opened once and each record is written with one write,
+    header is written before the text if the file is empty, records without
+    filename are journal lines written at the next flush
+    '''
+    files = {}
+    done = []
+    changed = False
+    last_flush = timer()
+    while True:
+        try:
+            record = record_queue.get(timeout=flush_interval)
+        except Empty:
+            record = False
+        if record is None:
+            break
+        if record:
+            filename, text, header = record
+            if filename is None:
+                done.append(text)
+            else:
+                if filename not in files:
+                    files[filename] = open(filename, 'a', buffering=buffer_size)
+                    if journal:
+                        '''Checkpoint has the size of the file before records of this run'''
+                        _flush(files, done, journal)
+                if header and files[filename].tell() == 0:
+                    text = header+text
+                files[filename].write(text)
+            changed = True
+        if changed and timer()-last_flush >= flush_interval:
+            _flush(files, done, journal)
+            changed = False
+            last_flush = timer()
+    _flush(files, done, journal)
+    for fout in files.values():
+        fout.close()
+
+
+class OutputWriter(object):
+    """
+    Worker processes put whole records (all lines output for a target in
+    a file) in a queue that one process writes to output files that are kept
+    open with large buffers, buffers are flushed every flush_interval seconds
+    (and completed targets are added to the journal of the run if there is one)
+    """
+    def __init__(self, buffer_size=BUFFER_SIZE, flush_interval=FLUSH_INTERVAL, journal=None):
+        '''Initialize class'''
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.journal = journal
+        self.record_queue = Queue()
+        self.process = None
+
+    def __getstate__(self):
+        '''Only the queue is needed by worker processes'''
+        state = self.__dict__.copy()
+        state['process'] = None
+        return state
+
+    def start(self):
+        '''Start writer process'''
+        self.process = Process(target=_write_records, args=(self.record_queue, self.buffer_size, self.flush_interval, self.journal))
+        self.process.start()
+
+    def write(self, filename, text, header=None):
+        '''Send record to writer process'''
+        self.record_queue.put((filename, text, header))
+
+    def write_journal(self, text):
+        '''Send journal line to writer process (written after records sent before it are on disk)'''
+        self.record_queue.put((None, text, None))
+
+    def stop(self):
+        '''Write remaining records, close files and stop writer process'''
+        self.record_queue.put(None)
+        self.process.join()
+        self.process = None
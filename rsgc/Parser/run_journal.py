@@ -0,0 +1,92 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Manifest and journal of completed targets of a run, used to resume a run that stopped'
+
+import os
+
+MANIFEST_FILE = 'run_manifest.txt'
+JOURNAL_FILE = 'run_journal.txt'
+'''Options that do not change the output of targets (can be different when a run is resumed)'''
+RUN_OPTIONS = ['resume', 'output_path', 'verbose', 'processors', 'output_flush_interval',
+               'timing_history', 'result_cache', 'result_cache_size']
+
+
+def target_key(target_info):
+    '''Target compound and organism of a target'''
+    return (target_info[0], target_info[2])
+
+
+def manifest_parameters(args):
+    '''Parameters of the run that change the output of targets'''
+    return dict((key, str(value)) for key, value in vars(args).items() if key not in RUN_OPTIONS)
+
+
+def write_manifest(output_path, parameters):
+    '''Write manifest of a new run and start its journal'''
+    with open(os.path.join(output_path, MANIFEST_FILE), 'w') as fout:
+        for key in sorted(parameters):
+            fout.write(key+'\t'+parameters[key]+'\n')
+    open(os.path.join(output_path, JOURNAL_FILE), 'w').close()
+
+
+def read_manifest(output_path):
+    '''Parameters of the run in output_path, None if there is no manifest'''
+    filename = os.path.join(output_path, MANIFEST_FILE)
+    if not os.path.isfile(filename):
+        return None
+    parameters = {}
+    with open(filename) as fin:
+        for line in fin:
+            key, value = line.rstrip('\n').split('\t', 1)
+            parameters[key] = value
+    return parameters
+
+
+def done_line(target_info):
+    '''Journal line of a target whose output is complete'''
+    return 'DONE\t{}\t{}\n'.format(*target_key(target_info))
+
+
+def checkpoint_line(sizes):
+    '''
+    Journal line written after output files are flushed to disk, targets of the DONE
+    lines before it are completed and sizes are the lengths of the output files
+    '''
+    return 'CHECKPOINT\t'+'\t'.join('{}:{}'.format(name, size) for name, size in sorted(sizes.items()))+'\n'
+
+
+def read_journal(output_path):
+    '''
+    Completed targets and sizes of output files (and of the journal) at the last
+    checkpoint, DONE lines after the last checkpoint are not completed
+    '''
+    completed = set()
+    pending = []
+    sizes = {JOURNAL_FILE: 0}
+    filename = os.path.join(output_path, JOURNAL_FILE)
+    if not os.path.isfile(filename):
+        return completed, sizes
+    position = 0
+    with open(filename) as fin:
+        for line in fin:
+            if not line.endswith('\n'):
+                break
+            position += len(line.encode('utf-8'))
+            larray = line.rstrip('\n').split('\t')
+            if larray[0] == 'DONE' and len(larray) == 3:
+                pending.append(tuple(larray[1:]))
+            elif larray[0] == 'CHECKPOINT':
+                completed.update(pending)
+                pending = []
+                sizes = dict((name, int(size)) for name, size in (item.rsplit(':', 1) for item in larray[1:]))
+                sizes[JOURNAL_FILE] = position
+    return completed, sizes
+
+
+def truncate_outputs(output_path, sizes):
+    '''Remove output written after the last checkpoint (by targets that were not completed)'''
+    for name, size in sizes.items():
+        filename = os.path.join(output_path, name)
+        if os.path.isfile(filename) and os.path.getsize(filename) > size:
+            with open(filename, 'r+') as fout:
+                fout.truncate(size)
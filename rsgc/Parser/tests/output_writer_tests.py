@@ -0,0 +1,62 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on single writer process for output files'
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from rsgc.Parser import output_writer as ow
+from rsgc.ShortestPath import target_pool as tp
+
+
+def write_record(job, writer, filename):
+    '''Job sends a record of several lines'''
+    writer.write(filename, ''.join('{}\tline {}\n'.format(job, count) for count in range(50)),
+                 header='#header\n')
+
+
+class OutputWriterTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'optimal_pathways.txt')
+        open(self.filename, 'w').close()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+        shutil.rmtree(self.directory)
+
+    def test_records_from_workers(self):
+        print ("Testing records of worker processes are not interleaved and header is written once")
+        writer = ow.OutputWriter()
+        writer.start()
+        jobs = ['target'+str(count) for count in range(20)]
+        tp.run_target_pool(write_record, jobs, (writer, self.filename), 4)
+        writer.stop()
+        with open(self.filename) as fin:
+            lines = fin.read().split('\n')
+        self.assertEqual(lines[0], '#header')
+        self.assertEqual(lines.count('#header'), 1)
+        records = lines[1:-1]
+        self.assertEqual(len(records), 50*len(jobs))
+        for start in range(0, len(records), 50):
+            job = records[start].split('\t')[0]
+            self.assertEqual(records[start:start+50], ['{}\tline {}'.format(job, count) for count in range(50)])
+
+    def test_flush_interval(self):
+        print ("Testing buffered records are written to the file after the flush interval")
+        writer = ow.OutputWriter(flush_interval=0.1)
+        writer.start()
+        writer.write(self.filename, 'Solution 1\n')
+        time.sleep(1)
+        with open(self.filename) as fin:
+            self.assertEqual(fin.read(), 'Solution 1\n')
+        writer.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on journal of completed targets used to resume a run'
+
+import os
+import shutil
+import tempfile
+import unittest
+from argparse import Namespace
+from rsgc.Parser import output_writer as ow
+from rsgc.Parser import run_journal as rj
+
+
+class RunJournalTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'optimal_pathways.txt')
+        self.journal = os.path.join(self.directory, rj.JOURNAL_FILE)
+        open(self.filename, 'w').close()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+        shutil.rmtree(self.directory)
+
+    def run_targets(self, targets):
+        '''Output a record for each target with the writer process and journal the target'''
+        writer = ow.OutputWriter(journal=self.journal)
+        writer.start()
+        for target in targets:
+            writer.write(self.filename, 'SHORTEST PATH FOR {}\n'.format(target))
+            writer.write_journal(rj.done_line((target, '', 'org1')))
+        writer.stop()
+
+    def test_manifest(self):
+        print ("Testing manifest keeps parameters that change the output of targets")
+        args = Namespace(targets='targets.txt', multiple_solutions=True, processors=4, resume=False,
+                         output_path=self.directory)
+        parameters = rj.manifest_parameters(args)
+        self.assertEqual(parameters, {'targets': 'targets.txt', 'multiple_solutions': 'True'})
+        rj.write_manifest(self.directory, parameters)
+        self.assertEqual(rj.read_manifest(self.directory), parameters)
+        self.assertIsNone(rj.read_manifest(os.path.join(self.directory, 'missing')))
+
+    def test_resume_after_failure(self):
+        print ("Testing output after the last checkpoint is removed and only completed targets are skipped")
+        rj.write_manifest(self.directory, {})
+        self.run_targets(['cpd1', 'cpd2'])
+        '''Run stops while cpd3 is output'''
+        with open(self.filename, 'a') as fout:
+            fout.write('SHORTEST PATH FOR cpd3\nSolution')
+        with open(self.journal, 'a') as fout:
+            fout.write(rj.done_line(('cpd3', '', 'org1'))+'CHECKPOINT\toptimal')
+        completed, sizes = rj.read_journal(self.directory)
+        self.assertEqual(completed, set([('cpd1', 'org1'), ('cpd2', 'org1')]))
+        rj.truncate_outputs(self.directory, sizes)
+        self.run_targets(['cpd3'])
+        completed, sizes = rj.read_journal(self.directory)
+        self.assertEqual(len(completed), 3)
+        with open(self.filename) as fin:
+            self.assertEqual(fin.read(), ''.join('SHORTEST PATH FOR {}\n'.format(target) for target in ['cpd1', 'cpd2', 'cpd3']))
+
+if __name__ == '__main__':
+    unittest.main()
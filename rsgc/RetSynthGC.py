@@ -3,7 +3,6 @@ __author__ = 'Leanne Whitmore, Bernard Nguyen and Corey Hudson'
 __email__ = 'leanne382@gmail.com, bernguy@sandia.gov and cmhudso@sandia.gov'
 __description__ = 'Main code to RetSynth (RS)'
 
-from multiprocessing import Process
 import argparse
 try:
     import pickle as cPickle
@@ -51,6 +50,7 @@ from rsgc.Visualization_chemdraw import reaction_files as rf
 from rsgc.ShortestPath import extractinfo as ei
 from rsgc.ShortestPath import constraints as co
 from rsgc.ShortestPath import integerprogram_pulp as ip_pulp
+from rsgc.ShortestPath import target_pool as tp
 from rsgc.Database import initialize_database as init_db
 from rsgc.Database import build_kbase_db as bkdb
 from rsgc.Database import build_modelseed as bms
@@ -238,7 +238,7 @@ def retrieve_shortestpath(target_info, IP, LP, LPchem, database, output, temp_im
 
             else:
 
-                output.output_shortest_paths(target_info, [])
+                output.output_shortest_paths(target_info, [], IP.no_path_reason)
 
 
                 if flux_balance_analysis:
@@ -393,24 +393,19 @@ class RetSynthGC(object):
             keggorganisms_ids=False
             output_genecompdb=False
 
-        args_targets = [targets[i:i+self.processors]
-                      for i in range(0, len(targets), self.processors)]
-        for targets_sub in args_targets:
-            processes = []
-            for target in targets_sub:
-                processes.append(Process(target=retrieve_shortestpath, args=(target, IP, LP, LPchem, database, output,
-                                                            temp_imgs_PATH, self.timer_output, self.media_for_FBA,
-                                                            self.flux_balance_analysis, self.knockouts, self.images,
-                                                            self.figures_graphviz, self.figures_chemdraw, self.evaluate_reactions, self.show_rxn_info,
-                                                            self.output_path, self.multiple_solutions, self.start_compounds,
-                                                            self.gene_compatability, self.cai_threshold, self.user_cai_table,
-                                                            orgs_gbs, gbs_orgs, R, keggorganisms_ids, output_genecompdb,
-                                                            self.verbose)))
-                                        
-            for p in processes:        
-                p.start()
-            for p in processes:
-                p.join()
+        output.start_writer()
+        try:
+            tp.run_target_pool(retrieve_shortestpath, targets, (IP, LP, LPchem, database, output,
+                                                                temp_imgs_PATH, self.timer_output, self.media_for_FBA,
+                                                                self.flux_balance_analysis, self.knockouts, self.images,
+                                                                self.figures_graphviz, self.figures_chemdraw, self.evaluate_reactions, self.show_rxn_info,
+                                                                self.output_path, self.multiple_solutions, self.start_compounds,
+                                                                self.gene_compatability, self.cai_threshold, self.user_cai_table,
+                                                                orgs_gbs, gbs_orgs, R, keggorganisms_ids, output_genecompdb,
+                                                                self.verbose),
+                               self.processors, self.verbose, output if self.timer_output else None)
+        finally:
+            output.stop_writer()
 
         if self.output_xlsx_format:
             output.convert_output_2_xlsx()
@@ -4,53 +4,75 @@ __description__ = 'retrieves necessary matricies for interger program'
 
 
 import pulp
+from array import array
 from copy import deepcopy
+import numpy as np
+from scipy import sparse
+from rsgc.ShortestPath import constraints_io as cio
+from rsgc.ShortestPath import reachability as ra
+from rsgc.ShortestPath import registry as rg
 from tqdm import tqdm
 import time
 import re
 from sys import platform
 
 
-def load_stoichometry_for_met(reactantrxns, productsrxns, allrxnsrev,
-                              allrxnsrev_index, allrxnsrevset):
-    '''Gets stoichometry for all compounds to be in the A matrix'''
-    temp = {}
-    react_not_in_all = reactantrxns.difference(allrxnsrevset)
-    for s in react_not_in_all:
-        if s + '_R' in allrxnsrev_index:
-            temp[allrxnsrev_index[s + '_R']] = 1
-        if s + '_F' in allrxnsrev_index:
-            temp[allrxnsrev_index[s + '_F']] = -1
-    react_in_all = reactantrxns.intersection(allrxnsrevset)
-    product_not_in_all = productsrxns.difference(allrxnsrevset)
-    for s in product_not_in_all:
-        if s + '_R' in allrxnsrev_index:
-            temp[allrxnsrev_index[s + '_R']] = -1
-        if s + '_F' in allrxnsrev_index:
-            temp[allrxnsrev_index[s + '_F']] = 1
-    product_in_all = productsrxns.intersection(allrxnsrevset)
-    for r in react_in_all:
-        index = allrxnsrev_index[r]
-        temp[index] = -1
-    for p in product_in_all:
-        index = allrxnsrev_index[p]
-        temp[index] = 1
-    return temp
+def stoichiometry_entries(reaction_compounds, allrxnsrev_index, cpd_index):
+    '''
+    Converts (reaction, compound, is product) rows of the database into
+    row (compound), column (allrxnsrev index) and value arrays of the A matrix,
+    the forward variable of a reversible reaction consumes reactants and the
+    reverse variable produces them, when a compound is both a reactant and a
+    product of a reaction the product entry is used
+    '''
+    rows = array('l')
+    columns = array('l')
+    values = array('b')
+    is_prod = array('b')
+    for reaction, cpd, prod in reaction_compounds:
+        row = cpd_index.get(cpd)
+        if row is None:
+            continue
+        sign = 1 if int(prod) == 1 else -1
+        if reaction in allrxnsrev_index:
+            entries = [(allrxnsrev_index[reaction], sign)]
+        else:
+            entries = []
+            if reaction + '_R' in allrxnsrev_index:
+                entries.append((allrxnsrev_index[reaction + '_R'], -sign))
+            if reaction + '_F' in allrxnsrev_index:
+                entries.append((allrxnsrev_index[reaction + '_F'], sign))
+        for column, value in entries:
+            rows.append(row)
+            columns.append(column)
+            values.append(value)
+            is_prod.append(int(prod))
+    rows = np.array(rows, dtype=np.int64)
+    columns = np.array(columns, dtype=np.int64)
+    values = np.array(values, dtype=np.int8)
+    is_prod = np.array(is_prod, dtype=np.int8)
+    '''Keep product entry when a row/column pair occurs more than once'''
+    order = np.lexsort((is_prod, columns, rows))
+    rows, columns, values = rows[order], columns[order], values[order]
+    last = np.ones(len(rows), dtype=bool)
+    last[:-1] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+    return rows[last], columns[last], values[last]
 
 class ConstructInitialLP(object):
     """Constructs A matrix and indidvidual reaction constraints"""
     def __init__(self, allrxns, allcpds, db, ignorerxns, lp=None, variables=None, allrxnsrev_dict_rev=None,
-                allrxnsrev_dict=None, allrxnsrev=None):
+                allrxnsrev_dict=None, allrxnsrev=None, A_matrix=None, presolve_cpds=None, pruned=None,
+                reversible_pairs=None):
         '''Initalize class'''
         self.allrxns = allrxns
         self.allcpds = deepcopy(allcpds)
         self.DB = db
         self.ignorerxns = ignorerxns
+        self.presolve_cpds = presolve_cpds
+        self.pruned = pruned if pruned else {'reactions': [], 'compounds': []}
         # self.lp = pulp.LpProblem('ShortestPath', pulp.LpMinimize)
 
         if lp is  None:
-            self.A = []
-            self.allcpds_new = []
             self.allrxnsrev = []
             self.allrxnsrev_dict = {}
             self.allrxnsrev_dict_rev = {}
@@ -63,62 +85,177 @@ class ConstructInitialLP(object):
             
             self.initial_reaction_constraints()
             self.initial_A_matrix(pulp)
-           
+            self.registry = rg.ReactionRegistry(self.variables, self.allrxnsrev_dict)
+
             if self.ignorerxns:
                 self.reaction_constraints_ignore_reactions()
+            self.equivalent_reaction_classes()
+            self.reversible_reaction_pairs()
 
 
         else:
             print ('STATUS:\tBuilding pre-stored variables...')
             self.lp = lp
-            self.variables = self.lp.variables()
+            if A_matrix is not None:
+                self.variables = variables
+                self.A_matrix = A_matrix
+            else:
+                self.variables = self.lp.variables()
+                self.A_matrix = cio.lp_to_matrix(self.lp, self.variables)
             self.allrxnsrev_dict_rev = allrxnsrev_dict_rev
             self.allrxnsrev_dict = allrxnsrev_dict
             self.allrxnsrev = allrxnsrev
+            self.registry = rg.ReactionRegistry(self.variables, self.allrxnsrev_dict)
 
             if self.ignorerxns:
                 self.reaction_constraints_ignore_reactions()
-
-    def retrieve_stoichiometry(self, met):
-        '''Retrieve stoichometry for each compound'''
-        if met in self.reactant_dict:
-            reactantrxns = self.reactant_dict[met]
-        else:
-            reactantrxns = set(self.DB.get_reactants_reactions(met))
-            self.reactant_dict[met] = reactantrxns
-        if met in self.product_dict:
-            productsrxns = self.product_dict[met]
-        else:
-            productsrxns = set(self.DB.get_products_reactions(met))
-            self.product_dict[met] = productsrxns
-        stoich = load_stoichometry_for_met(reactantrxns, productsrxns,
-                                           self.allrxnsrev,
-                                           self.allrxnsrev_index,
-                                           self.allrxnsrevset)
-        return stoich
+            self.equivalent_reaction_classes()
+            if reversible_pairs is not None:
+                self.reversible_pairs = reversible_pairs
+            else:
+                self.reversible_reaction_pairs()
 
     def initial_A_matrix(self, solver=False):
-        ''' Generates an matrix of compound constraints'''
+        '''
+        Generates an matrix of compound constraints from a single pass
+        over the reaction_compound table (scipy sparse matrix)
+        '''
         print('STATUS:\tGenerating A matrix...')
-        self.reactant_dict = {}
-        self.product_dict = {}
-        for count, met in enumerate(tqdm(self.allcpds)):
-            stoich = self.retrieve_stoichiometry(met)
-            if len(stoich) > 0:
-                self.A.append(stoich)
-                self.allcpds_new.append(met)
-            else:
-                pass
-        self.allcpds = self.allcpds_new
+        cpd_index = {met: count for count, met in enumerate(self.allcpds)}
+        rows, columns, values = stoichiometry_entries(tqdm(self.DB.get_all_reaction_compounds()),
+                                                      self.allrxnsrev_index, cpd_index)
+        '''Compounds not in any reaction do not get a row'''
+        keep = np.unique(rows)
+        self.allcpds = [self.allcpds[i] for i in keep]
+        self.A = sparse.csr_matrix((values, (np.searchsorted(keep, rows), columns)),
+                                   shape=(len(keep), len(self.allrxnsrev)))
+        self.A.sort_indices()
+        if self.presolve_cpds is not None:
+            self.presolve_network(self.presolve_cpds)
         self.load_pulp_row_constraints(solver)
 
-    def load_pulp_row_constraints(self, pulp):
-        '''Loads constraints in to pulp integer linear problem'''
+    def presolve_network(self, available_cpds):
+        '''
+        Removes reactions that consume a compound which is not in any organism
+        (available_cpds) and can not be produced by a remaining reaction and
+        compounds left without reactions, removed reactions and compounds are
+        recorded (self.pruned) so they can be restored
+        '''
+        print ('STATUS:\tRemoving dead-end compounds and blocked reactions...')
+        R = ra.Reachability(self.A, self.allcpds)
+        active, producible = R.forward(np.ones(self.A.shape[1], dtype=bool),
+                                       R.compound_mask(available_cpds))
+        A = self.A[:, np.nonzero(active)[0]].tocsr()
+        kept_rows = np.diff(A.indptr) > 0
+        self.pruned = {'reactions': [rxn for rxn, kept in zip(self.allrxnsrev, active) if not kept],
+                       'compounds': [cpd for cpd, kept in zip(self.allcpds, kept_rows) if not kept]}
+        print ('STATUS:\tRemoved {} reaction variables and {} compounds'.format(len(self.pruned['reactions']),
+                                                                               len(self.pruned['compounds'])))
+        self.A = A[np.nonzero(kept_rows)[0], :].tocsr()
+        self.allcpds = [cpd for cpd, kept in zip(self.allcpds, kept_rows) if kept]
+        allrxnsrev = [rxn for rxn, kept in zip(self.allrxnsrev, active) if kept]
+        self.allrxnsrev = []
+        self.allrxnsrev_dict = {}
+        self.allrxnsrev_dict_rev = {}
+        self.variables_load = []
+        for count, rxn in enumerate(allrxnsrev):
+            self.load_reaction_variables(rxn, rxn, 'R' + str(count+1))
+        self.allrxnsrev_index = {key: index for index, key in enumerate(self.allrxnsrev)}
+        self.variables = deepcopy(self.variables_load)
+
+    def restore_pruned(self, incpds):
+        '''
+        Restores reactions and compounds removed by presolve_network, needed when
+        starting compounds (--start_compounds) are not in any organism of the database
+        '''
+        if not self.pruned['reactions'] or set(incpds).issubset(self.DB.get_all_model_compounds()):
+            return
+        print ('STATUS:\tRestoring {} reaction variables and {} compounds removed from database constraints...'.format(len(self.pruned['reactions']), len(self.pruned['compounds'])))
+        ncolumns = len(self.variables)
+        nrows = len(self.allcpds)
+        allcpds = self.allcpds + self.pruned['compounds']
+        restored_index = {rxn: count for count, rxn in enumerate(self.pruned['reactions'])}
+        rows, columns, values = stoichiometry_entries(self.DB.get_all_reaction_compounds(), restored_index,
+                                                      {cpd: count for count, cpd in enumerate(allcpds)})
+        variables = []
+        for count, rxn in enumerate(self.pruned['reactions']):
+            rxn_id = 'R' + str(len(self.allrxnsrev)+1)
+            self.allrxnsrev.append(rxn)
+            self.allrxnsrev_dict[rxn_id] = rxn
+            self.allrxnsrev_dict_rev[rxn] = rxn_id
+            variables.append(pulp.LpVariable(rxn_id, cat=pulp.LpInteger, lowBound=0,
+                                             upBound=0 if rxn.startswith('EX_') else 1))
+        '''New list, self.variables can be the variable list of the pulp problem'''
+        self.variables = self.variables + variables
+        if len(self.lp.constraints):
+            rownames = list(self.lp.constraints)
+            for row, column, value in zip(rows, columns, values):
+                if row < nrows:
+                    self.lp.constraints[rownames[row]].addInPlace(int(value)*variables[column])
+            A = sparse.csr_matrix((values, (rows, columns)), shape=(len(allcpds), len(variables)))
+            for row in range(nrows, len(allcpds)):
+                start, end = A.indptr[row], A.indptr[row+1]
+                expression = pulp.LpAffineExpression([(variables[j], int(v)) for j, v in
+                                                      zip(A.indices[start:end], A.data[start:end])])
+                self.lp += pulp.LpConstraint(expression, name='c' + str(row) + ' constraint', sense=1, rhs=0)
+        A = self.A_matrix.tocoo()
+        self.A_matrix = sparse.csr_matrix((np.concatenate([A.data, values.astype(float)]),
+                                           (np.concatenate([A.row, rows]), np.concatenate([A.col, columns+ncolumns]))),
+                                          shape=(len(allcpds), ncolumns+len(variables)))
+        self.A_matrix.sort_indices()
+        self.allcpds = allcpds
+        self.pruned = {'reactions': [], 'compounds': []}
+        self.registry = rg.ReactionRegistry(self.variables, self.allrxnsrev_dict)
+        self.equivalent_reaction_classes()
+        self.reversible_reaction_pairs()
 
+    def reversible_reaction_pairs(self):
+        '''
+        Columns (LP.variables order) of the forward and reverse variable of each
+        reversible reaction, only one direction of a reaction can be in a pathway
+        (x_F + x_R <= 1)
+        '''
+        reaction_index = self.registry.reaction_index
+        pairs = []
+        for rxn in self.allrxnsrev:
+            if rxn.endswith('_F') and rxn[:-2] + '_R' in reaction_index:
+                pairs.append((reaction_index[rxn], reaction_index[rxn[:-2] + '_R']))
+        self.reversible_pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+    def equivalent_reaction_classes(self):
+        '''
+        Groups reaction variables (columns of LP.variables) with identical
+        stoichiometry and bounds, reactions from different databases/models
+        that only differ by ID, only classes with more than one reaction are kept
+        '''
+        A = sparse.csc_matrix(self.A_matrix)
+        classes = {}
+        for column, variable in enumerate(self.variables):
+            start, end = A.indptr[column], A.indptr[column+1]
+            key = (A.indices[start:end].tobytes(), A.data[start:end].tobytes(),
+                   variable.lowBound, variable.upBound)
+            classes.setdefault(key, []).append(column)
+        self.reaction_classes = [columns for columns in classes.values() if len(columns) > 1]
+        print ('STATUS:\t{} classes of reactions with identical stoichiometry ({} reaction variables)'.format(len(self.reaction_classes), sum(len(columns) for columns in self.reaction_classes)))
+
+    def load_pulp_row_constraints(self, pulp):
+        '''
+        Loads constraints in to pulp integer linear problem, A matrix is
+        then reordered to the columns of the pulp problem (LP.variables)
+        '''
         print ('STATUS:\tLoading database A matrix (pulp)... ')
-        for count, stoich in enumerate(tqdm(self.A)):
-            self.lp += pulp.LpConstraint(pulp.lpSum(stoich[j]*self.variables[j] for j in list(stoich.keys())), name='c' + str(count) + ' constraint', sense=1, rhs=0)
+        for count in tqdm(range(self.A.shape[0])):
+            start, end = self.A.indptr[count], self.A.indptr[count+1]
+            expression = pulp.LpAffineExpression([(self.variables[j], int(v)) for j, v in
+                                                  zip(self.A.indices[start:end], self.A.data[start:end])])
+            self.lp += pulp.LpConstraint(expression, name='c' + str(count) + ' constraint', sense=1, rhs=0)
         self.variables = self.lp.variables()
+        variable_index = {variable.name: count for count, variable in enumerate(self.variables)}
+        column_order = np.array([variable_index.get(variable.name, -1) for variable in self.variables_load])
+        A = self.A.tocoo()
+        self.A_matrix = sparse.csr_matrix((A.data.astype(float), (A.row, column_order[A.col])),
+                                          shape=(A.shape[0], len(self.variables)))
+        self.A_matrix.sort_indices()
 
     ###GENERATE REACTION VARIABLE CONSTRAINTS
     def reaction_constraints_pulp(self, variable_name, rxn_name, pulp):
@@ -132,8 +269,7 @@ class ConstructInitialLP(object):
         self.variables_load.append(variable)
 
     def _update_reaction_constraints_for_ingorerxns(self, reaction_id):
-        tmp = [k for k in self.variables if k.name==reaction_id]
-        variable = tmp[0]
+        variable = self.variables[self.registry.column_index[reaction_id]]
         variable.upBound = 0 
         variable.lowBound = 0
  
@@ -163,8 +299,9 @@ class ConstructInitialLP(object):
         '''Sets up column (individual reaction) constraints'''
         count = 0
         print ('STATUS:\tGenerating reaction constraints ...')
+        reversibility = self.DB.is_reversible_all_reactions()
         for rxn in tqdm(self.allrxns):
-            if self.DB.is_reversible_all(rxn) == '1':
+            if reversibility.get(rxn, 'None') == '1':
                 count += 1
                 self.load_reaction_variables(str(rxn) + '_F', str(rxn), 'R' + str(count))
 
@@ -175,6 +312,5 @@ class ConstructInitialLP(object):
                 count += 1
                 self.load_reaction_variables(str(rxn), str(rxn), 'R' + str(count))
 
-        self.allrxnsrevset = set(self.allrxnsrev)
         self.allrxnsrev_index = {key: index for index, key in enumerate(self.allrxnsrev)}
         self.variables = deepcopy(self.variables_load)
\ No newline at end of file
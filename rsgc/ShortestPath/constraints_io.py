@@ -0,0 +1,234 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Reads and writes database constraint (.constraints) files'
+
+import os
+import pickle
+import zipfile
+from timeit import default_timer as timer
+import numpy as np
+from scipy import sparse
+import pulp
+
+FORMAT_VERSION = 1
+VERSION_KEY = 'retsynth_constraints_version'
+
+
+def _string_block(strings):
+    '''Stores list of strings as one utf-8 byte block and offsets into the block'''
+    encoded = [str(string).encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded)+1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(string) for string in encoded])
+    block = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return block, offsets
+
+
+def _read_string_block(block, offsets):
+    '''Retrieve list of strings from utf-8 byte block and offsets'''
+    data = bytes(np.asarray(block))
+    offsets = np.asarray(offsets).tolist()
+    return [data[start:end].decode('utf-8') for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _memmap_npz(filename):
+    '''
+    Memory map the arrays of an uncompressed .npz file, arrays are read
+    only and pages are shared between processes loading the same file
+    '''
+    arrays = {}
+    with zipfile.ZipFile(filename) as npz:
+        members = npz.infolist()
+    with open(filename, 'rb') as fin:
+        for member in members:
+            if member.compress_type != zipfile.ZIP_STORED:
+                return None
+            '''Skip local file header (30 bytes + file name + extra field)'''
+            fin.seek(member.header_offset + 26)
+            namelength, extralength = np.frombuffer(fin.read(4), dtype='<u2')
+            fin.seek(member.header_offset + 30 + int(namelength) + int(extralength))
+            version = np.lib.format.read_magic(fin)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fin)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fin)
+            key = member.filename[:-len('.npy')]
+            if dtype.hasobject or int(np.prod(shape)) == 0:
+                arrays[key] = np.load(filename)[key]
+            else:
+                arrays[key] = np.memmap(filename, dtype=dtype, mode='r', offset=fin.tell(),
+                                        shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
+
+def is_binary_constraints_file(filename):
+    '''Checks if constraints file is in the binary (.npz) format'''
+    if not zipfile.is_zipfile(filename):
+        return False
+    with zipfile.ZipFile(filename) as npz:
+        return VERSION_KEY + '.npy' in npz.namelist()
+
+
+def write_constraints_file(filename, lp, allcpds, variables, allrxnsrev, A_matrix=None, pruned=None,
+                           reversible_pairs=None):
+    '''
+    Stores database constraints in binary format (uncompressed .npz): A matrix
+    as CSR arrays, compound, variable and reaction IDs as string blocks,
+    reaction variable bounds as arrays, reactions and compounds removed
+    by the network presolve (pruned) as string blocks and forward/reverse
+    columns of reversible reactions (reversible_pairs) as an array
+    '''
+    print ('STATUS:\tDumping database constraints (binary format version {})...'.format(FORMAT_VERSION))
+    if A_matrix is None:
+        A_matrix = lp_to_matrix(lp, variables)
+    A_matrix = sparse.csr_matrix(A_matrix, dtype=float)
+    A_matrix.sort_indices()
+    cpds_block, cpds_offsets = _string_block(allcpds)
+    variables_block, variables_offsets = _string_block([variable.name for variable in variables])
+    rxns_block, rxns_offsets = _string_block(allrxnsrev)
+    if pruned is None:
+        pruned = {'reactions': [], 'compounds': []}
+    pruned_rxns_block, pruned_rxns_offsets = _string_block(pruned['reactions'])
+    pruned_cpds_block, pruned_cpds_offsets = _string_block(pruned['compounds'])
+    arrays = {VERSION_KEY: np.array([FORMAT_VERSION], dtype=np.int64),
+              'A_data': A_matrix.data,
+              'A_indices': A_matrix.indices,
+              'A_indptr': A_matrix.indptr,
+              'A_shape': np.array(A_matrix.shape, dtype=np.int64),
+              'cpds_block': cpds_block,
+              'cpds_offsets': cpds_offsets,
+              'variables_block': variables_block,
+              'variables_offsets': variables_offsets,
+              'rxns_block': rxns_block,
+              'rxns_offsets': rxns_offsets,
+              'pruned_rxns_block': pruned_rxns_block,
+              'pruned_rxns_offsets': pruned_rxns_offsets,
+              'pruned_cpds_block': pruned_cpds_block,
+              'pruned_cpds_offsets': pruned_cpds_offsets,
+              'lowbound': np.array([np.nan if v.lowBound is None else v.lowBound for v in variables]),
+              'upbound': np.array([np.nan if v.upBound is None else v.upBound for v in variables])}
+    if reversible_pairs is not None:
+        arrays['reversible_pairs'] = np.asarray(reversible_pairs, dtype=np.int64).reshape(-1, 2)
+    with open(filename, 'wb') as fout:
+        np.savez(fout, **arrays)
+
+
+def read_constraints_file(filename, mmap=True):
+    '''
+    Loads database constraints from binary format, the pulp problem is
+    returned without rows (rows are only added if the glpk solver is used)
+    '''
+    arrays = _memmap_npz(filename) if mmap else None
+    if arrays is None:
+        arrays = dict(np.load(filename))
+    version = int(arrays[VERSION_KEY][0])
+    if version != FORMAT_VERSION:
+        raise ValueError('constraints file {} is format version {}, expected version {}'.format(filename, version, FORMAT_VERSION))
+    shape = tuple(int(i) for i in arrays['A_shape'])
+    A_matrix = sparse.csr_matrix((arrays['A_data'], arrays['A_indices'], arrays['A_indptr']),
+                                 shape=shape, copy=False)
+    allcpds = _read_string_block(arrays['cpds_block'], arrays['cpds_offsets'])
+    allrxnsrev = _read_string_block(arrays['rxns_block'], arrays['rxns_offsets'])
+    variable_names = _read_string_block(arrays['variables_block'], arrays['variables_offsets'])
+    pruned = {'reactions': [], 'compounds': []}
+    if 'pruned_rxns_block' in arrays:
+        pruned['reactions'] = _read_string_block(arrays['pruned_rxns_block'], arrays['pruned_rxns_offsets'])
+        pruned['compounds'] = _read_string_block(arrays['pruned_cpds_block'], arrays['pruned_cpds_offsets'])
+    reversible_pairs = None
+    if 'reversible_pairs' in arrays:
+        reversible_pairs = np.array(arrays['reversible_pairs'], dtype=np.int64).reshape(-1, 2)
+    variables = []
+    lowbounds = [None if np.isnan(bound) else int(bound) for bound in np.asarray(arrays['lowbound']).tolist()]
+    upbounds = [None if np.isnan(bound) else int(bound) for bound in np.asarray(arrays['upbound']).tolist()]
+    for name, lowbound, upbound in zip(variable_names, lowbounds, upbounds):
+        variables.append(pulp.LpVariable(name, cat=pulp.LpInteger, lowBound=lowbound, upBound=upbound))
+    allrxnsrev_dict = {}
+    allrxnsrev_dict_rev = {}
+    for count, rxn in enumerate(allrxnsrev):
+        allrxnsrev_dict['R' + str(count+1)] = rxn
+        allrxnsrev_dict_rev[rxn] = 'R' + str(count+1)
+    lp = pulp.LpProblem('ShortestPath', pulp.LpMinimize)
+    return (lp, allcpds, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned,
+            reversible_pairs)
+
+
+def read_pickled_constraints_file(filename):
+    '''Loads database constraints from previous (pickled) .constraints format'''
+    with open(filename, 'rb') as fin1:
+        print ('STATUS:\tLoading LP structure...')
+        lp = pickle.load(fin1)
+        print ('STATUS:\tLoading all compounds...')
+        allcompounds4matrix = pickle.load(fin1)
+        print ('STATUS:\tLoading all reaction variables...')
+        variables = pickle.load(fin1)
+        print ('STATUS:\tLoading all reactions 1...')
+        allrxnsrev_dict_rev = pickle.load(fin1)
+        print ('STATUS:\tLoading all reactions 2...')
+        allrxnsrev_dict = pickle.load(fin1)
+        print ('STATUS:\tLoading all reactions 3...')
+        allrxnsrev = pickle.load(fin1)
+    return (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, None, None, None)
+
+
+def load_constraints_file(filename, output=None):
+    '''Loads database constraints from binary or pickled .constraints file and reports load time'''
+    print ('STATUS:\tLoading pre-stored variables...')
+    start = timer()
+    if is_binary_constraints_file(filename):
+        file_format = 'binary'
+        constraints = read_constraints_file(filename)
+    else:
+        file_format = 'pickle'
+        constraints = read_pickled_constraints_file(filename)
+    end = timer()
+    print ('STATUS:\tLoaded {} constraints file {} in {} seconds'.format(file_format, os.path.basename(filename), end-start))
+    if output:
+        output.output_timer('Loading database constraints ({})\t{}\t{}\n'.format(file_format, (end-start), (end-start)/60))
+    return constraints
+
+
+def lp_to_matrix(lp, variables):
+    '''A matrix (scipy sparse matrix with variables as columns) of the rows of a pulp problem'''
+    column_index = {variable.name: count for count, variable in enumerate(variables)}
+    rows = []
+    columns = []
+    values = []
+    for count, constraint in enumerate(lp.constraints.values()):
+        for variable, coefficient in constraint.items():
+            rows.append(count)
+            columns.append(column_index[variable.name])
+            values.append(coefficient)
+    return sparse.csr_matrix((values, (rows, columns)), shape=(len(lp.constraints), len(variables)))
+
+
+def add_pulp_rows(lp, variables, A_matrix):
+    '''Adds database rows (compound constraints) from A matrix to pulp problem'''
+    print ('STATUS:\tLoading database A matrix (pulp)... ')
+    for count in range(A_matrix.shape[0]):
+        start, end = A_matrix.indptr[count], A_matrix.indptr[count+1]
+        expression = pulp.LpAffineExpression([(variables[j], int(v)) for j, v in
+                                              zip(A_matrix.indices[start:end], A_matrix.data[start:end])])
+        lp += pulp.LpConstraint(expression, name='c' + str(count) + ' constraint', sense=1, rhs=0)
+
+
+def reversible_pairs_matrix(reversible_pairs, ncolumns):
+    '''Rows (scipy sparse matrix) x_F + x_R of reversible reactions, rows are <= 1'''
+    reversible_pairs = np.asarray(reversible_pairs).reshape(-1, 2)
+    rows = np.repeat(np.arange(reversible_pairs.shape[0]), 2)
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, reversible_pairs.ravel())),
+                             shape=(reversible_pairs.shape[0], ncolumns))
+
+
+def add_pulp_reversible_rows(lp, variables, reversible_pairs):
+    '''Adds x_F + x_R <= 1 rows of reversible reactions to pulp problem (after database rows)'''
+    for count, (forward, reverse) in enumerate(np.asarray(reversible_pairs).reshape(-1, 2).tolist()):
+        lp += pulp.LpConstraint(variables[forward] + variables[reverse], name='r' + str(count) + ' reversible constraint',
+                                sense=-1, rhs=1)
+
+
+def convert_constraints_file(infile, outfile):
+    '''Converts pickled .constraints file into the binary format'''
+    print ('STATUS:\tConverting pickled constraints file {} to binary format {}...'.format(infile, outfile))
+    (lp, allcpds, variables, allrxnsrev_dict_rev,
+     allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs) = read_pickled_constraints_file(infile)
+    variables = lp.variables()
+    write_constraints_file(outfile, lp, allcpds, variables, allrxnsrev)
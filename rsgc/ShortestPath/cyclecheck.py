@@ -0,0 +1,129 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Identifies cycles in pathways from the database A matrix (in memory)'
+
+from collections import deque
+import numpy as np
+from scipy import sparse
+
+
+class CycleCheck(object):
+    """
+    Finds cycles in a pathway (set of reaction variables) using the
+    reaction/compound graph of the database A matrix: a reactant points to
+    the reactions consuming it and a reaction points to its products,
+    compounds available to the organism are left out of the graph
+    """
+    def __init__(self, A_matrix):
+        '''Initialize class'''
+        A_matrix = sparse.csc_matrix(A_matrix)
+        self.reactants = []
+        self.products = []
+        for column in range(A_matrix.shape[1]):
+            start, end = A_matrix.indptr[column], A_matrix.indptr[column+1]
+            rows = A_matrix.indices[start:end]
+            values = A_matrix.data[start:end]
+            self.reactants.append(rows[values < 0].tolist())
+            self.products.append(rows[values > 0].tolist())
+
+    def graph(self, columns, available):
+        '''
+        Directed graph of pathway, nodes are ('r', column) for reactions and
+        ('c', row) for compounds not available to the organism
+        '''
+        edges = {}
+        for column in columns:
+            reaction = ('r', column)
+            edges.setdefault(reaction, [])
+            for row in self.reactants[column]:
+                if not available[row]:
+                    edges.setdefault(('c', row), []).append(reaction)
+            for row in self.products[column]:
+                if not available[row]:
+                    edges[reaction].append(('c', row))
+                    edges.setdefault(('c', row), [])
+        return edges
+
+    def strongly_connected_components(self, edges):
+        '''Strongly connected components of graph (iterative Tarjan algorithm)'''
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in edges:
+            if root in index:
+                continue
+            work = [(root, iter(edges[root]))]
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+                if child is None:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+                elif child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges[child])))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+        return components
+
+    def shortest_cycle(self, edges, component):
+        '''Reactions (columns) of the shortest cycle within a strongly connected component'''
+        members = set(component)
+        best = None
+        for start in sorted(node for node in component if node[0] == 'r'):
+            previous = {start: None}
+            queue = deque([start])
+            found = None
+            while queue and found is None:
+                node = queue.popleft()
+                for child in edges[node]:
+                    if child == start:
+                        found = node
+                        break
+                    if child in members and child not in previous:
+                        previous[child] = node
+                        queue.append(child)
+            if found is None:
+                continue
+            cycle = []
+            node = found
+            while node is not None:
+                if node[0] == 'r':
+                    cycle.append(node[1])
+                node = previous[node]
+            if best is None or len(cycle) < len(best):
+                best = sorted(cycle)
+        return best
+
+    def cycles(self, columns, available):
+        '''
+        Retrieve one (shortest) cycle for each strongly connected component of
+        the pathway that contains a cycle, each cycle is a sorted list of columns
+        '''
+        available = np.asarray(available, dtype=bool)
+        edges = self.graph(columns, available)
+        cycles = []
+        for component in self.strongly_connected_components(edges):
+            if len(component) > 1:
+                cycle = self.shortest_cycle(edges, component)
+                if cycle:
+                    cycles.append(cycle)
+        return sorted(cycles)
@@ -3,8 +3,7 @@ __email__ = 'lwhitmo@sandia.gov'
 __description__ = 'Pull out all reactants and products for reactions \
                   that need to be inserted to organism'
 
-import re
-from copy import deepcopy
+from rsgc.ShortestPath import registry as rg
 
 class Extract_Information(object):
     """
@@ -17,17 +16,26 @@ class Extract_Information(object):
         self.temp_rxns = {}
         self.temp_exmets = {}
         self.temp_external = {}
-        self.inrxns = inrxns
+        self.inrxns = set(inrxns)
         self.DB = db
         self.incpds = incpds
         for count, path in enumerate(optimal_pathways):
-            count += 1
-            if path:
-                os_dict, excpds, count_external = self.extractinfo(path)
-                if os_dict is not None:
-                    self.temp_rxns[count] = os_dict
-                    self.temp_exmets[count] = excpds
-                    self.temp_external[count] = count_external
+            self.add_pathway(count+1, path)
+
+    def add_pathway(self, count, path):
+        '''
+        Adds information for pathway number count (pathways can be added
+        as they are identified), returns reaction information of the pathway
+        '''
+        if path:
+            os_dict, excpds, count_external = self.extractinfo(path)
+            if os_dict is not None:
+                self.temp_rxns[count] = os_dict
+                self.temp_exmets[count] = excpds
+                self.temp_external[count] = count_external
+                return os_dict
+        return None
+
     def get_info(self, rxn, path_dict, excpds, Direction=False):
         '''
         Gets information for reactions, compounds and organisms
@@ -72,28 +80,19 @@ class Extract_Information(object):
         count = 0
         count_external = 0
         for rxn in path:
-            rxn = deepcopy(rxn)
-            if re.search('_R$', rxn) is not None:
-                rxn = re.sub('_R$', '', rxn)
-                if rxn not in self.inrxns:
-                    count_external+=1
-                if rxn not in list(path_dict.keys()):
-                    path_dict[rxn] = {}
+            rxn, direction = rg.split_reaction(rxn)
+            if rxn not in self.inrxns:
+                count_external+=1
+            if rxn not in path_dict:
+                path_dict[rxn] = {}
+                if direction == -1:
                     path_dict[rxn]['direction'] = 'reverse'
                     path_dict, excpds = self.get_info(rxn, path_dict, excpds, Direction=True)
                 else:
-                    count += 1
-            else:
-                if re.search('_F$', rxn) is not None:
-                    rxn = re.sub('_F$', '', rxn)
-                if rxn not in self.inrxns:
-                    count_external+=1
-                if rxn not in list(path_dict.keys()):
-                    path_dict[rxn] = {}
                     path_dict[rxn]['direction'] = 'forward'
                     path_dict, excpds = self.get_info(rxn, path_dict, excpds, Direction=False)
-                else:
-                    count += 1
+            else:
+                count += 1
         excpds = list(set(excpds))
         if count == 0:
             return(path_dict, excpds, count_external)
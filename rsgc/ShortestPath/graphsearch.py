@@ -0,0 +1,132 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Best-first search of the reaction/compound hypergraph for fast pathway screening'
+
+import heapq
+import numpy as np
+from scipy import sparse
+
+SEARCH_MODES = ['ilp', 'heuristic', 'hybrid']
+
+
+class PathSearch(object):
+    """
+    Best-first (generalized Dijkstra) search over the reaction/compound
+    hypergraph of the database A matrix, a reaction can be used once all of
+    its reactants can be made, cost of a compound is the cost of the cheapest
+    reaction producing it plus the costs of that reaction's reactants
+    """
+    def __init__(self, A_matrix, allcpds):
+        '''Initialize class'''
+        A_matrix = sparse.csc_matrix(A_matrix)
+        self.A_matrix = A_matrix
+        self.reactants = []
+        self.products = []
+        for column in range(A_matrix.shape[1]):
+            start, end = A_matrix.indptr[column], A_matrix.indptr[column+1]
+            rows = A_matrix.indices[start:end]
+            values = A_matrix.data[start:end]
+            self.reactants.append(rows[values < 0].tolist())
+            self.products.append(rows[values > 0].tolist())
+        self.sources = [column for column in range(A_matrix.shape[1]) if not self.reactants[column]]
+        consumes = sparse.csr_matrix(A_matrix < 0)
+        self.consumers = [consumes.indices[consumes.indptr[row]:consumes.indptr[row+1]].tolist()
+                          for row in range(A_matrix.shape[0])]
+        self.cpd_index = {cpd: count for count, cpd in enumerate(allcpds)}
+
+    def search(self, available, target_row, cost, active):
+        '''
+        Retrieve cheapest set of reactions (columns) producing the target
+        from available compounds, returns None if the target can not be reached
+        '''
+        compound_cost = {}
+        best = {}
+        finalized = set()
+        remaining = {}
+        heap = []
+        for row in available:
+            compound_cost[row] = 0
+            heapq.heappush(heap, (0, row))
+        for column in self.sources:
+            if active[column]:
+                for product in self.products[column]:
+                    if cost[column] < compound_cost.get(product, np.inf):
+                        compound_cost[product] = cost[column]
+                        best[product] = column
+                        heapq.heappush(heap, (cost[column], product))
+        while heap:
+            current, row = heapq.heappop(heap)
+            if row in finalized:
+                continue
+            finalized.add(row)
+            if row == target_row:
+                break
+            for column in self.consumers[row]:
+                if not active[column]:
+                    continue
+                if column not in remaining:
+                    remaining[column] = len(self.reactants[column])
+                remaining[column] -= 1
+                if remaining[column] == 0:
+                    reaction_cost = cost[column] + sum(compound_cost[r] for r in self.reactants[column])
+                    for product in self.products[column]:
+                        if product not in finalized and reaction_cost < compound_cost.get(product, np.inf):
+                            compound_cost[product] = reaction_cost
+                            best[product] = column
+                            heapq.heappush(heap, (reaction_cost, product))
+        if target_row not in finalized:
+            return None
+        '''Reactions used to make target'''
+        pathway = set()
+        stack = [target_row]
+        seen = set(available)
+        while stack:
+            row = stack.pop()
+            if row in seen:
+                continue
+            seen.add(row)
+            column = best[row]
+            pathway.add(column)
+            stack.extend(self.reactants[column])
+        return pathway
+
+    def is_feasible(self, pathway, available, target_row):
+        '''Checks pathway satisfies the integer linear program compound constraints'''
+        net = np.asarray(self.A_matrix[:, sorted(pathway)].sum(axis=1)).ravel()
+        net[list(available)] = 0
+        return net[target_row] == 1 and bool((np.delete(net, target_row) >= 0).all())
+
+    def k_pathways(self, incpds, target, cost, active, k, limit=None):
+        '''
+        Retrieve up to k pathways (sets of columns) for a target, alternative
+        pathways are searched for by excluding reactions of previously found
+        pathways (one at a time), pathways are returned sorted by cost
+        '''
+        if target not in self.cpd_index:
+            return []
+        target_row = self.cpd_index[target]
+        available = set(self.cpd_index[cpd] for cpd in incpds if cpd in self.cpd_index)
+        found = {}
+        queue = [(0, 0, frozenset())]
+        searched = set()
+        count = 0
+        while queue and len(found) < k and count < 10*k:
+            _, _, excluded = heapq.heappop(queue)
+            count += 1
+            search_active = active.copy()
+            search_active[list(excluded)] = False
+            pathway = self.search(available, target_row, cost, search_active)
+            if pathway is None:
+                continue
+            pathway_cost = sum(cost[column] for column in pathway)
+            if limit is not None and pathway_cost > limit:
+                continue
+            key = frozenset(pathway)
+            if key not in found:
+                found[key] = (pathway_cost, self.is_feasible(pathway, available, target_row))
+            for column in sorted(pathway):
+                if cost[column] > 0 and excluded.union([column]) not in searched:
+                    searched.add(excluded.union([column]))
+                    heapq.heappush(queue, (pathway_cost, len(searched), excluded.union([column])))
+        return sorted([(pathway_cost, feasible, sorted(pathway)) for pathway, (pathway_cost, feasible)
+                       in found.items()])
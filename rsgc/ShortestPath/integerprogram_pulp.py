@@ -2,18 +2,49 @@ __author__ = 'Leanne Whitmore'
 __email__ = 'lwhitmo@sandia.gov'
 __description__ = 'Sets bounds necessary for a specific taraget compound for pulp and runs glpk'
 
-import re
-from copy import deepcopy
+import itertools
 from timeit import default_timer as timer
 import pulp
+import numpy as np
+from rsgc.ShortestPath import lp_overlay as lo
+from rsgc.ShortestPath import reachability as ra
+from rsgc.ShortestPath import graphsearch as gs
+from rsgc.ShortestPath import cyclecheck as cc
+from rsgc.ShortestPath import solvers
+from rsgc.ShortestPath import result_cache as rc
+
+ENUMERATION_PHASES = ['optimal', 'k', 'internal']
+
+'''Reason codes for targets without pathways (output with "No paths" entries)'''
+NO_PATH_REASONS = {'NOT_IN_DATABASE': 'target is not a compound of a database reaction',
+                   'NOT_PRODUCIBLE': 'target can not be produced from the organism compounds',
+                   'REACTION_LIMIT': 'no pathway with --limit_reactions or fewer reactions',
+                   'NO_PATH_FOUND': 'solver did not find a pathway',
+                   'TIMEOUT': 'time limit of the target (--target_time_limit) was reached'}
 
 def verbose_print(verbose, line):
     if verbose:
         print(line)
 
+class SolutionSet(list):
+    """List of pathways (lists of reactions) with constant time checks for already identified pathways"""
+    def __init__(self):
+        '''Initialize class'''
+        list.__init__(self)
+        self.seen = set()
+
+    def append(self, solution):
+        list.append(self, solution)
+        self.seen.add(frozenset(solution))
+
+    def __contains__(self, solution):
+        return frozenset(solution) in self.seen
+
 class IntergerProgram(object):
     """Sets final constraints and solved integer linear program"""
-    def __init__(self, db, limit_reactions, limit_cycle, k_paths, cycle, verbose, time_limit, OUTPUT):
+    def __init__(self, db, limit_reactions, limit_cycle, k_paths, cycle, verbose, time_limit, OUTPUT, solver='glpk',
+                 search_mode='ilp', heuristic_paths=5, lazy_cycles='False', solution_threshold=150,
+                 cycle_check_threshold=350, result_cache=None, target_time_limit='None'):
         '''initialize class'''
         self.limit_cycle = limit_cycle
         self.limit_reactions = limit_reactions
@@ -23,36 +54,39 @@ class IntergerProgram(object):
         self.verbose = verbose
         self.DB = db
         self.OUTPUT = OUTPUT
-
-    def set_row_bounds(self, lp):
-        '''Set row bounds'''
+        self.solver = solvers.get_solver(solver, time_limit)
+        self.search_mode = search_mode
+        self.heuristic_paths = heuristic_paths
+        self.lazy_cycles = lazy_cycles
+        if self.lazy_cycles == 'True' and not self.solver.callbacks:
+            print ('WARNING:\tSolver {} does not have callbacks, cycles are eliminated by solving again'.format(self.solver.name))
+        self.reachability = None
+        self.reachability_id = None
+        self.reaction_classes = []
+        self.organism_profiles = {}
+        self.solution_threshold = solution_threshold
+        self.total_allowable_cyclecheck = cycle_check_threshold
+        self.result_cache = result_cache
+        self.problem_hash = None
+        self.no_path_reason = None
+        self.target_time_limit = target_time_limit
+        self.deadline = None
+        self.timed_out = False
+
+    def set_row_bounds(self):
+        '''Set row bounds (stored in the target overlay, base LP is not altered)'''
         verbose_print(self.verbose, 'STATUS:\tSetting compound constraints ...')
-        for count, key in enumerate(lp.constraints):
-            try:
-                inmet = self.incpds.index(self.allcpds[count])
-                lp.constraints[key].changeRHS(-10000000000000)
-            except ValueError:
-                if self.allcpds[count] == self.target:
-                    lp.constraints[key].sense = 0
-
-                    lp.constraints[key].changeRHS(1)
-                else:
-                    lp.constraints[key].changeRHS(0)
-            except IndexError:
-                pass
-        return lp
-
-    def set_objective_function(self, variables):
-        '''Set objective function '''
+        self.overlay.clear_rows()
+        self.overlay.set_row_profile(self.profile['rows'], -10000000000000)
+        target_row = self.reachability.cpd_index.get(self.target)
+        if target_row is not None and not self.available[target_row]:
+            self.overlay.set_row(target_row, 1, sense=0)
+
+    def set_objective_function(self):
+        '''Set objective function (1 for reactions not in the organism)'''
         verbose_print(self.verbose, 'STATUS:\tGenerating objective function coefficients ...')
         start = timer()
-        obj = [0]*len(variables)
-        for count, variable in enumerate(variables):
-            reaction = deepcopy(self.allrxnsrev_dict[str(variable)])
-            reaction = re.sub('_F$', '', reaction)
-            reaction = re.sub('_R$', '', reaction)
-            if reaction not in self.inrxns:
-                obj[count] = 1
+        obj = list(self.profile['objective'])
         end = timer()
         verbose_print(self.verbose, "INFO:\tTime(seconds) to set objective function "+str(self.target)+' '+str(end - start))
         if self.OUTPUT:
@@ -76,66 +110,79 @@ class IntergerProgram(object):
         if solution not in self.allsolutions:
             self.allsolutions.append(solution)
 
-    def ip_calculate(self, lp, variables, obj):
-        '''Run glpk solver'''
+    def ip_calculate(self, obj):
+        '''Run solver (solves are counted for the current enumeration phase)'''
         start = timer()
         solution = []
         solution_internal = []
-        lp.setObjective(pulp.lpSum(obj[i]*variables[i] for i in range(len(obj))))
-
-        verbose_print(self.verbose, 'STATUS:\tSolving problem for {}...'.format(self.target))
-        if self.time_limit == 'None':
-            lp.solve(pulp.GLPK(msg=0))
-        else:
-            tmlim = str(int(self.time_limit)*60)
-            lp.solve(pulp.GLPK(msg=0, options=['--tmlim', tmlim]))
-        #print (lp.objective.value())
-        for variable in variables:
-            if variable.value() != 0 and variable.value() is not None:
-                if variable.name.startswith('Cycle Variable') or variable.name.startswith('cycle'):
-                    pass
+        if self.deadline is not None and start >= self.deadline:
+            self.timed_out = True
+        if self.timed_out:
+            self.no_path_reason = 'TIMEOUT'
+            return solution, solution_internal
+        verbose_print(self.verbose, 'STATUS:\tSolving problem for {} ({})...'.format(self.target, self.solver.name))
+        cycle_cuts = self.lazy_cycle_cuts if self.cycle == 'True' and self.lazy_cycles == 'True' else None
+        values = self.solver.solve(self.lp, self.variables, obj, self.overlay, mip_start=self.last_values,
+                                   cycle_cuts=cycle_cuts)
+        if None not in values:
+            self.last_values = values
+        self.solve_count += 1
+        if self.solver.stats['nodes'] != 'NA':
+            self.solve_nodes += self.solver.stats['nodes']
+        self.solve_time += self.solver.stats['time']
+        self.solve_count += self.solver.stats['cycle_restarts']
+        self.phase_solves[self.phase] += 1+self.solver.stats['cycle_restarts']
+        verbose_print(self.verbose, 'INFO:	Solver ({}) nodes {}, time(seconds) {}, warm start {}, restarts for cycles {} for target {}'.format(self.solver.name, self.solver.stats['nodes'], self.solver.stats['time'], self.solver.stats['warm_start'], self.solver.stats['cycle_restarts'], self.target))
+        if self.deadline is not None and timer() >= self.deadline:
+            '''Solve was stopped by the time limit of the target, solution may not be optimal'''
+            self.timed_out = True
+            self.no_path_reason = 'TIMEOUT'
+            return solution, solution_internal
+        for column, value in enumerate(values):
+            if value:
+                if self.external[column]:
+                    solution.append(self.registry.reactions[column])
                 else:
-                    rxn_sol = deepcopy(self.allrxnsrev_dict[variable.name])
-                    if rxn_sol.endswith('_F'):
-                        rxn_sol = re.sub('_F$', '', rxn_sol)
-                    elif rxn_sol.endswith('_R'):
-                        rxn_sol = re.sub('_R$', '', rxn_sol)
-                    if rxn_sol not in self.inrxns:
-                        solution.append(self.allrxnsrev_dict[variable.name])
-                    else:
-                        solution_internal.append(self.allrxnsrev_dict[variable.name])
-        if self.limit_reactions != 'None' and len(solution) > int(self.limit_reactions):
-            print ('STATUS:\tPath contains too many reaction steps, consider increasing limit up from {} for target {}'.format(self.limit_reactions, self.target))
-            solution = []
-            solution_internal = []
+                    solution_internal.append(self.registry.reactions[column])
+        assert self.limit_reactions == 'None' or len(solution) <= int(self.limit_reactions)
         end = timer()
         verbose_print(self.verbose, "INFO:\tTime(seconds) to solve for specific path "+str(self.target)+' '+str(end - start))
         if self.OUTPUT:
             self.OUTPUT.output_timer('Solve for specific path for {}\t{}\t{}\n'.format(self.target, (end-start), (end-start)/60))
         return solution, solution_internal
 
-    def set_lp_problem(self, lp, variables):
-        lp = self.set_row_bounds(lp)
-        obj = self.set_objective_function(variables)
-        return (lp, obj)
+    def set_lp_problem(self):
+        self.set_row_bounds()
+        return self.set_objective_function()
+
+    def set_reaction_limit(self, obj):
+        '''
+        Limit number of external reactions in a pathway (--limit_reactions)
+        with a constraint over the external reaction variables of the target
+        '''
+        if self.limit_reactions == 'None':
+            return
+        columns = [column for column in np.nonzero(self.kept)[0].tolist() if obj[column]]
+        if len(columns) > int(self.limit_reactions):
+            self.overlay.add_cut('Reaction limit constraint', columns, -1, int(self.limit_reactions))
 
-    def initiate_cycle_check(self, solution, solution_internal, lp, variables, obj, cycle_check_count, initialcheck_value=False):
+    def initiate_cycle_check(self, solution, solution_internal, obj, initialcheck=False):
         if self.cycle == 'True' and solution:
             '''Check for cycles in pathway'''
-            solution, solution_internal, lp, variables, obj = self.cycle_constraints(lp, variables, solution, solution_internal,
-                                                                                     obj, cycle_check_count, initialcheck_value)
+            solution, solution_internal = self.cycle_constraints(solution, solution_internal, obj, initialcheck)
         elif not solution:
             verbose_print(self.verbose, 'STATUS:\tSolution for compound {} is empty therefore not performing cycle check'.format(self.target))
-        return (solution, solution_internal, lp, variables, obj)
+        return (solution, solution_internal)
 
-    def initiate_internal_cycle_check(self, solution, lp, variables, obj, cycle_check_count, length_external):
+    def initiate_internal_cycle_check(self, solution, obj, length_external):
         if self.cycle == 'True' and solution:
-            solution, lp, variables, obj = self.cycle_constraints_internal(lp, variables, solution, obj, cycle_check_count, length_external)
+            solution = self.cycle_constraints_internal(solution, obj, length_external)
         elif not solution:
             verbose_print(self.verbose, 'STATUS:\tSolution for compound {} is empty therefore not performing cycle check'.format(self.target))
-        return (solution, lp, variables, obj)
+        return solution
 
     def filling_optimal_solution_arrays(self, solution, solution_internal, op, op_internal):
+        '''Add new solution to op (op_internal if it has internal reactions)'''
         check_new_solution=True
         check_solution_threshold=True
         if solution_internal and solution and solution not in op_internal and len(op_internal) <= self.solution_threshold and len(op) <= self.solution_threshold:
@@ -143,7 +190,7 @@ class IntergerProgram(object):
 
         elif not solution_internal and solution and solution not in op and len(op_internal) <= self.solution_threshold and len(op) <= self.solution_threshold:
             op.append(solution)
-        
+
         elif not solution_internal and not solution:
             verbose_print(self.verbose, 'STATUS:\tBoth solution and solution internal are empty for target {} therefore not filling final solution arrays'.format(self.target))
             check_new_solution=False
@@ -159,55 +206,301 @@ class IntergerProgram(object):
         if len(op) > self.solution_threshold:
             check_solution_threshold=False
             check_new_solution=False
- 
-        return(op, op_internal, check_new_solution, check_solution_threshold)
 
-    def initiate_multiple_solutions(self, solution, lp, variables, obj, op, op_internal, count_k_paths):
+        return(check_new_solution, check_solution_threshold)
+
+    def initiate_multiple_solutions(self, worklist, solution, obj, op_internal):
         if self.multiplesolutions == 'True' and solution:
             '''Check for multiple solutions'''
-            op = self.multiple_optimal_solution(lp, variables, obj, solution, op, op_internal, count_k_paths)
-        elif not solution: 
+            worklist.append(('optimal', 0, solution, obj, op_internal))
+        elif not solution:
             verbose_print(self.verbose, 'STATUS:\tSolution for compound {} is empty therefore not performing going to get multiple optimal solutions'.format(self.target))
 
-        return op
-    
-    # def initiate_identification_of_internal_rxns(self,):
+    def load(self, LP):
+        '''Load database problem into solver and reachability pruning (done once for all targets)'''
+        self.solver.load(LP.lp, LP.variables, LP.A_matrix, LP.reversible_pairs)
+        self.registry = LP.registry
+        self.reaction_classes = LP.reaction_classes
+        if self.reachability_id != id(LP.lp):
+            self.reachability = ra.Reachability(LP.A_matrix, LP.allcpds)
+            self.cyclecheck = cc.CycleCheck(LP.A_matrix)
+            self.organism_profiles = {}
+            if self.result_cache is not None:
+                self.problem_hash = rc.problem_hash(LP.A_matrix, self.registry.reactions, LP.allcpds, LP.variables)
+            if self.search_mode != 'ilp':
+                self.pathsearch = gs.PathSearch(LP.A_matrix, LP.allcpds)
+            self.reachability_id = id(LP.lp)
+
+    def organism_profile(self, incpds, inrxns):
+        '''
+        Organism specific parts of the problem (compounds of the organism as
+        row mask and rows, compounds the organism can produce, reactions not in
+        the organism as column mask and objective coefficients), computed once
+        per organism and shared by all of its targets
+        '''
+        key = (frozenset(incpds), frozenset(inrxns))
+        if key not in self.organism_profiles:
+            if len(self.organism_profiles) > 10:
+                self.organism_profiles.pop(next(iter(self.organism_profiles)))
+            available = self.reachability.compound_mask(incpds)
+            external = self.registry.external_mask(inrxns)
+            self.organism_profiles[key] = {'available': available,
+                                           'producible': self.reachability.organism_forward(incpds)[1],
+                                           'rows': np.nonzero(available)[0],
+                                           'external': external,
+                                           'objective': external.astype(int).tolist()}
+        return self.organism_profiles[key]
+
+    def target_status(self, incpds, inrxns, target):
+        '''
+        Reason code (NO_PATH_REASONS) for a target that can not be produced from the organism
+        compounds (network scope of the organism), None if the target is producible
+        '''
+        if target not in self.reachability.cpd_index:
+            return 'NOT_IN_DATABASE'
+        if not self.organism_profile(incpds, inrxns)['producible'][self.reachability.cpd_index[target]]:
+            return 'NOT_PRODUCIBLE'
+        return None
+
+    def subnetwork_size(self, incpds, target):
+        '''Number of reaction variables kept by reachability pruning for target (0 if not producible)'''
+        kept = self.reachability.prune(incpds, target)
+        return 0 if kept is None else int(kept.sum())
+
+    def prune_variables(self):
+        '''
+        Fix reaction variables outside of the reachable subnetwork to 0,
+        returns False if target can not be produced from the organism compounds
+        '''
+        start = timer()
+        kept = self.reachability.prune(self.incpds, self.target)
+        end = timer()
+        if kept is None:
+            self.no_path_reason = 'NOT_IN_DATABASE' if self.target not in self.reachability.cpd_index else 'NOT_PRODUCIBLE'
+            verbose_print(self.verbose, 'STATUS:\tTarget {} is not producible from organism compounds therefore not solving'.format(self.target))
+            if self.OUTPUT:
+                self.OUTPUT.output_timer('Reachability pruning for {} (not producible)\t{}\t{}\n'.format(self.target, (end-start), (end-start)/60))
+            return False
+        kept, collapsed = self.collapse_equivalent_reactions(kept)
+        self.kept = kept
+        self.overlay.set_pruned(np.nonzero(~kept)[0].tolist())
+        verbose_print(self.verbose, 'INFO:\tReachability pruning kept {} of {} reaction variables ({} reactions with identical stoichiometry collapsed) for target {}'.format(int(kept.sum()), len(kept), collapsed, self.target))
+        if self.OUTPUT:
+            self.OUTPUT.output_timer('Reachability pruning for {} ({} of {} variables kept)\t{}\t{}\n'.format(self.target, int(kept.sum()), len(kept), (end-start), (end-start)/60))
+        return True
+
+    def collapse_equivalent_reactions(self, kept):
+        '''
+        Keeps one reaction variable of each class of reactions with identical
+        stoichiometry (internal and external reactions of the organism are kept
+        apart because their costs differ), other reactions of a class are
+        added back to pathways by expand_equivalent_reactions
+        '''
+        kept = kept.copy()
+        self.equivalent_rxns = {}
+        collapsed = 0
+        for reaction_class in self.reaction_classes:
+            representatives = {}
+            for column in reaction_class:
+                if not kept[column]:
+                    continue
+                rxn = self.registry.reactions[column]
+                internal = not self.external[column]
+                if internal in representatives:
+                    self.equivalent_rxns[representatives[internal]].append(rxn)
+                    kept[column] = False
+                    collapsed += 1
+                else:
+                    representatives[internal] = rxn
+                    self.equivalent_rxns[rxn] = [rxn]
+        return kept, collapsed
+
+    def expand_equivalent_reactions(self, optimalsolutions):
+        '''
+        Adds pathways for every combination of reactions with identical
+        stoichiometry to the reactions of the identified pathways
+        '''
+        self.expanded = SolutionSet()
+        self.expanded_limit = False
+        expanded = []
+        for solution in optimalsolutions:
+            expanded.extend(self.expand_pathway(solution))
+            if self.expanded_limit:
+                break
+        return expanded
+
+    def expand_pathway(self, solution):
+        '''
+        Yields pathways for every combination of reactions with identical
+        stoichiometry to the reactions of solution (pathways not yet yielded for the target)
+        '''
+        for combination in itertools.product(*[self.equivalent_rxns.get(rxn, [rxn]) for rxn in solution]):
+            if len(self.expanded) > self.solution_threshold:
+                print ('STATUS:\tNumber of pathways with reactions of identical stoichiometry exceeded limit {} for target {}'.format(self.solution_threshold, self.target))
+                self.expanded_limit = True
+                return
+            if list(combination) not in self.expanded:
+                self.expanded.append(list(combination))
+                yield list(combination)
+
+    def heuristic_pathways(self, variables):
+        '''
+        Best-first search for up to heuristic_paths pathways, returns
+        (number of external reactions, feasible for ILP, columns) for each pathway
+        '''
+        start = timer()
+        obj = self.set_objective_function()
+        active = self.kept & np.array([variable.upBound != 0 for variable in variables])
+        limit = None if self.limit_reactions == 'None' else int(self.limit_reactions)
+        pathways = self.pathsearch.k_pathways(self.incpds, self.target, obj, active,
+                                              self.heuristic_paths, limit)
+        end = timer()
+        for count, feasible, columns in pathways:
+            verbose_print(self.verbose, 'INFO:\tHeuristic pathway with {} external reactions (ILP feasible {}) for target {}'.format(count, feasible, self.target))
+        if self.OUTPUT:
+            self.OUTPUT.output_timer('Heuristic search for {} ({} pathways)\t{}\t{}\n'.format(self.target, len(pathways), (end-start), (end-start)/60))
+        return pathways
+
+    def run_heuristic(self, LP, incpds, inrxns, target_compound_ID):
+        '''Identify pathways with best-first search of the database network instead of solving the ILP'''
+        self.inrxns = inrxns
+        self.incpds = incpds
+        self.target = target_compound_ID
+        self.overlay = lo.TargetOverlay()
+        self.load(LP)
+        self.profile = self.organism_profile(incpds, inrxns)
+        self.external = self.profile['external']
+        self.no_path_reason = 'NO_PATH_FOUND'
+        optimalsolutions = []
+        if not self.prune_variables():
+            return optimalsolutions
+        for count, feasible, columns in self.heuristic_pathways(LP.variables):
+            solution = [self.registry.reactions[column] for column in columns if self.external[column]]
+            if solution and sorted(solution) not in [sorted(op) for op in optimalsolutions]:
+                optimalsolutions.append(solution)
+        return self.expand_equivalent_reactions(optimalsolutions)
+
+    def heuristic_mip_start(self, variables):
+        '''Use cheapest ILP feasible heuristic pathway as MIP start (upper bound) for the first solve'''
+        for count, feasible, columns in self.heuristic_pathways(variables):
+            if feasible:
+                columns = set(columns)
+                self.last_values = [1 if column in columns else 0 for column in range(len(variables))]
+                verbose_print(self.verbose, 'STATUS:\tUsing heuristic pathway with {} external reactions as MIP start for target {}'.format(count, self.target))
+                return
 
     def run_glpk(self, LP, incpds, inrxns, target_compound_ID, multiplesolutions=True):
         '''Final set up and solve integer linear program'''
+        return list(self.iter_glpk(LP, incpds, inrxns, target_compound_ID, multiplesolutions))
+
+    def iter_glpk(self, LP, incpds, inrxns, target_compound_ID, multiplesolutions=True):
+        '''
+        Generator yielding each pathway as soon as it is identified, pathways
+        are retrieved from the result cache (--result_cache) when the same
+        problem was solved in a previous run
+        '''
+        if self.result_cache is None:
+            for pathway in self.identify_pathways(LP, incpds, inrxns, target_compound_ID, multiplesolutions):
+                yield pathway
+            return
+        start = timer()
+        self.load(LP)
+        key = self.result_cache.key(self.problem_hash, sorted(incpds), sorted(inrxns), target_compound_ID,
+                                    self.limit_reactions, self.limit_cycle, self.k_paths, self.cycle,
+                                    multiplesolutions, self.solver.name, self.time_limit,
+                                    self.solution_threshold, self.total_allowable_cyclecheck)
+        pathways = self.result_cache.get(key)
+        end = timer()
+        verbose_print(self.verbose, 'INFO:\tResult cache {} for target {} (hits {}, misses {})'.format('hit' if pathways is not None else 'miss', target_compound_ID, self.result_cache.hits, self.result_cache.misses))
+        if self.OUTPUT:
+            self.OUTPUT.output_timer('Result cache {} for {} (hits {}, misses {})\t{}\t{}\n'.format('hit' if pathways is not None else 'miss', target_compound_ID, self.result_cache.hits, self.result_cache.misses, (end-start), (end-start)/60))
+        if pathways is not None:
+            self.timed_out = False
+            self.no_path_reason = self.target_status(incpds, inrxns, target_compound_ID) or 'NO_PATH_FOUND'
+            for pathway in pathways:
+                yield pathway
+            return
+        pathways = []
+        for pathway in self.identify_pathways(LP, incpds, inrxns, target_compound_ID, multiplesolutions):
+            pathways.append(pathway)
+            yield pathway
+        if not self.timed_out:
+            self.result_cache.put(key, pathways)
+
+    def identify_pathways(self, LP, incpds, inrxns, target_compound_ID, multiplesolutions=True):
+        '''
+        Final set up and solve integer linear program, generator yielding each
+        pathway as soon as it is identified
+        '''
         '''Set initial variables'''
         self.inrxns = inrxns
         self.incpds = incpds
         self.target = target_compound_ID
         self.allcpds = LP.allcpds
-        self.allrxnsrev_dict = LP.allrxnsrev_dict
-        self.allrxnsrev_dict_rev = LP.allrxnsrev_dict_rev
-        self.allsolutions = []
-        self.k_bounds = []
+        self.lp = LP.lp
+        self.variables = LP.variables
+        self.allsolutions = SolutionSet()
+        self.k_cuts = 0
         self.multiplesolutions = multiplesolutions
         self.allcyclesolutions = []
-        self.solution_threshold = 150
-        self.total_allowable_cyclecheck = 350
-        self.variables_strings = [str(variable) for variable in LP.variables]
-        optimalsolutions = []
-        optimalsolutions_internal = []
-   
+        self.overlay = lo.TargetOverlay()
+        self.load(LP)
+        self.profile = self.organism_profile(incpds, inrxns)
+        self.external = self.profile['external']
+        self.available = self.profile['available']
+        self.no_path_reason = 'NO_PATH_FOUND'
+        self.timed_out = False
+        if self.target_time_limit != 'None':
+            self.deadline = timer()+float(self.target_time_limit)*60
+        self.solver.deadline = self.deadline
+        self.last_values = None
+        self.solve_count = 0
+        self.solve_nodes = 0
+        self.solve_time = 0
+        self.phase = 'optimal'
+        self.phase_solves = dict((phase, 0) for phase in ENUMERATION_PHASES)
+        optimalsolutions = SolutionSet()
+        optimalsolutions_internal = SolutionSet()
+        self.expanded = SolutionSet()
+        self.expanded_limit = False
+
         '''Set problem bounds and solve'''
-        lp, obj = self.set_lp_problem(LP.lp, LP.variables)
-        solution, solution_internal = self.ip_calculate(lp, LP.variables, obj)
+        if not self.prune_variables():
+            return
+        if self.search_mode == 'hybrid':
+            self.heuristic_mip_start(LP.variables)
+        obj = self.set_lp_problem()
+        self.set_reaction_limit(obj)
+        solution, solution_internal = self.ip_calculate(obj)
+        if not solution and not solution_internal and self.limit_reactions != 'None' and not self.timed_out:
+            print ('STATUS:\tNo path with {} or fewer reaction steps, consider increasing limit for target {}'.format(self.limit_reactions, self.target))
+            self.no_path_reason = 'REACTION_LIMIT'
         self.fill_allsolutions(solution)
-        solution, solution_internal, lp, variables, obj =  self.initiate_cycle_check(solution, solution_internal, lp, LP.variables, obj, 0, initialcheck_value=True)
-        optimalsolutions, optimalsolutions_internal, check_new_solution, check_solution_threshold =  self.filling_optimal_solution_arrays(solution, solution_internal, optimalsolutions, optimalsolutions_internal)
-        optimalsolutions =  self.initiate_multiple_solutions(solution, lp, variables, obj, optimalsolutions, optimalsolutions_internal, 0)
+        solution, solution_internal = self.initiate_cycle_check(solution, solution_internal, obj, initialcheck=True)
+        self.filling_optimal_solution_arrays(solution, solution_internal, optimalsolutions, optimalsolutions_internal)
+        worklist = []
+        self.initiate_multiple_solutions(worklist, solution, obj, optimalsolutions_internal)
 
         '''This is check that is needed only if multiple solutions were not identified and one wants to get then internal rxns of the one solution'''
         if multiplesolutions == 'False' and solution_internal:
-            optimalsolutions, variables = self.identify_internal_rxns(LP.variables, optimalsolutions,
-                                                                      optimalsolutions_internal, lp)
-
+            worklist.append(('internal', optimalsolutions_internal))
+        for solution in self.enumerate_pathways(worklist, optimalsolutions):
+            for pathway in self.expand_pathway(solution):
+                yield pathway
+            if self.expanded_limit:
+                break
+
+        self.solver.deadline = None
+        if self.timed_out:
+            print ('STATUS:\tTime limit of {} minutes reached for target {} (TIMEOUT), {} pathways were identified before the limit'.format(self.target_time_limit, self.target, len(self.expanded)))
+            if self.OUTPUT:
+                self.OUTPUT.output_timer('Time limit reached for {} (TIMEOUT, {} pathways)\t{}\t{}\n'.format(self.target, len(self.expanded), float(self.target_time_limit)*60, float(self.target_time_limit)))
         if len(optimalsolutions) > self.solution_threshold:
             print ('STATUS:\tNumber of solutions {} exceeded limit {} therefore stopping search for target {}'.format(len(optimalsolutions), self.solution_threshold, self.target))
-        return optimalsolutions
+        phase_solves = ', '.join('{} {}'.format(phase, self.phase_solves[phase]) for phase in ENUMERATION_PHASES)
+        verbose_print(self.verbose, 'INFO:\tSolver ({}) solves {} ({}), nodes {}, time(seconds) {} for target {}'.format(self.solver.name, self.solve_count, phase_solves, self.solve_nodes, self.solve_time, self.target))
+        if self.OUTPUT:
+            self.OUTPUT.output_timer('Solver ({}) {} solves ({}) {} nodes for {}\t{}\t{}\n'.format(self.solver.name, self.solve_count, phase_solves, self.solve_nodes, self.target, self.solve_time, self.solve_time/60))
 
 
     def set_weight(self, number_rxn_steps):
@@ -217,175 +510,166 @@ class IntergerProgram(object):
         E = E-.01
         return E
 
-    def k_number_paths(self, lp, variables, obj, op, op_internal, count_k_paths):
+    def enumerate_pathways(self, worklist, op):
+        '''
+        Identify pathways until the worklist is empty, yields each pathway as
+        it is added to op, each task of the worklist is one solve of an
+        enumeration phase and adds the tasks that follow it (last added task is run first):
+            ('optimal', k, solution, obj, op_internal) next pathway with as many reactions as solution
+            ('k', k) shortest pathway of the next k level
+            ('internal', op_internal) internal reactions of pathways in op_internal
+        '''
+        count = 0
+        while True:
+            for solution in op[count:]:
+                yield solution
+            count = len(op)
+            if not worklist or self.timed_out:
+                return
+            task = worklist.pop()
+            self.phase = task[0]
+            if task[0] == 'optimal':
+                self.multiple_optimal_solution(worklist, op, *task[1:])
+            elif task[0] == 'k':
+                self.k_number_paths(worklist, op, *task[1:])
+            else:
+                self.identify_internal_rxns(worklist, op, *task[1:])
+
+    def next_k_level(self, worklist, op_internal, count_k_paths):
+        '''No more pathways at this k level, internal reactions are identified before moving to next level'''
+        worklist.append(('k', count_k_paths+1))
+        if op_internal:
+            worklist.append(('internal', op_internal))
+
+    def k_number_paths(self, worklist, op, count_k_paths):
         ''' 'retrieve the next shortest path '''
-        if count_k_paths <= self.k_paths:
-            obj = self.set_objective_function(variables)
-            verbose_print(self.verbose, '\nSTATUS:\tFinding {} suboptimal shortest path for target {}'.format(count_k_paths, self.target))
-            '''Solve for new pathway with new calculated weights'''
-
-            for count_solution, solution in enumerate(self.allsolutions):
-                if count_solution not in self.k_bounds:
-                    temp = []
-                    for r in solution:
-                        reaction = deepcopy(r)
-                        reaction = re.sub('_F$', '', reaction)
-                        reaction = re.sub('_R$', '', reaction)
-                        if reaction not in self.inrxns:
-                            temp.append(self.variables_strings.index(self.allrxnsrev_dict_rev[r]))
-                    lp += pulp.LpConstraint(pulp.lpSum(1*variables[j] for j in temp),
-                                            name='K pathway constraint '+str(count_solution),
-                                            sense=-1, rhs=len(temp)-1)
-                    self.k_bounds.append(count_solution)
-            solution, solution_internal = self.ip_calculate(lp, variables, obj)
-            self.fill_allsolutions(solution)
+        if count_k_paths > self.k_paths:
+            return
+        obj = self.set_objective_function()
+        verbose_print(self.verbose, '\nSTATUS:\tFinding {} suboptimal shortest path for target {}'.format(count_k_paths, self.target))
+        '''Solve for new pathway with new calculated weights'''
+
+        for count_solution in range(self.k_cuts, len(self.allsolutions)):
+            temp = [column for column in self.registry.columns(self.allsolutions[count_solution])
+                    if self.external[column]]
+            self.overlay.add_cut('K pathway constraint '+str(count_solution),
+                                 temp, -1, len(temp)-1)
+        self.k_cuts = len(self.allsolutions)
+        solution, solution_internal = self.ip_calculate(obj)
+        self.fill_allsolutions(solution)
 
-            '''If pathway is greater in steps than the previous path add too optimal solutions
-                check for multiple solution'''
-            solution, solution_internal, lp, variables, obj =  self.initiate_cycle_check(solution, solution_internal, lp, variables, obj, 0, initialcheck_value=False)
-            op, op_internal, check_new_solution, check_solution_threshold =  self.filling_optimal_solution_arrays(solution, solution_internal, op, op_internal)
-            if solution and check_new_solution and check_solution_threshold:
-                op = self.multiple_optimal_solution(lp, variables, obj, solution,
-                                                    op, op_internal, count_k_paths)
-            elif solution and (not check_new_solution or not check_solution_threshold):
-                if op_internal:
-                    op, variables = self.identify_internal_rxns(variables, op, op_internal, lp)
-        return op
- 
-    def identify_internal_rxns(self, variables, op, op_internal, lp):
-        internal_ignorerxns = []
+        '''If pathway is greater in steps than the previous path add too optimal solutions
+            check for multiple solution'''
+        solution, solution_internal = self.initiate_cycle_check(solution, solution_internal, obj)
+        op_internal = SolutionSet()
+        check_new_solution, check_solution_threshold = self.filling_optimal_solution_arrays(solution, solution_internal, op, op_internal)
+        if solution and check_new_solution and check_solution_threshold:
+            worklist.append(('optimal', count_k_paths, solution, obj, op_internal))
+        elif solution and op_internal:
+            worklist.append(('internal', op_internal))
+
+    def identify_internal_rxns(self, worklist, op, op_internal):
+        '''Identify internal reactions of pathways (fixed external reactions) in op_internal'''
         for orig_solution in op_internal:
-            for variable in variables:
-                rxn = self.allrxnsrev_dict[str(variable)]
-                reaction = deepcopy(self.allrxnsrev_dict[str(variable)])
-                reaction = re.sub('_F$', '', reaction)
-                reaction = re.sub('_R$', '', reaction)
-                if rxn in orig_solution:
-                    variable.lowBound = 1
-                    variable.upBound = 1
-                elif reaction not in self.inrxns:
-                    if variable.lowBound == 0 and variable.upBound == 0:
-                        internal_ignorerxns.append(rxn) 
-                    variable.lowBound = 0
-                    variable.upBound = 0
-
-            obj = self.set_objective_function_internal(variables)
-            solution_orig, solution_internal = self.ip_calculate(lp, variables, obj)
-            solution, lp, variables, obj = self.initiate_internal_cycle_check(solution_orig+solution_internal, lp, variables, obj, 0, len(solution_orig))
-            op, op_internal, check_new_solution, check_solution_threshold = self.filling_optimal_solution_arrays(solution, [], op, op_internal)
+            saved_bounds = self.overlay.snapshot_bounds()
+            for column in np.nonzero(self.external)[0].tolist():
+                self.overlay.set_bounds(column, 0, 0)
+            for column in self.registry.columns(orig_solution):
+                self.overlay.set_bounds(column, 1, 1)
+
+            obj = self.set_objective_function_internal(self.variables)
+            solution_orig, solution_internal = self.ip_calculate(obj)
+            solution = self.initiate_internal_cycle_check(solution_orig+solution_internal, obj, len(solution_orig))
+            check_new_solution, check_solution_threshold = self.filling_optimal_solution_arrays(solution, [], op, op_internal)
             '''Add pathway to all optimal solutions'''
 
             if solution and check_solution_threshold and check_new_solution:
                 verbose_print(self.verbose, 'STATUS:\tChecking for multiple optimal solutions internal ... ')
-                op = self.multiple_optimal_solution_internal(lp, variables, obj, solution_orig, op)
+                self.multiple_optimal_solution_internal(obj, solution_orig, op)
             elif not check_solution_threshold:
                 verbose_print(self.verbose, 'STATUS:\tEither solutions types internal {} and/or external {} have exceeded the solution threshold {} for target {}'.format(len(op_internal), len(op), self.solution_threshold, self.target))
 
-            for variable in variables:
-                rxn = self.allrxnsrev_dict[str(variable)]
-                if rxn.startswith('EX_') or rxn in internal_ignorerxns:
-                    variable.lowBound = 0
-                    variable.upBound = 0
-
-                else:
-                    variable.lowBound = 0
-                    variable.upBound = 1
+            '''Release reactions fixed for this solution'''
+            self.overlay.restore_bounds(saved_bounds)
         if not op:
             verbose_print(self.verbose, 'STATUS:\tNo initial solution found when checking pathway with internal reactions for compound {} therefore trying again'.format(self.target))
-            lp, obj = self.set_lp_problem(lp, variables)
-            solution, solution_internal = self.ip_calculate(lp, variables, obj)
+            obj = self.set_lp_problem()
+            solution, solution_internal = self.ip_calculate(obj)
             self.fill_allsolutions(solution)
-            solution, solution_internal, lp, variables, obj =  self.initiate_cycle_check(solution, solution_internal, lp, variables, obj, 0, initialcheck_value=True)
-            op, op_internal, check_new_solution, check_solution_threshold =  self.filling_optimal_solution_arrays(solution, solution_internal, op, op_internal)
-            op =  self.initiate_multiple_solutions(solution, lp, variables, obj, op, op_internal, 0)            
-        return op, variables
+            solution, solution_internal = self.initiate_cycle_check(solution, solution_internal, obj, initialcheck=True)
+            self.filling_optimal_solution_arrays(solution, solution_internal, op, op_internal)
+            self.initiate_multiple_solutions(worklist, solution, obj, op_internal)
 
-    def multiple_optimal_solution_internal(self, lp, variables, obj, originalsolution, op):
+    def multiple_optimal_solution_internal(self, obj, originalsolution, op):
         '''Find multiple solutions that use organisms internal reactions'''
-        E = self.set_weight(len(originalsolution))
-        for rxn in originalsolution:
-            index = self.variables_strings.index(self.allrxnsrev_dict_rev[rxn])
-            obj[index] = (1+E)
-        solution_orig, solution_internal = self.ip_calculate(lp, variables, obj)
-        if solution_orig not in op:
-            solution, lp, variables, obj = self.initiate_internal_cycle_check(solution_orig+solution_internal, lp, variables, obj, 0, len(solution_orig))
-            op, op_internal, check_new_solution, check_solution_threshold = self.filling_optimal_solution_arrays(solution, [], op, [])
-
-            if len(solution_orig) == len(originalsolution):
-                if check_new_solution and check_solution_threshold:
-                    op = self.multiple_optimal_solution_internal(lp, variables, obj, solution, op)
-                if not check_new_solution:
-                    verbose_print(self.verbose, 'STATUS:\tsolution with internal rxns for target {} not new therefore not adding to overall solutions ')
-                if not check_solution_threshold:
-                    verbose_print(self.verbose, 'STATUS:\tEither solutions types internal {} and/or external {} have exceeded the solution threshold {} for target {}'.format(len(op_internal), len(op), self.solution_threshold, self.target))
-            else:
-                verbose_print(self.verbose, 'STATUS:\tsolution with internal rxns for target {} not the same length as original therefore not adding to overall solutions')
-        else:
-            verbose_print(self.verbose, 'STATUS:\tsolution with internal rxns for target {} not new therefore not adding to overall solutions ')
-        return op
+        while True:
+            E = self.set_weight(len(originalsolution))
+            for rxn in originalsolution:
+                obj[self.registry.reaction_index[rxn]] = (1+E)
+            solution_orig, solution_internal = self.ip_calculate(obj)
+            if solution_orig in op:
+                verbose_print(self.verbose, 'STATUS:\tsolution with internal rxns for target {} not new therefore not adding to overall solutions'.format(self.target))
+                return
+            solution = self.initiate_internal_cycle_check(solution_orig+solution_internal, obj, len(solution_orig))
+            op_internal = []
+            check_new_solution, check_solution_threshold = self.filling_optimal_solution_arrays(solution, [], op, op_internal)
+            if len(solution_orig) != len(originalsolution):
+                verbose_print(self.verbose, 'STATUS:\tsolution with internal rxns for target {} not the same length as original therefore not adding to overall solutions'.format(self.target))
+                return
+            if not check_new_solution:
+                verbose_print(self.verbose, 'STATUS:\tsolution with internal rxns for target {} not new therefore not adding to overall solutions'.format(self.target))
+            if not check_solution_threshold:
+                verbose_print(self.verbose, 'STATUS:\tEither solutions types internal {} and/or external {} have exceeded the solution threshold {} for target {}'.format(len(op_internal), len(op), self.solution_threshold, self.target))
+            if not check_new_solution or not check_solution_threshold:
+                return
+            originalsolution = solution
 
-    def multiple_optimal_solution(self, lp, variables, obj, originalsolution, op, op_internal, count_k_paths):
-        '''Identify multiple solutions'''
+    def multiple_optimal_solution(self, worklist, op, count_k_paths, originalsolution, obj, op_internal):
+        '''Identify next pathway with the same number of reactions as originalsolution'''
         '''Get weight'''
         E = self.set_weight(len(originalsolution))
 
         '''Set weight for reactions in objective function'''
         for rxn in originalsolution:
-            index = self.variables_strings.index(self.allrxnsrev_dict_rev[rxn])
-            obj[index] = (1+E)
-        solution, solution_internal = self.ip_calculate(lp, variables, obj)
+            obj[self.registry.reaction_index[rxn]] = (1+E)
+        solution, solution_internal = self.ip_calculate(obj)
         self.fill_allsolutions(solution)
-        if solution not in op+op_internal:
-            solution, solution_internal, lp, variables, obj = self.initiate_cycle_check(solution, solution_internal, lp, variables, obj, 0, initialcheck_value=False)
-            op, op_internal, check_new_solution, check_solution_threshold = self.filling_optimal_solution_arrays(solution, solution_internal, op, op_internal)
-
-            if len(solution) == len(originalsolution) and check_solution_threshold:
-                '''If pathway not already identified add to total solution and check for more '''
-                if check_new_solution:
-                    op = self.multiple_optimal_solution(lp, variables, obj, solution, op, op_internal, count_k_paths)
-                elif not check_new_solution:
-                    if op_internal:
-                        op, variables = self.identify_internal_rxns(variables, op, op_internal, lp)
-                    count_k_paths += 1
-                    op = self.k_number_paths(lp, variables, obj, op, [], count_k_paths)
-            elif len(solution) != len(originalsolution) and check_solution_threshold:
-                '''If solution is 0 or not the same length as previous solution check for next shortest solution'''
-                if check_solution_threshold:
-                    verbose_print(self.verbose, 'STATUS:\tNo longer seeking multiple solutions for target {} at k{} level because solution {} is different length than original solution {}'.format(self.target, count_k_paths, solution, originalsolution))
-                    if op_internal:
-                        op, variables = self.identify_internal_rxns(variables, op, op_internal, lp)
-                    count_k_paths += 1
-                    op = self.k_number_paths(lp, variables, obj, op, [], count_k_paths)
-
-            elif len(solution) == len(originalsolution) and not check_solution_threshold:
+        if solution in op or solution in op_internal:
+            self.next_k_level(worklist, op_internal, count_k_paths)
+            return
+        solution, solution_internal = self.initiate_cycle_check(solution, solution_internal, obj)
+        check_new_solution, check_solution_threshold = self.filling_optimal_solution_arrays(solution, solution_internal, op, op_internal)
+
+        if not check_solution_threshold:
+            if len(solution) == len(originalsolution):
                 verbose_print(self.verbose, 'STATUS:\tEither solutions types internal {} and/or external {} have exceeded the solution threshold {} for target {}'.format(len(op_internal), len(op), self.solution_threshold, self.target))
-                if op_internal:
-                        op, variables = self.identify_internal_rxns(variables, op, op_internal, lp)
-
-            elif len(solution) != len(originalsolution) and not check_solution_threshold:
+            else:
                 verbose_print(self.verbose, 'STATUS:\tEither solutions types internal {} and/or external {} have exceeded the solution threshold {} for target {} or solutions do not match in length'.format(len(op_internal), len(op), self.solution_threshold, self.target))
-                if op_internal:
-                    op, variables = self.identify_internal_rxns(variables, op, op_internal, lp)
-        else:
             if op_internal:
-                op, variables = self.identify_internal_rxns(variables, op, op_internal, lp)
-            count_k_paths += 1
-            op = self.k_number_paths(lp, variables, obj, op, [], count_k_paths)          
-        
-        return op
+                worklist.append(('internal', op_internal))
+        elif len(solution) == len(originalsolution) and check_new_solution:
+            '''If pathway not already identified add to total solution and check for more '''
+            worklist.append(('optimal', count_k_paths, solution, obj, op_internal))
+        else:
+            '''If solution is 0 or not the same length as previous solution check for next shortest solution'''
+            if len(solution) != len(originalsolution):
+                verbose_print(self.verbose, 'STATUS:\tNo longer seeking multiple solutions for target {} at k{} level because solution {} is different length than original solution {}'.format(self.target, count_k_paths, solution, originalsolution))
+            self.next_k_level(worklist, op_internal, count_k_paths)
 
-    def cycle_constraints(self, lp, variables, solution, solution_internal, obj, cycle_count, initialcheck=False):
+    def cycle_constraints(self, solution, solution_internal, obj, initialcheck=False):
         '''
         Check solution for cycles and implement new constraints and resolve
-        if cycle is identified
+        until the solution has no cycles
         '''
-        verbose_print(self.verbose, 'STATUS:\tChecking for cycles in the identified pathways for target {}'.format(self.target))
+        cycle_count = 0
+        while True:
+            verbose_print(self.verbose, 'STATUS:\tChecking for cycles in the identified pathways for target {}'.format(self.target))
 
-        '''Check if there is a cycle in identified pathway'''
-        cycletest_1 = self.run_cycle_check(solution)
-        original_solution = deepcopy(solution)
+            '''Check if there is a cycle in identified pathway'''
+            cycles = self.run_cycle_check(solution)
+            if not cycles:
+                return (solution, solution_internal)
 
-        if cycletest_1 is True:
             '''If pathway has cycle begin cycle elimination steps'''
             cycle_count += 1
             if (self.limit_cycle != 'None' and cycle_count > int(self.limit_cycle)) or cycle_count > self.total_allowable_cyclecheck:
@@ -395,69 +679,36 @@ class IntergerProgram(object):
                     print ('STATUS:\tExceeded number of code set cycle checks of {} for target {}'.format(self.total_allowable_cyclecheck, self.target))
                 else:
                     print ('STATUS:\tExceeded number of cycle checks, no pathways without cycles, consider increasing limit up from {} for target {}'.format(self.limit_cycle, self.target))
-                return ([], [], lp, variables, obj)
-
-            else:
-                '''If cycle checks have not been exceed or have been set to None set new constraints
-                    eliminate identification of pathway and solve for new shortest path'''
-                if solution not in self.allcyclesolutions:
-                    temp = []
-                    for r in solution:
-                        reaction = deepcopy(r)
-                        reaction = re.sub('_F$', '', reaction)
-                        reaction = re.sub('_R$', '', reaction)
-                        if reaction not in self.inrxns:
-                            temp.append(self.variables_strings.index(self.allrxnsrev_dict_rev[r]))
-                    self.allcyclesolutions.append(solution)
-                    try:
-                        lp += pulp.LpConstraint(pulp.lpSum(1*variables[j] for j in temp), name='cycle pathway constraint '+str(len(self.allcyclesolutions)), sense=-1, rhs=len(temp)-1)
-                    except pulp.PulpError:
-                        print ('WARNING:\tConstraint name error for compound {}'.format(self.target))
-                        raise pulp.PulpError
-
-                    solution, solution_internal = self.ip_calculate(lp, variables, obj)
-
-                    if initialcheck is False:
-                        if len(solution) == len(original_solution):
-                            solution, solution_internal, lp, variables, obj = self.cycle_constraints(lp, variables, solution,
-                                                                                                     solution_internal, obj, cycle_count)
-                            return (solution, solution_internal, lp, variables, obj)
-                        else:
-                            print ('WARNING:\tnew solution {} not the same number of reactions as the original {}  for target {}'.format(solution, original_solution, self.target))
-                            return ([], [], lp, variables, obj)
-                    else:
-                        if solution:
-                            verbose_print(self.verbose, 'STATUS:\tCheck for cycle for solution {} for target {}'.format(solution, self.target))
-                            solution, solution_internal, lp, variables, obj = self.cycle_constraints(lp, variables, solution,
-                                                                                                     solution_internal, obj, cycle_count,
-                                                                                                     initialcheck=True)
-                            return (solution, solution_internal, lp, variables, obj)
-                        else:
-                            verbose_print(self.verbose, 'STATUS:\tNo solution for target {}'.format(self.target))
-                            return (solution, solution_internal, lp, variables, obj)
-
-                else:
-                    return ([], [], lp, variables, obj)
-
-        elif cycletest_1 is False:
-            return (solution, solution_internal, lp, variables, obj)
-
-        elif cycletest_1 is None:
-            print('WARNING:\tunable to perform cycle check for target {} consider decreasing processors'.format(self.target))
-            return ([], [], lp, variables, obj)
-
-    def cycle_constraints_internal(self, lp, variables, solution,  obj, cycle_count, length_external):
+                return ([], [])
+
+            '''Set new constraints eliminating the reactions of each cycle and solve for new shortest path'''
+            if not self.add_cycle_cuts(cycles):
+                return ([], [])
+            original_solution = solution
+            solution, solution_internal = self.ip_calculate(obj)
+            if initialcheck is False and len(solution) != len(original_solution):
+                print ('WARNING:\tnew solution {} not the same number of reactions as the original {}  for target {}'.format(solution, original_solution, self.target))
+                return ([], [])
+            elif initialcheck and not solution:
+                verbose_print(self.verbose, 'STATUS:\tNo solution for target {}'.format(self.target))
+                return (solution, solution_internal)
+            elif initialcheck:
+                verbose_print(self.verbose, 'STATUS:\tCheck for cycle for solution {} for target {}'.format(solution, self.target))
+
+    def cycle_constraints_internal(self, solution, obj, length_external):
         '''
         Check solution for cycles and implement new constraints and resolve
-        if cycle is identified
+        until the solution has no cycles
         '''
-        verbose_print(self.verbose, 'STATUS:\tChecking for cycles in the identified internal pathways for target {}'.format(self.target))
+        cycle_count = 0
+        while True:
+            verbose_print(self.verbose, 'STATUS:\tChecking for cycles in the identified internal pathways for target {}'.format(self.target))
 
-        '''Check if there is a cycle in identified pathway'''
-        cycletest_2 = self.run_cycle_check(solution)
-        # original_solution = deepcopy(solution)
+            '''Check if there is a cycle in identified pathway'''
+            cycles = self.run_cycle_check(solution)
+            if not cycles:
+                return solution
 
-        if cycletest_2 is True:
             '''If pathway has cycle begin cycle elimination steps'''
             cycle_count += 1
             if (self.limit_cycle != 'None' and cycle_count > int(self.limit_cycle)) or cycle_count > self.total_allowable_cyclecheck:
@@ -467,74 +718,59 @@ class IntergerProgram(object):
                     print ('STATUS:\tExceeded number of code set cycle checks of {} for target {}'.format(self.total_allowable_cyclecheck, self.target))
                 else:
                     print ('STATUS:\tPath (internal) exceeded number of cycle checks, no pathways without cycles, consider increasing limit up from {} for target {}'.format(self.limit_cycle, self.target))
-                return ([], lp, variables, obj)
-
-            else:
-                '''If cycle checks have not been exceed or have been set to None set new constraints
-                    eliminate identification of pathway and solve for new shortest path'''
-                if solution not in self.allcyclesolutions:
-                    temp = []
-                    for r in solution:
-                        reaction = deepcopy(r)
-                        reaction = re.sub('_F$', '', reaction)
-                        reaction = re.sub('_R$', '', reaction)
-                        if reaction not in self.inrxns:
-                            temp.append(self.variables_strings.index(self.allrxnsrev_dict_rev[r]))
-                    self.allcyclesolutions.append(solution)
-                    lp += pulp.LpConstraint(pulp.lpSum(1*variables[j] for j in temp), name='cycle pathway constraint '+str(len(self.allcyclesolutions)), sense=-1, rhs=len(temp)-1)
-                    solution, solution_internal = self.ip_calculate(lp, variables, obj)
-                    if len(solution) == length_external:
-                        solution, lp, variables, obj = self.cycle_constraints_internal(lp, variables,
-                                                                                        solution+solution_internal,
-                                                                                        obj, cycle_count, len(solution))
-                        return (solution, lp, variables, obj)
-                    else:
-                        print ('WARNING:\tnew solution {} different length than original {} for target {}'.format(len(solution), length_external, self.target))
-                        return ([], lp, variables, obj)
-        elif cycletest_2 is False:
-            return(solution, lp, variables, obj)
-
-        elif cycletest_2 is None:
-            print('WARNING:\tunable to perform cycle check for target {} consider decreasing processors'.format(self.target))
-            return ([], lp, variables, obj)
+                return []
+
+            '''Set new constraints eliminating the reactions of each cycle and solve for new shortest path'''
+            if not self.add_cycle_cuts(cycles):
+                return []
+            solution, solution_internal = self.ip_calculate(obj)
+            if len(solution) != length_external:
+                print ('WARNING:\tnew solution {} different length than original {} for target {}'.format(len(solution), length_external, self.target))
+                return []
+            solution = solution+solution_internal
+
+    def add_cycle_cuts(self, cycles):
+        '''
+        Add a constraint for each new cycle so the reactions of the cycle can
+        not all be in a pathway, returns False if all cycles were already eliminated
+        '''
+        new_cycles = [cycle for cycle in cycles if cycle not in self.allcyclesolutions]
+        for cycle in new_cycles:
+            self.allcyclesolutions.append(cycle)
+            columns = self.registry.columns(cycle)
+            self.overlay.add_cut('cycle constraint '+str(len(self.allcyclesolutions)), columns, -1, len(columns)-1)
+        return bool(new_cycles)
+
+    def lazy_cycle_cuts(self, values):
+        '''
+        Called by the solver for each new incumbent, adds constraints for
+        cycles in the external reactions of the incumbent (same reactions
+        checked by cycle_constraints), returns True if constraints were added
+        '''
+        if len(self.allcyclesolutions) >= self.total_allowable_cyclecheck:
+            return False
+        columns = [column for column in np.nonzero(np.round(values) > 0)[0].tolist() if self.external[column]]
+        cycles = [[self.registry.reactions[column] for column in cycle]
+                  for cycle in self.cyclecheck.cycles(columns, self.available)]
+        if cycles:
+            verbose_print(self.verbose, 'STATUS:\tincumbent has cycles {} for target {}'.format(cycles, self.target))
+        return self.add_cycle_cuts(cycles)
 
     def run_cycle_check(self, solution):
         '''
-        Run cycle check
+        Run cycle check, retrieves reactions of the shortest cycle in each
+        strongly connected part of the pathway (reactions and compounds not
+        in the organism), empty list if pathway has no cycles
         '''
         if solution:
-            totalvariables = []
-            totalarcs = 0
-            for rxn in solution:
-                totalvariables.append(rxn)
-                match = re.search('_F$', rxn)
-                rxn_org = rxn
-                if match is not None:
-                    rxn_org = re.sub('_F$', '', rxn)
-                match = re.search('_R$', rxn)
-                if match is not None:
-                    rxn_org = re.sub('_R$', '', rxn)
-                reactants = self.DB.get_reactants(rxn_org)
-                products = self.DB.get_products(rxn_org)
-                if reactants is 'Errored' or products is 'Errored' or products is None or reactants is None:
-                    print('WARNING:\tcould not get reactants and/or products for cycle check for target {}'.format(self.target))
-                    return (None)
-                for reactant in reactants:
-                    if reactant  not in self.incpds:
-                        totalvariables.append(reactant)
-                        totalarcs += 1
-                for product in products:
-                    if product not in self.incpds:
-                        totalvariables.append(product)
-                        totalarcs += 1
-            # verbose_print(self.verbose, 'STATUS:\tfor path {} arcs {}, variables {}, set variables {} for target {}'.format(solution, totalarcs, totalvariables, set(totalvariables), self.target))
-            verbose_print(self.verbose, 'STATUS:\toptimal pathway {} for target {} has total arc count {} and total variable count -1 {}'.format(solution, self.target, totalarcs, len(set(totalvariables))-1))
-            if totalarcs > len(set(totalvariables))-1:
-                verbose_print(self.verbose, 'STATUS:\toptimal pathway {} has cycle for target {}'.format(solution, self.target))
-                return (True)
+            columns = self.registry.columns(solution)
+            cycles = [[self.registry.reactions[column] for column in cycle]
+                      for cycle in self.cyclecheck.cycles(columns, self.available)]
+            if cycles:
+                verbose_print(self.verbose, 'STATUS:\toptimal pathway {} has cycles {} for target {}'.format(solution, cycles, self.target))
             else:
                 verbose_print(self.verbose, 'STATUS:\tNo cycles were found in pathway {} for target {}'.format(solution, self.target))
-                return (False)
+            return cycles
         else:
             verbose_print(self.verbose, 'STATUS:\tpathway empty {} for target {}'.format(solution, self.target))
-            return (False)
\ No newline at end of file
+            return []
@@ -0,0 +1,120 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Per-target changes layered on top of the shared database LP'
+
+from contextlib import contextmanager
+import pulp
+
+
+class TargetOverlay(object):
+    """
+    Holds the target specific changes (row bounds, variable bounds and cuts)
+    for the integer linear program so the database LP built by
+    ConstructInitialLP can be shared (read only) between all targets
+    """
+    def __init__(self):
+        '''Initialize class'''
+        self.row_rhs = {}
+        self.row_sense = {}
+        self.profile_rows = []
+        self.profile_rhs = 0
+        self.bounds = {}
+        self.cuts = []
+        self.cut_names = set()
+        self.pruned = []
+        self.pruned_set = set()
+
+    def set_row(self, row, rhs, sense=None):
+        '''Set right hand side (and optionally the sense) of a database row'''
+        self.row_rhs[row] = rhs
+        if sense is not None:
+            self.row_sense[row] = sense
+
+    def set_row_profile(self, rows, rhs):
+        '''
+        Set right hand side of many database rows (i.e. compounds of the organism,
+        rows can be an array shared by all targets of the organism), set_row takes precedence
+        '''
+        self.profile_rows = rows
+        self.profile_rhs = rhs
+
+    def clear_rows(self):
+        '''Remove all row changes'''
+        self.row_rhs = {}
+        self.row_sense = {}
+        self.profile_rows = []
+        self.profile_rhs = 0
+
+    def set_bounds(self, column, lowbound, upbound):
+        '''Set bounds of a reaction variable (column)'''
+        self.bounds[column] = (lowbound, upbound)
+
+    def set_pruned(self, columns):
+        '''Fix reaction variables (columns) that can not be in a pathway for the target to 0'''
+        self.pruned = list(columns)
+        self.pruned_set = set(self.pruned)
+
+    def get_bounds(self, column, variables):
+        '''Retrieve bounds of a column, overlay value takes precedence over base LP'''
+        if column in self.bounds:
+            return self.bounds[column]
+        if column in self.pruned_set:
+            return (0, 0)
+        return (variables[column].lowBound, variables[column].upBound)
+
+    def snapshot_bounds(self):
+        '''Copy of current variable bound changes (used to restore them later)'''
+        return dict(self.bounds)
+
+    def restore_bounds(self, bounds):
+        '''Restore variable bound changes from a snapshot'''
+        self.bounds = dict(bounds)
+
+    def add_cut(self, name, columns, sense, rhs):
+        '''Add constraint over reaction variables (i.e. K pathway or cycle constraint)'''
+        if name in self.cut_names:
+            raise pulp.PulpError('overlapping constraint names: ' + name)
+        self.cut_names.add(name)
+        self.cuts.append((name, list(columns), sense, rhs))
+
+    @contextmanager
+    def applied(self, lp, variables):
+        '''
+        Temporarily apply overlay to the base pulp problem, base problem
+        is restored once the solve is complete
+        '''
+        rownames = list(lp.constraints)
+        saved_rows = {}
+        saved_bounds = {}
+        added = []
+        try:
+            profile_rows = set(int(row) for row in self.profile_rows)
+            for row in profile_rows | set(self.row_rhs) | set(self.row_sense):
+                constraint = lp.constraints[rownames[row]]
+                saved_rows[row] = (constraint.constant, constraint.sense)
+                if row in self.row_rhs:
+                    constraint.changeRHS(self.row_rhs[row])
+                elif row in profile_rows:
+                    constraint.changeRHS(self.profile_rhs)
+                if row in self.row_sense:
+                    constraint.sense = self.row_sense[row]
+            for column in self.pruned_set.union(self.bounds):
+                variable = variables[column]
+                saved_bounds[column] = (variable.lowBound, variable.upBound)
+                variable.lowBound, variable.upBound = self.get_bounds(column, variables)
+            for name, columns, sense, rhs in self.cuts:
+                constraint = pulp.LpConstraint(pulp.lpSum(1*variables[j] for j in columns),
+                                               name=name, sense=sense, rhs=rhs)
+                lp += constraint
+                added.append(constraint.name)
+            yield lp
+        finally:
+            for name in added:
+                del lp.constraints[name]
+            for column, (lowbound, upbound) in saved_bounds.items():
+                variables[column].lowBound = lowbound
+                variables[column].upBound = upbound
+            for row, (constant, sense) in saved_rows.items():
+                constraint = lp.constraints[rownames[row]]
+                constraint.constant = constant
+                constraint.sense = sense
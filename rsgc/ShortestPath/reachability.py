@@ -0,0 +1,93 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Prunes reaction variables that can not be part of a shortest path to a target'
+
+import numpy as np
+from scipy import sparse
+
+
+class Reachability(object):
+    """
+    Identifies the subnetwork of the database that can take part in a
+    shortest path from the compounds of an organism to a target. Pruning
+    keeps every reaction variable that can be in a feasible solution and
+    every reaction that can be in an optimal solution, so identified
+    pathways do not change
+    """
+    def __init__(self, A_matrix, allcpds):
+        '''Initialize class'''
+        A_matrix = sparse.csr_matrix(A_matrix)
+        self.produces = sparse.csr_matrix(A_matrix > 0, dtype=np.int32)
+        self.consumes = sparse.csr_matrix(A_matrix < 0, dtype=np.int32)
+        self.produces_T = self.produces.T.tocsr()
+        self.consumes_T = self.consumes.T.tocsr()
+        self.cpd_index = {cpd: count for count, cpd in enumerate(allcpds)}
+        self.forward_cache = {}
+
+    def compound_mask(self, cpds):
+        '''Boolean array of rows for a list of compounds'''
+        mask = np.zeros(self.produces.shape[0], dtype=bool)
+        rows = [self.cpd_index[cpd] for cpd in cpds if cpd in self.cpd_index]
+        mask[rows] = True
+        return mask
+
+    def forward(self, active, available):
+        '''
+        Removes reactions that consume a compound that is not available
+        (not in the organism and not produced by a remaining reaction) until no more
+        reactions are removed, reactions producing each other's reactants are kept
+        '''
+        while True:
+            producible = available | (self.produces.dot(active) > 0)
+            blocked = self.consumes_T.dot(~producible) > 0
+            if not (active & blocked).any():
+                return active, producible
+            active = active & ~blocked
+
+    def backward(self, active, available, target_row):
+        '''
+        Keeps reactions that produce the target or a compound needed
+        (transitively) to produce it, reactions consuming the target are
+        kept because the target row is an equality
+        '''
+        needed = np.zeros(self.produces.shape[0], dtype=bool)
+        needed[target_row] = True
+        useful = active & (self.consumes_T[:, [target_row]].toarray().ravel() > 0)
+        while True:
+            useful_new = useful | (active & (self.produces_T.dot(needed) > 0))
+            needed_new = needed | ((self.consumes.dot(useful_new) > 0) & ~available)
+            if not (needed_new ^ needed).any() and not (useful_new ^ useful).any():
+                return useful_new
+            useful = useful_new
+            needed = needed_new
+
+    def organism_forward(self, incpds):
+        '''Reactions that remain after forward pruning for an organism (cached)'''
+        key = frozenset(incpds)
+        if key not in self.forward_cache:
+            if len(self.forward_cache) > 10:
+                self.forward_cache.pop(next(iter(self.forward_cache)))
+            available = self.compound_mask(incpds)
+            active = np.ones(self.produces.shape[1], dtype=bool)
+            self.forward_cache[key] = self.forward(active, available) + (available,)
+        return self.forward_cache[key]
+
+    def prune(self, incpds, target):
+        '''
+        Retrieve boolean array of reaction variables (LP.variables order) that
+        are kept for target, None is returned if target can not be produced
+        '''
+        if target not in self.cpd_index:
+            return None
+        target_row = self.cpd_index[target]
+        active, producible, available = self.organism_forward(incpds)
+        if not producible[target_row]:
+            return None
+        while True:
+            kept = self.backward(active, available, target_row)
+            kept, producible = self.forward(kept, available)
+            if not producible[target_row]:
+                return None
+            if not (kept ^ active).any():
+                return kept
+            active = kept
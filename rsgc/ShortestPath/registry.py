@@ -0,0 +1,60 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Integer index of reaction variables shared by constraints, integer program and output'
+
+import numpy as np
+
+
+def split_reaction(rxn):
+    '''
+    Retrieve reaction ID without direction and direction of a reaction
+    variable (1 forward (_F), -1 reverse (_R), 0 irreversible reaction)
+    '''
+    if rxn.endswith('_F'):
+        return rxn[:-2], 1
+    if rxn.endswith('_R'):
+        return rxn[:-2], -1
+    return rxn, 0
+
+
+class ReactionRegistry(object):
+    """
+    Built once for the database LP, maps reaction variables (columns of
+    LP.variables) to their variable name, reaction (with direction),
+    reaction ID and direction so pathways can be handled by column
+    """
+    def __init__(self, variables, allrxnsrev_dict):
+        '''Initialize class'''
+        self.names = [variable.name for variable in variables]
+        self.column_index = {name: column for column, name in enumerate(self.names)}
+        self.reactions = [allrxnsrev_dict[name] for name in self.names]
+        self.reaction_index = {rxn: column for column, rxn in enumerate(self.reactions)}
+        self.base_reactions = []
+        self.base_index = {}
+        base_column = []
+        direction = []
+        for rxn in self.reactions:
+            base, rxn_direction = split_reaction(rxn)
+            if base not in self.base_index:
+                self.base_index[base] = len(self.base_reactions)
+                self.base_reactions.append(base)
+            base_column.append(self.base_index[base])
+            direction.append(rxn_direction)
+        self.base_column = np.array(base_column, dtype=np.int64)
+        self.direction = np.array(direction, dtype=np.int8)
+
+    def __len__(self):
+        return len(self.names)
+
+    def columns(self, reactions):
+        '''Columns of reactions (with direction)'''
+        return [self.reaction_index[rxn] for rxn in reactions]
+
+    def external_mask(self, inrxns):
+        '''Boolean array over columns, True for reactions that are not in the organism (inrxns)'''
+        internal = np.zeros(len(self.base_reactions), dtype=bool)
+        for rxn in inrxns:
+            index = self.base_index.get(rxn)
+            if index is not None:
+                internal[index] = True
+        return ~internal[self.base_column]
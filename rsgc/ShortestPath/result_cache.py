@@ -0,0 +1,95 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'On disk cache of pathways identified for a target, shared across runs'
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+from scipy import sparse
+
+
+def problem_hash(A_matrix, reactions, compounds, variables):
+    '''
+    Content hash of the database problem (stoichiometric matrix, reactions,
+    compounds and reaction variable bounds, i.e. ignored reactions), rows and
+    columns are sorted by compound and reaction so the hash does not depend
+    on the order the problem was built in
+    '''
+    row_order = np.argsort(compounds, kind='stable')
+    column_order = np.argsort(reactions, kind='stable')
+    A = sparse.csr_matrix(A_matrix)[row_order][:, column_order]
+    A.sort_indices()
+    bounds = [(variables[column].lowBound, variables[column].upBound) for column in column_order]
+    digest = hashlib.sha256()
+    digest.update(np.asarray(A.indptr, dtype=np.int64).tobytes())
+    digest.update(np.asarray(A.indices, dtype=np.int64).tobytes())
+    digest.update(np.asarray(A.data, dtype=np.float64).tobytes())
+    digest.update('\n'.join(compounds[row] for row in row_order).encode('utf-8'))
+    digest.update('\n'.join(reactions[column] for column in column_order).encode('utf-8'))
+    digest.update(json.dumps(bounds).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PathwayCache(object):
+    """
+    Pathways of previous runs stored as one json file per key in directory,
+    least recently used files are removed when the files exceed max_size (MB)
+    """
+    def __init__(self, directory, max_size=500):
+        '''Initialize class'''
+        self.directory = directory
+        self.max_size = max_size*1024*1024
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def key(self, *parts):
+        '''Key of the cache entry (hash of json of all parts)'''
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key+'.json')
+
+    def get(self, key):
+        '''Retrieve pathways for key, None if they are not in the cache'''
+        path = self._path(key)
+        try:
+            with open(path) as fin:
+                pathways = json.load(fin)
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pathways
+
+    def put(self, key, pathways):
+        '''Store pathways for key (written to a temporary file and renamed so processes never read part of a file)'''
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as fout:
+            json.dump(pathways, fout)
+        os.replace(temp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        '''Remove least recently used entries until the cache is within max_size'''
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.json'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, filename))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, filename))
+        total = sum(entry[1] for entry in entries)
+        for mtime, size, filename in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,353 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Solver backends used by the integer linear program'
+
+import os
+from timeit import default_timer as timer
+import pulp
+from rsgc.ShortestPath import constraints_io as cio
+try:
+    import numpy as np
+    from scipy import sparse
+    from scipy.optimize import milp, Bounds, LinearConstraint
+    HIGHS_AVAILABLE = True
+except ImportError:
+    HIGHS_AVAILABLE = False
+try:
+    import highspy
+    HIGHSPY_AVAILABLE = HIGHS_AVAILABLE
+except ImportError:
+    HIGHSPY_AVAILABLE = False
+
+SOLVERS = ['highs', 'glpk']
+
+def sense_bounds(sense, rhs):
+    '''Convert pulp row senses and right hand sides into lower and upper row bounds'''
+    lowbound = np.where(sense == pulp.LpConstraintLE, -np.inf, rhs)
+    upbound = np.where(sense == pulp.LpConstraintGE, np.inf, rhs)
+    return lowbound, upbound
+
+def solve_time_limit(time_limit, deadline):
+    '''
+    Seconds a solve can take, time_limit is minutes per solve (--solver_time_limit) and
+    deadline is the time (timer()) the target has to be finished by, None for no limit
+    '''
+    seconds = None if time_limit == 'None' else int(time_limit)*60
+    if deadline is not None:
+        remaining = max(deadline-timer(), 1)
+        seconds = remaining if seconds is None else min(seconds, remaining)
+    return seconds
+
+
+class GLPKSolver(object):
+    """
+    Solves the pulp problem with glpsol (pulp writes a .lp file and
+    reads back a solution file for every solve)
+    """
+    name = 'glpk'
+    callbacks = False
+
+    def __init__(self, time_limit='None'):
+        '''Initialize class'''
+        self.time_limit = time_limit
+        self.deadline = None
+        self.stats = {}
+
+    def load(self, lp, variables, A_matrix=None, reversible_pairs=None):
+        '''
+        Nothing is kept in memory for glpk, database rows are added to the
+        pulp problem if it was loaded from a binary constraints file and
+        reversible reaction rows are added after the database rows
+        '''
+        if A_matrix is not None and A_matrix.shape[0] and not lp.constraints:
+            cio.add_pulp_rows(lp, variables, A_matrix)
+        if reversible_pairs is not None and len(reversible_pairs) and A_matrix is not None and len(lp.constraints) == A_matrix.shape[0]:
+            cio.add_pulp_reversible_rows(lp, variables, reversible_pairs)
+
+    def solve(self, lp, variables, obj, overlay, mip_start=None, cycle_cuts=None):
+        '''
+        Solve problem with overlay applied, returns value of each variable
+        (glpsol can not be given a MIP start or callbacks so mip_start
+        and cycle_cuts are ignored)
+        '''
+        start = timer()
+        lp.setObjective(pulp.lpSum(obj[i]*variables[i] for i in range(len(obj))))
+        with overlay.applied(lp, variables):
+            seconds = solve_time_limit(self.time_limit, self.deadline)
+            if seconds is None:
+                lp.solve(pulp.GLPK(msg=0))
+            else:
+                tmlim = str(int(seconds))
+                lp.solve(pulp.GLPK(msg=0, options=['--tmlim', tmlim]))
+        self.stats = {'time': timer()-start, 'nodes': 'NA', 'warm_start': False, 'cycle_restarts': 0}
+        return [variable.value() for variable in variables]
+
+
+class HiGHSSolver(object):
+    """
+    Keeps the database A matrix and bounds in memory (scipy sparse
+    matrix and numpy arrays) and solves with HiGHS through scipy,
+    target overlays and cuts are applied to the arrays so no
+    files are written or read between solves
+    """
+    name = 'highs'
+    callbacks = False
+
+    def __init__(self, time_limit='None'):
+        '''Initialize class'''
+        self.time_limit = time_limit
+        self.deadline = None
+        self.model_id = None
+        self.cut_cache = None
+        self.stats = {}
+
+    def load(self, lp, variables, A_matrix=None, reversible_pairs=None):
+        '''
+        Build in memory representation of the base (database) problem,
+        A_matrix (scipy sparse matrix with LP.variables columns, rows >= 0)
+        from ConstructInitialLP or a binary constraints file is used directly
+        when available, x_F + x_R <= 1 rows of reversible reactions are
+        added after the database rows
+        '''
+        if self.model_id == id(lp):
+            return
+        if A_matrix is not None:
+            row_rhs = np.zeros(A_matrix.shape[0])
+            row_sense = np.full(A_matrix.shape[0], pulp.LpConstraintGE)
+            self.A = sparse.csr_matrix(A_matrix, dtype=float)
+            if reversible_pairs is not None and len(reversible_pairs):
+                self.A = sparse.vstack([self.A, cio.reversible_pairs_matrix(reversible_pairs, self.A.shape[1])],
+                                       format='csr')
+                row_rhs = np.concatenate([row_rhs, np.ones(len(reversible_pairs))])
+                row_sense = np.concatenate([row_sense, np.full(len(reversible_pairs), pulp.LpConstraintLE)])
+        else:
+            row_rhs = [-constraint.constant for constraint in lp.constraints.values()]
+            row_sense = [constraint.sense for constraint in lp.constraints.values()]
+            self.A = cio.lp_to_matrix(lp, variables)
+        self.row_rhs = np.array(row_rhs, dtype=float)
+        self.row_sense = np.array(row_sense, dtype=int)
+        self.col_lb = np.array([-np.inf if v.lowBound is None else v.lowBound for v in variables], dtype=float)
+        self.col_ub = np.array([np.inf if v.upBound is None else v.upBound for v in variables], dtype=float)
+        self.integrality = np.ones(len(variables))
+        self.model_id = id(lp)
+        self.cut_cache = None
+
+    def _row_bounds(self, overlay):
+        '''Database row bounds with target overlay rows applied'''
+        row_rhs = self.row_rhs.copy()
+        row_sense = self.row_sense.copy()
+        row_rhs[overlay.profile_rows] = overlay.profile_rhs
+        for row, rhs in overlay.row_rhs.items():
+            row_rhs[row] = rhs
+        for row, sense in overlay.row_sense.items():
+            row_sense[row] = sense
+        return sense_bounds(row_sense, row_rhs)
+
+    def _cut_rows(self, cuts):
+        '''Sparse rows (and bounds) for cuts (K pathway and cycle constraints)'''
+        rows = []
+        columns = []
+        cut_rhs = []
+        cut_sense = []
+        for count, (name, cut_columns, sense, rhs) in enumerate(cuts):
+            rows.extend([count]*len(cut_columns))
+            columns.extend(cut_columns)
+            cut_rhs.append(rhs)
+            cut_sense.append(sense)
+        matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, columns)),
+                                   shape=(len(cut_rhs), self.A.shape[1]))
+        cut_lb, cut_ub = sense_bounds(np.array(cut_sense, dtype=int), np.array(cut_rhs, dtype=float))
+        return matrix, cut_lb, cut_ub
+
+    def _matrix_with_cuts(self, overlay):
+        '''
+        A matrix with overlay cuts appended, cuts are only ever appended
+        during a target so only new cuts are added to the previously stacked matrix
+        '''
+        if self.cut_cache is None or self.cut_cache[0] is not overlay or self.cut_cache[1] > len(overlay.cuts):
+            self.cut_cache = (overlay, 0, self.A, np.zeros(0), np.zeros(0))
+        cached_overlay, ncuts, A, cut_lb, cut_ub = self.cut_cache
+        if ncuts < len(overlay.cuts):
+            matrix, new_lb, new_ub = self._cut_rows(overlay.cuts[ncuts:])
+            A = sparse.vstack([A, matrix], format='csr')
+            cut_lb = np.concatenate([cut_lb, new_lb])
+            cut_ub = np.concatenate([cut_ub, new_ub])
+            self.cut_cache = (overlay, len(overlay.cuts), A, cut_lb, cut_ub)
+        return A, cut_lb, cut_ub
+
+    def _col_bounds(self, overlay):
+        '''Reaction variable bounds with target overlay bounds applied'''
+        col_lb = self.col_lb.copy()
+        col_ub = self.col_ub.copy()
+        col_lb[overlay.pruned] = 0
+        col_ub[overlay.pruned] = 0
+        for column, (lowbound, upbound) in overlay.bounds.items():
+            col_lb[column] = -np.inf if lowbound is None else lowbound
+            col_ub[column] = np.inf if upbound is None else upbound
+        return col_lb, col_ub
+
+    def solve(self, lp, variables, obj, overlay, mip_start=None, cycle_cuts=None):
+        '''
+        Solve problem with overlay applied, returns value of each variable
+        (scipy.optimize.milp can not be given a MIP start or callbacks so
+        mip_start and cycle_cuts are ignored)
+        '''
+        start = timer()
+        self.load(lp, variables)
+        row_lb, row_ub = self._row_bounds(overlay)
+        col_lb, col_ub = self._col_bounds(overlay)
+        A, cut_lb, cut_ub = self._matrix_with_cuts(overlay)
+        row_lb = np.concatenate([row_lb, cut_lb])
+        row_ub = np.concatenate([row_ub, cut_ub])
+        options = {}
+        seconds = solve_time_limit(self.time_limit, self.deadline)
+        if seconds is not None:
+            options['time_limit'] = seconds
+        res = milp(np.asarray(obj, dtype=float), integrality=self.integrality,
+                   bounds=Bounds(col_lb, col_ub),
+                   constraints=LinearConstraint(A, row_lb, row_ub),
+                   options=options)
+        self.stats = {'time': timer()-start, 'nodes': getattr(res, 'mip_node_count', 'NA'),
+                      'warm_start': False, 'cycle_restarts': 0}
+        if res.x is None:
+            return [None]*len(variables)
+        return [int(round(value)) for value in res.x]
+
+
+class HighsPySolver(HiGHSSolver):
+    """
+    Keeps a HiGHS model (highspy) resident in memory for the whole run,
+    only the rows, bounds, cuts and objective coefficients that changed
+    since the previous solve are passed to HiGHS and the previous
+    solution is given to HiGHS as a MIP start, new incumbents can be
+    checked (i.e. for cycles) during branch and bound with a callback
+    """
+    name = 'highs'
+    callbacks = True
+
+    def __init__(self, time_limit='None'):
+        '''Initialize class'''
+        HiGHSSolver.__init__(self, time_limit)
+        self.highs = None
+        self.highs_pid = None
+        self.cycle_cuts = None
+        self.cut_added = False
+
+    def _incumbent_callback(self, event):
+        '''Check new incumbent, cycle_cuts adds cuts to the overlay if the incumbent is not acceptable'''
+        if self.cycle_cuts is not None and self.cycle_cuts(np.asarray(event.data_out.mip_solution)):
+            self.cut_added = True
+
+    def _interrupt_callback(self, event):
+        '''Stop branch and bound once cuts were added so the problem is solved again with the cuts'''
+        if self.cut_added:
+            event.interrupt()
+
+    def _build_highs(self):
+        '''
+        Pass base problem to a new HiGHS instance, done lazily in each
+        process so HiGHS instances are never shared between forked processes
+        '''
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue('output_flag', False)
+        model = highspy.HighsLp()
+        model.num_col_ = self.A.shape[1]
+        model.num_row_ = self.A.shape[0]
+        model.col_cost_ = np.zeros(self.A.shape[1])
+        model.col_lower_ = self.col_lb
+        model.col_upper_ = self.col_ub
+        model.row_lower_, model.row_upper_ = sense_bounds(self.row_sense, self.row_rhs)
+        model.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        model.a_matrix_.start_ = self.A.indptr
+        model.a_matrix_.index_ = self.A.indices
+        model.a_matrix_.value_ = self.A.data.astype(float)
+        model.integrality_ = [highspy.HighsVarType.kInteger]*self.A.shape[1]
+        self.highs.passModel(model)
+        self.highs.cbMipImprovingSolution.subscribe(self._incumbent_callback)
+        self.highs.cbMipInterrupt.subscribe(self._interrupt_callback)
+        self.model_row_lb = np.array(model.row_lower_)
+        self.model_row_ub = np.array(model.row_upper_)
+        self.model_col_lb = self.col_lb.copy()
+        self.model_col_ub = self.col_ub.copy()
+        self.model_cost = np.zeros(self.A.shape[1])
+        self.model_cuts = (None, 0)
+        self.highs_pid = os.getpid()
+        self.highs_model_id = self.model_id
+
+    def _update_cuts(self, overlay):
+        '''Add new overlay cuts to HiGHS model, remove cuts of a previous target'''
+        cut_overlay, ncuts = self.model_cuts
+        if cut_overlay is not overlay or ncuts > len(overlay.cuts):
+            if ncuts:
+                self.highs.deleteRows(ncuts, np.arange(self.A.shape[0], self.A.shape[0]+ncuts))
+            ncuts = 0
+        if ncuts < len(overlay.cuts):
+            matrix, cut_lb, cut_ub = self._cut_rows(overlay.cuts[ncuts:])
+            self.highs.addRows(matrix.shape[0], cut_lb, cut_ub, matrix.nnz,
+                               matrix.indptr[:-1], matrix.indices, matrix.data.astype(float))
+        self.model_cuts = (overlay, len(overlay.cuts))
+
+    def solve(self, lp, variables, obj, overlay, mip_start=None, cycle_cuts=None):
+        '''
+        Solve problem with overlay applied, returns value of each variable,
+        cycle_cuts (function of an incumbent solution) is called for each new
+        incumbent and the problem is solved again if it added cuts to the overlay
+        '''
+        start = timer()
+        self.load(lp, variables)
+        if self.highs is None or self.highs_pid != os.getpid() or self.highs_model_id != self.model_id:
+            self._build_highs()
+        row_lb, row_ub = self._row_bounds(overlay)
+        changed = np.nonzero((row_lb != self.model_row_lb) | (row_ub != self.model_row_ub))[0]
+        if len(changed):
+            self.highs.changeRowsBounds(len(changed), changed, row_lb[changed], row_ub[changed])
+            self.model_row_lb, self.model_row_ub = row_lb, row_ub
+        col_lb, col_ub = self._col_bounds(overlay)
+        changed = np.nonzero((col_lb != self.model_col_lb) | (col_ub != self.model_col_ub))[0]
+        if len(changed):
+            self.highs.changeColsBounds(len(changed), changed, col_lb[changed], col_ub[changed])
+            self.model_col_lb, self.model_col_ub = col_lb, col_ub
+        cost = np.asarray(obj, dtype=float)
+        changed = np.nonzero(cost != self.model_cost)[0]
+        if len(changed):
+            self.highs.changeColsCost(len(changed), changed, cost[changed])
+            self.model_cost = cost
+        warm_start = False
+        if mip_start is not None and None not in mip_start:
+            solution = highspy.HighsSolution()
+            solution.col_value = [float(value) for value in mip_start]
+            warm_start = self.highs.setSolution(solution) == highspy.HighsStatus.kOk
+        self.cycle_cuts = cycle_cuts
+        nodes = 0
+        restarts = -1
+        self.cut_added = True
+        while self.cut_added:
+            restarts += 1
+            self.cut_added = False
+            self._update_cuts(overlay)
+            seconds = solve_time_limit(self.time_limit, self.deadline)
+            self.highs.setOptionValue('time_limit', float('inf') if seconds is None else float(seconds))
+            self.highs.run()
+            info = self.highs.getInfo()
+            nodes += info.mip_node_count
+        self.cycle_cuts = None
+        self.stats = {'time': timer()-start, 'nodes': nodes, 'warm_start': warm_start, 'cycle_restarts': restarts}
+        if info.primal_solution_status != 2:
+            return [None]*len(variables)
+        return [int(round(value)) for value in self.highs.getSolution().col_value]
+
+
+def get_solver(name, time_limit='None'):
+    '''
+    Retrieve solver backend, for highs the persistent highspy model is used when
+    available otherwise scipy.optimize.milp, glpk is used when HiGHS is not available
+    '''
+    if name == 'highs':
+        if HIGHSPY_AVAILABLE:
+            return HighsPySolver(time_limit)
+        if HIGHS_AVAILABLE:
+            return HiGHSSolver(time_limit)
+        print ('WARNING:\tHiGHS solver (scipy.optimize.milp) not available, using glpk')
+    elif name != 'glpk':
+        print ('WARNING:\tUnknown solver {}, using glpk'.format(name))
+    return GLPKSolver(time_limit)
@@ -0,0 +1,71 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Pool of worker processes that run target jobs from a shared queue'
+
+import traceback
+from multiprocessing import Process, Queue
+from timeit import default_timer as timer
+
+
+def verbose_print(verbose, line):
+    if verbose:
+        print(line)
+
+
+def _target_worker(worker, function, args, job_queue, stats_queue):
+    '''
+    Runs function(job, *args) for jobs from job_queue until None is retrieved,
+    then puts (worker, number of jobs, busy time) in stats_queue
+    '''
+    busy = 0
+    count = 0
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+        job_start = timer()
+        try:
+            function(job, *args)
+        except Exception:
+            print ('ERROR:\tWorker {} failed on job {}'.format(worker, job))
+            traceback.print_exc()
+        busy += timer()-job_start
+        count += 1
+    stats_queue.put((worker, count, busy))
+
+
+def run_target_pool(function, jobs, args, processors, verbose=False, output=None):
+    '''
+    Run function(job, *args) for each job with processors worker processes,
+    workers are started once (args such as the database LP are loaded before the
+    workers start and are shared by all jobs of a worker) and take the next job from
+    the queue as soon as they finish one, returns utilization (worker, number of
+    jobs, busy time) of each worker and run time of the pool
+    '''
+    job_queue = Queue()
+    stats_queue = Queue()
+    processors = max(1, min(processors, len(jobs)))
+    for job in jobs:
+        job_queue.put(job)
+    for worker in range(processors):
+        job_queue.put(None)
+    workers = [Process(target=_target_worker, args=(worker, function, args, job_queue, stats_queue))
+               for worker in range(processors)]
+    start = timer()
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+    utilization = []
+    for p in workers:
+        if p.exitcode == 0:
+            utilization.append(stats_queue.get())
+    total = timer()-start
+    utilization.sort()
+    for worker, count, busy in utilization:
+        verbose_print(verbose, 'INFO:\tWorker {} ran {} jobs, busy {} of {} seconds ({:.1f}%)'.format(worker, count, busy, total, 100*busy/total))
+        if output:
+            output.output_timer('Worker {} utilization ({} jobs, {:.1f}% busy)\t{}\t{}\n'.format(worker, count, 100*busy/total, busy, busy/60))
+    print ('STATUS:\t{} workers ran {} jobs in {} seconds, workers were busy {:.1f}% of the time'.format(processors, len(jobs), total, 100*sum(stats[2] for stats in utilization)/(total*processors)))
+    return utilization, total
@@ -0,0 +1,78 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on reading and writing database constraint files'
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import pulp
+from rsgc.ShortestPath import constraints_io as cio
+
+
+def build_lp():
+    '''Small database problem with one reversible reaction'''
+    variables = [pulp.LpVariable('R'+str(i), cat=pulp.LpInteger, lowBound=0, upBound=1)
+                 for i in range(1, 4)]
+    variables[2].upBound = 0
+    lp = pulp.LpProblem('ShortestPath', pulp.LpMinimize)
+    lp += pulp.LpConstraint(-variables[0]+variables[1], name='c0 constraint', sense=1, rhs=0)
+    lp += pulp.LpConstraint(variables[0]-variables[1]+variables[2], name='c1 constraint', sense=1, rhs=0)
+    return lp, lp.variables()
+
+
+class ConstraintsIOTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        self.PATH = tempfile.mkdtemp()
+        self.lp, self.variables = build_lp()
+        self.allcpds = ['cpd_a', 'cpd_b']
+        self.allrxnsrev = ['rxn1_F', 'rxn1_R', 'EX_rxn2']
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+        shutil.rmtree(self.PATH)
+
+    def check_constraints(self, constraints, pruned, pairs=None):
+        '''Compare loaded constraints to original problem'''
+        (lp, allcpds, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix,
+         pruned_loaded, reversible_pairs) = constraints
+        self.assertEqual(pruned_loaded, pruned)
+        if pairs is None:
+            self.assertIsNone(reversible_pairs)
+        else:
+            self.assertEqual(reversible_pairs.tolist(), pairs)
+        self.assertEqual(allcpds, self.allcpds)
+        self.assertEqual(allrxnsrev, self.allrxnsrev)
+        self.assertEqual(allrxnsrev_dict['R2'], 'rxn1_R')
+        self.assertEqual(allrxnsrev_dict_rev['EX_rxn2'], 'R3')
+        self.assertEqual([(v.name, v.lowBound, v.upBound) for v in variables],
+                         [(v.name, v.lowBound, v.upBound) for v in self.variables])
+        self.assertEqual(A_matrix.toarray().tolist(), [[-1, 1, 0], [1, -1, 1]])
+
+    def test_binary_round_trip(self):
+        print ("Testing binary constraints file can be written and memory mapped")
+        filename = os.path.join(self.PATH, 'test.constraints')
+        pruned = {'reactions': ['rxn3'], 'compounds': ['cpd_c', 'cpd_d']}
+        cio.write_constraints_file(filename, self.lp, self.allcpds, self.variables, self.allrxnsrev,
+                                   pruned=pruned, reversible_pairs=[[0, 1]])
+        self.assertTrue(cio.is_binary_constraints_file(filename))
+        self.check_constraints(cio.load_constraints_file(filename), pruned, [[0, 1]])
+
+    def test_convert_pickled_file(self):
+        print ("Testing pickled constraints file is converted into binary format")
+        pickled = os.path.join(self.PATH, 'pickled.constraints')
+        with open(pickled, 'wb') as fout:
+            for item in [self.lp, self.allcpds, self.variables, {}, {}, self.allrxnsrev]:
+                pickle.dump(item, fout)
+        self.assertFalse(cio.is_binary_constraints_file(pickled))
+        filename = os.path.join(self.PATH, 'converted.constraints')
+        cio.convert_constraints_file(pickled, filename)
+        self.check_constraints(cio.load_constraints_file(filename), {'reactions': [], 'compounds': []})
+
+if __name__ == '__main__':
+    unittest.main()
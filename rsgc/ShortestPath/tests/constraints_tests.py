@@ -0,0 +1,103 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on construction of the database A matrix'
+
+import unittest
+from rsgc.ShortestPath import constraints as co
+
+
+class FakeDB(object):
+    """Database with a dead-end compound (cpdX) which is not in any organism"""
+    def is_reversible_all_reactions(self):
+        return {'rxn1': '0', 'rxn2': '0', 'rxn3': '0'}
+
+    def get_all_reaction_compounds(self):
+        return iter([('rxn1', 'cpdA', 0), ('rxn1', 'cpdB', 1),
+                     ('rxn2', 'cpdX', 0), ('rxn2', 'cpdC', 1),
+                     ('rxn3', 'cpdC', 0), ('rxn3', 'cpdD', 1)])
+
+    def get_all_model_compounds(self):
+        return ['cpdA']
+
+
+class FakeDuplicateDB(FakeDB):
+    """Database where rxn4 has the same stoichiometry as rxn1"""
+    def is_reversible_all_reactions(self):
+        return {'rxn1': '0', 'rxn2': '0', 'rxn3': '1', 'rxn4': '0'}
+
+    def get_all_reaction_compounds(self):
+        return iter(list(FakeDB.get_all_reaction_compounds(self)) +
+                    [('rxn4', 'cpdB', 1), ('rxn4', 'cpdA', 0)])
+
+
+class ConstraintsTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        self.allrxnsrev_index = {'rxn1': 0, 'rxn2_F': 1, 'rxn2_R': 2}
+        self.cpd_index = {'cpdA': 0, 'cpdB': 1}
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+
+    def test_stoichiometry_entries(self):
+        print ("Testing A matrix entries for irreversible and reversible reactions")
+        reaction_compounds = [('rxn1', 'cpdA', 0), ('rxn1', 'cpdB', 1),
+                              ('rxn2', 'cpdB', 0), ('rxn2', 'cpdA', 1),
+                              ('rxn3', 'cpdA', 0), ('rxn1', 'cpdC', 1)]
+        rows, columns, values = co.stoichiometry_entries(reaction_compounds, self.allrxnsrev_index,
+                                                         self.cpd_index)
+        entries = sorted(zip(rows.tolist(), columns.tolist(), values.tolist()))
+        self.assertEqual(entries, [(0, 0, -1), (0, 1, 1), (0, 2, -1),
+                                   (1, 0, 1), (1, 1, -1), (1, 2, 1)])
+
+    def test_stoichiometry_entries_product_and_reactant(self):
+        print ("Testing product entry is kept when compound is a reactant and product of a reaction")
+        reaction_compounds = [('rxn1', 'cpdA', 1), ('rxn1', 'cpdA', 0), ('rxn2', 'cpdA', 0),
+                              ('rxn2', 'cpdA', 1), ('rxn2', 'cpdA', 1)]
+        rows, columns, values = co.stoichiometry_entries(reaction_compounds, self.allrxnsrev_index,
+                                                         self.cpd_index)
+        entries = sorted(zip(rows.tolist(), columns.tolist(), values.tolist()))
+        self.assertEqual(entries, [(0, 0, 1), (0, 1, 1), (0, 2, -1)])
+    def test_presolve_network(self):
+        print ("Testing removal and restoration of dead-end compounds and blocked reactions")
+        DB = FakeDB()
+        allcpds = ['cpdA', 'cpdB', 'cpdC', 'cpdD', 'cpdX']
+        LP = co.ConstructInitialLP(['rxn1', 'rxn2', 'rxn3'], allcpds, DB, [],
+                                   presolve_cpds=DB.get_all_model_compounds())
+        self.assertEqual(LP.allrxnsrev, ['rxn1'])
+        self.assertEqual(sorted(LP.pruned['reactions']), ['rxn2', 'rxn3'])
+        self.assertEqual(sorted(LP.pruned['compounds']), ['cpdC', 'cpdD', 'cpdX'])
+        self.assertEqual(LP.A_matrix.shape, (2, 1))
+        self.assertEqual(len(LP.lp.constraints), 2)
+        LP.restore_pruned(['cpdA'])
+        self.assertEqual(LP.A_matrix.shape, (2, 1))
+        LP.restore_pruned(['cpdX'])
+        self.assertEqual(LP.pruned['reactions'], [])
+        self.assertEqual(sorted(LP.allrxnsrev), ['rxn1', 'rxn2', 'rxn3'])
+        self.assertEqual(LP.A_matrix.shape, (5, 3))
+        self.assertEqual(len(LP.lp.constraints), 5)
+        column = {variable.name: count for count, variable in enumerate(LP.variables)}
+        row = {cpd: count for count, cpd in enumerate(LP.allcpds)}
+        rxn3 = column[LP.allrxnsrev_dict_rev['rxn3']]
+        self.assertEqual(LP.A_matrix[row['cpdC'], rxn3], -1)
+        self.assertEqual(LP.A_matrix[row['cpdD'], rxn3], 1)
+
+    def test_equivalent_reaction_classes(self):
+        print ("Testing reactions with identical stoichiometry are grouped")
+        LP = co.ConstructInitialLP(['rxn1', 'rxn2', 'rxn3', 'rxn4'], ['cpdA', 'cpdB', 'cpdC', 'cpdD', 'cpdX'],
+                                   FakeDuplicateDB(), [])
+        classes = [sorted(LP.allrxnsrev_dict[LP.variables[column].name] for column in columns)
+                   for columns in LP.reaction_classes]
+        self.assertEqual(classes, [['rxn1', 'rxn4']])
+        pairs = [[LP.allrxnsrev_dict[LP.variables[column].name] for column in pair]
+                 for pair in LP.reversible_pairs.tolist()]
+        self.assertEqual(pairs, [['rxn3_F', 'rxn3_R']])
+        LP = co.ConstructInitialLP(['rxn1', 'rxn2', 'rxn3', 'rxn4'], ['cpdA', 'cpdB', 'cpdC', 'cpdD', 'cpdX'],
+                                   FakeDuplicateDB(), ['rxn4'])
+        self.assertEqual(LP.reaction_classes, [])
+
+if __name__ == '__main__':
+    unittest.main()
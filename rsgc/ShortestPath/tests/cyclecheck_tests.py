@@ -0,0 +1,53 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on identification of cycles in pathways'
+
+import unittest
+import numpy as np
+from rsgc.ShortestPath import cyclecheck as cc
+
+
+class CycleCheckTests(unittest.TestCase):
+    def setUp(self):
+        """
+        Initialize before every test.
+        R1: A -> B, R2: B -> C, R3: C -> B (cycle with R2), R4: B -> D,
+        R5: B -> E, R6: D + E -> T (branches, not a cycle), R7: C -> F, R8: F -> B
+        """
+        print ("Initializing tests")
+        self.allcpds = ['A', 'B', 'C', 'D', 'E', 'T', 'F']
+        reactions = [(['A'], ['B']), (['B'], ['C']), (['C'], ['B']), (['B'], ['D']),
+                     (['B'], ['E']), (['D', 'E'], ['T']), (['C'], ['F']), (['F'], ['B'])]
+        A_matrix = np.zeros((len(self.allcpds), len(reactions)))
+        for column, (reactants, products) in enumerate(reactions):
+            for reactant in reactants:
+                A_matrix[self.allcpds.index(reactant), column] = -1
+            for product in products:
+                A_matrix[self.allcpds.index(product), column] = 1
+        self.C = cc.CycleCheck(A_matrix)
+        self.available = np.array([cpd == 'A' for cpd in self.allcpds])
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+
+    def test_cycle(self):
+        print ("Testing reactions producing each others reactants are identified as a cycle")
+        self.assertEqual(self.C.cycles([0, 1, 2, 3], self.available), [[1, 2]])
+
+    def test_no_cycle(self):
+        print ("Testing branched pathway is not identified as a cycle")
+        self.assertEqual(self.C.cycles([0, 3, 4, 5], self.available), [])
+
+    def test_shortest_cycle(self):
+        print ("Testing only shortest cycle of strongly connected reactions is used")
+        self.assertEqual(self.C.cycles([0, 1, 2, 6, 7], self.available), [[1, 2]])
+
+    def test_available_compounds(self):
+        print ("Testing compounds in the organism do not form cycles")
+        available = np.array([cpd in ('A', 'B') for cpd in self.allcpds])
+        self.assertEqual(self.C.cycles([0, 1, 2], available), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on heuristic (best-first) pathway search'
+
+import unittest
+import numpy as np
+from rsgc.ShortestPath import graphsearch as gs
+
+
+class PathSearchTests(unittest.TestCase):
+    def setUp(self):
+        """
+        Initialize before every test.
+        R1: A -> B, R2: B -> T, R3: A + C -> T, R4: A -> C, R5: A -> D, R6: D -> C
+        """
+        print ("Initializing tests")
+        self.allcpds = ['A', 'B', 'C', 'D', 'T']
+        A_matrix = np.zeros((5, 6))
+        for column, (reactants, products) in enumerate([(['A'], ['B']), (['B'], ['T']), (['A', 'C'], ['T']),
+                                                        (['A'], ['C']), (['A'], ['D']), (['D'], ['C'])]):
+            for reactant in reactants:
+                A_matrix[self.allcpds.index(reactant), column] = -1
+            for product in products:
+                A_matrix[self.allcpds.index(product), column] = 1
+        self.search = gs.PathSearch(A_matrix, self.allcpds)
+        self.active = np.ones(6, dtype=bool)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+
+    def test_k_pathways(self):
+        print ("Testing k pathways are found in order of cost")
+        pathways = self.search.k_pathways(['A'], 'T', [1]*6, self.active, 3)
+        self.assertEqual([(cost, columns) for cost, feasible, columns in pathways],
+                         [(2, [0, 1]), (2, [2, 3]), (3, [2, 4, 5])])
+        self.assertTrue(all(feasible for cost, feasible, columns in pathways))
+
+    def test_internal_reactions_and_limit(self):
+        print ("Testing internal (cost 0) reactions and reaction limit")
+        pathways = self.search.k_pathways(['A'], 'T', [1, 1, 1, 0, 1, 1], self.active, 3, limit=1)
+        self.assertEqual([(cost, columns) for cost, feasible, columns in pathways], [(1, [2, 3])])
+        self.assertEqual(self.search.k_pathways(['B'], 'D', [1]*6, self.active, 3), [])
+
+if __name__ == '__main__':
+    unittest.main()
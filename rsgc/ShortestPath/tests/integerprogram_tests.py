@@ -0,0 +1,47 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on producibility pre-filter and time limit of the integer program'
+
+import unittest
+from rsgc.ShortestPath import constraints as co
+from rsgc.ShortestPath import integerprogram_pulp as ip
+from rsgc.ShortestPath.tests.constraints_tests import FakeDB
+
+
+class TargetStatusTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        DB = FakeDB()
+        LP = co.ConstructInitialLP(['rxn1', 'rxn2', 'rxn3'], ['cpdA', 'cpdB', 'cpdC', 'cpdD', 'cpdX'], DB, [])
+        self.IP = ip.IntergerProgram(DB, 'None', 'None', 1, 'False', False, 'None', False)
+        self.IP.load(LP)
+        self.LP = LP
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+
+    def test_target_status(self):
+        print ("Testing targets are marked by network scope of the organism")
+        self.assertIsNone(self.IP.target_status(['cpdA'], [], 'cpdB'))
+        self.assertEqual(self.IP.target_status(['cpdA'], [], 'cpdD'), 'NOT_PRODUCIBLE')
+        self.assertIsNone(self.IP.target_status(['cpdA', 'cpdX'], [], 'cpdD'))
+        self.assertEqual(self.IP.target_status(['cpdA'], [], 'cpdZ'), 'NOT_IN_DATABASE')
+
+    def test_no_path_reason(self):
+        print ("Testing reason code is set for targets without pathways")
+        self.assertEqual(self.IP.run_glpk(self.LP, ['cpdA'], [], 'cpdD'), [])
+        self.assertEqual(self.IP.no_path_reason, 'NOT_PRODUCIBLE')
+
+    def test_target_time_limit(self):
+        print ("Testing target is not solved after its time limit")
+        self.IP.target_time_limit = '0'
+        self.assertEqual(self.IP.run_glpk(self.LP, ['cpdA'], [], 'cpdB'), [])
+        self.assertTrue(self.IP.timed_out)
+        self.assertEqual(self.IP.no_path_reason, 'TIMEOUT')
+        self.assertIsNone(self.IP.solver.deadline)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on target overlay for the shared database LP'
+
+import unittest
+import pulp
+from rsgc.ShortestPath import lp_overlay as lo
+
+
+def build_lp():
+    '''Small two compound, three reaction problem'''
+    lp = pulp.LpProblem('ShortestPath', pulp.LpMinimize)
+    variables = [pulp.LpVariable('R'+str(i), cat=pulp.LpInteger, lowBound=0, upBound=1)
+                 for i in range(1, 4)]
+    lp += pulp.LpConstraint(variables[0]-variables[1], name='c0 constraint', sense=1, rhs=0)
+    lp += pulp.LpConstraint(variables[1]-variables[2], name='c1 constraint', sense=1, rhs=0)
+    return lp, variables
+
+class TargetOverlayTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        self.lp, self.variables = build_lp()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+
+    def test_overlay_applied_and_restored(self):
+        print ("Testing that overlay changes are removed from base LP after solve")
+        overlay = lo.TargetOverlay()
+        overlay.set_row(1, 1, sense=0)
+        overlay.set_bounds(2, 0, 0)
+        overlay.add_cut('K pathway constraint 0', [0, 1], -1, 1)
+        with overlay.applied(self.lp, self.variables) as lp:
+            rows = list(lp.constraints.values())
+            self.assertEqual(len(rows), 3)
+            self.assertEqual(rows[1].sense, 0)
+            self.assertEqual(rows[1].constant, -1)
+            self.assertEqual(self.variables[2].upBound, 0)
+        rows = list(self.lp.constraints.values())
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1].sense, 1)
+        self.assertEqual(rows[1].constant, 0)
+        self.assertEqual(self.variables[2].upBound, 1)
+
+    def test_row_profile(self):
+        print ("Testing organism row profile is applied and set_row takes precedence")
+        overlay = lo.TargetOverlay()
+        overlay.set_row_profile([0, 1], -10000000000000)
+        overlay.set_row(1, 1, sense=0)
+        with overlay.applied(self.lp, self.variables) as lp:
+            rows = list(lp.constraints.values())
+            self.assertEqual(rows[0].constant, 10000000000000)
+            self.assertEqual(rows[1].constant, -1)
+        rows = list(self.lp.constraints.values())
+        self.assertEqual(rows[0].constant, 0)
+        overlay.clear_rows()
+        self.assertEqual(len(overlay.profile_rows), 0)
+
+    def test_bound_snapshot(self):
+        print ("Testing restoring variable bounds from snapshot")
+        overlay = lo.TargetOverlay()
+        overlay.set_bounds(0, 0, 0)
+        saved = overlay.snapshot_bounds()
+        overlay.set_bounds(1, 1, 1)
+        self.assertEqual(overlay.get_bounds(1, self.variables), (1, 1))
+        overlay.restore_bounds(saved)
+        self.assertEqual(overlay.get_bounds(1, self.variables), (0, 1))
+        self.assertEqual(overlay.get_bounds(0, self.variables), (0, 0))
+
+    def test_duplicate_cut_name(self):
+        print ("Testing duplicate cut names are rejected")
+        overlay = lo.TargetOverlay()
+        overlay.add_cut('cycle pathway constraint 1', [0], -1, 0)
+        self.assertRaises(pulp.PulpError, overlay.add_cut, 'cycle pathway constraint 1', [1], -1, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on reachability pruning of reaction variables'
+
+import unittest
+import numpy as np
+from rsgc.ShortestPath import reachability as ra
+
+
+class ReachabilityTests(unittest.TestCase):
+    def setUp(self):
+        """
+        Initialize before every test.
+        R1: A -> B, R2: B -> T, R3: X -> T (X can not be made),
+        R4: A -> C (not needed for T), R5: Y -> Z, R6: Z -> Y (cycle), R7: Z -> U
+        """
+        print ("Initializing tests")
+        self.allcpds = ['A', 'B', 'T', 'X', 'C', 'Y', 'Z', 'U']
+        A_matrix = np.zeros((8, 7))
+        for column, (reactant, product) in enumerate([('A', 'B'), ('B', 'T'), ('X', 'T'), ('A', 'C'),
+                                                      ('Y', 'Z'), ('Z', 'Y'), ('Z', 'U')]):
+            A_matrix[self.allcpds.index(reactant), column] = -1
+            A_matrix[self.allcpds.index(product), column] = 1
+        self.R = ra.Reachability(A_matrix, self.allcpds)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+
+    def test_prune(self):
+        print ("Testing only reactions on a path from organism compounds to target are kept")
+        kept = self.R.prune(['A'], 'T')
+        self.assertEqual(kept.tolist(), [True, True, False, False, False, False, False])
+
+    def test_cycle_kept(self):
+        print ("Testing reactions that produce each others reactants are kept")
+        kept = self.R.prune(['A'], 'U')
+        self.assertEqual(kept.tolist(), [False, False, False, False, True, True, True])
+
+    def test_not_producible(self):
+        print ("Testing target that can not be produced is identified")
+        self.assertIsNone(self.R.prune(['X'], 'B'))
+        self.assertIsNone(self.R.prune(['A'], 'not_in_database'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on reaction variable registry'
+
+import unittest
+import pulp
+from rsgc.ShortestPath import registry as rg
+
+
+class ReactionRegistryTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        variables = [pulp.LpVariable('R'+str(i), cat=pulp.LpInteger, lowBound=0, upBound=1)
+                     for i in range(1, 5)]
+        allrxnsrev_dict = {'R1': 'rxn1_F', 'R2': 'rxn1_R', 'R3': 'rxn2', 'R4': 'rxn3'}
+        self.registry = rg.ReactionRegistry(variables, allrxnsrev_dict)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+
+    def test_split_reaction(self):
+        print ("Testing direction is removed from reaction variables")
+        self.assertEqual(rg.split_reaction('rxn1_F'), ('rxn1', 1))
+        self.assertEqual(rg.split_reaction('rxn1_R'), ('rxn1', -1))
+        self.assertEqual(rg.split_reaction('rxn2'), ('rxn2', 0))
+
+    def test_columns(self):
+        print ("Testing reactions are mapped to columns")
+        self.assertEqual(len(self.registry), 4)
+        self.assertEqual(self.registry.columns(['rxn1_R', 'rxn3']), [1, 3])
+        self.assertEqual(self.registry.column_index['R3'], 2)
+        self.assertEqual(self.registry.direction.tolist(), [1, -1, 0, 0])
+        self.assertEqual(self.registry.base_reactions, ['rxn1', 'rxn2', 'rxn3'])
+
+    def test_external_mask(self):
+        print ("Testing both directions of organism reactions are internal")
+        self.assertEqual(self.registry.external_mask(['rxn1', 'rxn4']).tolist(), [False, False, True, True])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on pathway result cache'
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import pulp
+from scipy import sparse
+from rsgc.ShortestPath import result_cache as rc
+
+
+class PathwayCacheTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+        shutil.rmtree(self.directory)
+
+    def test_get_put(self):
+        print ("Testing pathways are retrieved from cache in a new cache instance")
+        cache = rc.PathwayCache(self.directory)
+        key = cache.key('problem', ['cpd1', 'cpd2'], [], 'target', 10, 'True')
+        self.assertIsNone(cache.get(key))
+        cache.put(key, [['rxn1', 'rxn2_F'], ['rxn3']])
+        cache = rc.PathwayCache(self.directory)
+        self.assertEqual(cache.get(key), [['rxn1', 'rxn2_F'], ['rxn3']])
+        self.assertEqual(cache.get(cache.key('problem', ['cpd1', 'cpd2'], [], 'target', 5, 'True')), None)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_least_recently_used_removed(self):
+        print ("Testing least recently used pathways are removed when cache is full")
+        cache = rc.PathwayCache(self.directory)
+        for count in range(3):
+            cache.put(cache.key(count), [['rxn'+str(count)]*10])
+            past = time.time()-100+count
+            os.utime(os.path.join(self.directory, cache.key(count)+'.json'), (past, past))
+        cache.get(cache.key(0))
+        cache.max_size = 2*os.path.getsize(os.path.join(self.directory, cache.key(0)+'.json'))
+        cache.evict()
+        self.assertIsNotNone(cache.get(cache.key(0)))
+        self.assertIsNone(cache.get(cache.key(1)))
+        self.assertIsNotNone(cache.get(cache.key(2)))
+
+    def test_problem_hash_order(self):
+        print ("Testing problem hash does not depend on compound and reaction order")
+        variables = [pulp.LpVariable('R'+str(i), lowBound=0, upBound=1) for i in range(1, 3)]
+        A = sparse.csr_matrix([[1, -1], [0, 1]])
+        problem = rc.problem_hash(A, ['rxn1', 'rxn2'], ['cpd1', 'cpd2'], variables)
+        self.assertEqual(rc.problem_hash(A[::-1], ['rxn1', 'rxn2'], ['cpd2', 'cpd1'], variables), problem)
+        variables[1].upBound = 0
+        self.assertNotEqual(rc.problem_hash(A, ['rxn1', 'rxn2'], ['cpd1', 'cpd2'], variables), problem)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on solver backends for the integer linear program'
+
+import unittest
+import pulp
+from rsgc.ShortestPath import lp_overlay as lo
+from rsgc.ShortestPath import solvers
+
+
+def build_lp():
+    '''
+    Compound A is in the organism, B can be made from A with R1 or R2,
+    target T can be made from B with R3 (EX reaction R4 is blocked)
+    '''
+    lp = pulp.LpProblem('ShortestPath', pulp.LpMinimize)
+    variables = [pulp.LpVariable('R'+str(i), cat=pulp.LpInteger, lowBound=0, upBound=1)
+                 for i in range(1, 5)]
+    variables[3].upBound = 0
+    lp += pulp.LpConstraint(-variables[0]-variables[1], name='c0 constraint', sense=1, rhs=0)
+    lp += pulp.LpConstraint(variables[0]+variables[1]-variables[2], name='c1 constraint', sense=1, rhs=0)
+    lp += pulp.LpConstraint(variables[2]+variables[3], name='c2 constraint', sense=1, rhs=0)
+    return lp, variables
+
+@unittest.skipUnless(solvers.HIGHS_AVAILABLE, 'HiGHS (scipy.optimize.milp) not available')
+class HiGHSSolverTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        self.lp, self.variables = build_lp()
+        self.overlay = lo.TargetOverlay()
+        self.overlay.set_row(0, -10000000000000)
+        self.overlay.set_row(2, 1, sense=0)
+        self.solver = solvers.get_solver('highs')
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+
+    def test_solve(self):
+        print ("Testing shortest path is found with target overlay")
+        values = self.solver.solve(self.lp, self.variables, [1, 1, 1, 1], self.overlay)
+        self.assertEqual(values[2], 1)
+        self.assertEqual(values[0]+values[1], 1)
+        self.assertEqual(values[3], 0)
+
+    def test_cuts_and_bounds(self):
+        print ("Testing overlay cuts and bounds are used by the solver")
+        self.overlay.add_cut('K pathway constraint 0', [0, 2], -1, 1)
+        values = self.solver.solve(self.lp, self.variables, [1, 1, 1, 1], self.overlay)
+        self.assertEqual(values[:3], [0, 1, 1])
+        self.overlay.set_bounds(1, 0, 0)
+        values = self.solver.solve(self.lp, self.variables, [1, 1, 1, 1], self.overlay)
+        self.assertEqual(values, [None]*4)
+
+    def test_warm_start(self):
+        print ("Testing previous solution can be used as MIP start and statistics are recorded")
+        values = self.solver.solve(self.lp, self.variables, [1, 1, 1, 1], self.overlay)
+        self.overlay.add_cut('K pathway constraint 0', [j for j in range(4) if values[j]], -1, 1)
+        values_new = self.solver.solve(self.lp, self.variables, [1, 1, 1, 1], self.overlay,
+                                       mip_start=values)
+        self.assertEqual(values_new[2], 1)
+        self.assertNotEqual(values_new[:2], values[:2])
+        self.assertIn('nodes', self.solver.stats)
+        self.assertIn('time', self.solver.stats)
+
+    def test_reversible_pairs(self):
+        print ("Testing only one direction of a reversible reaction can be used")
+        self.overlay.set_bounds(0, 1, 1)
+        self.overlay.set_bounds(1, 1, 1)
+        values = self.solver.solve(self.lp, self.variables, [1, 1, 1, 1], self.overlay)
+        self.assertEqual(values[:3], [1, 1, 1])
+        solver = solvers.get_solver('highs')
+        solver.load(self.lp, self.variables, solvers.cio.lp_to_matrix(self.lp, self.variables), [[0, 1]])
+        values = solver.solve(self.lp, self.variables, [1, 1, 1, 1], self.overlay)
+        self.assertEqual(values, [None]*4)
+
+    @unittest.skipUnless(solvers.HIGHSPY_AVAILABLE, 'highspy not available')
+    def test_cycle_cuts(self):
+        print ("Testing incumbents rejected by the callback are cut off and solved again")
+        def cycle_cuts(values):
+            if values[0] > 0.5:
+                self.overlay.add_cut('cycle constraint 1', [0], -1, 0)
+                return True
+            return False
+        values = self.solver.solve(self.lp, self.variables, [1, 2, 1, 1], self.overlay,
+                                   cycle_cuts=cycle_cuts)
+        self.assertEqual(values[:3], [0, 1, 1])
+        self.assertGreaterEqual(self.solver.stats['cycle_restarts'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
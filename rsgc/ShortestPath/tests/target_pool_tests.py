@@ -0,0 +1,42 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on worker pool for target jobs'
+
+import os
+import shutil
+import tempfile
+import unittest
+from rsgc.ShortestPath import target_pool as tp
+
+
+def write_job(job, directory):
+    '''Job writes a file with its name, job "fail" raises an error'''
+    if job == 'fail':
+        raise ValueError('job failed')
+    with open(os.path.join(directory, job), 'w') as fout:
+        fout.write(job)
+
+
+class TargetPoolTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+        shutil.rmtree(self.directory)
+
+    def test_all_jobs_run(self):
+        print ("Testing every job is run once and a failed job does not stop its worker")
+        jobs = ['target'+str(count) for count in range(10)]+['fail']
+        utilization, total = tp.run_target_pool(write_job, jobs, (self.directory,), 3)
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(jobs[:-1]))
+        self.assertEqual(len(utilization), 3)
+        self.assertEqual(sum(stats[1] for stats in utilization), len(jobs))
+        self.assertTrue(all(stats[2] <= total for stats in utilization))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+from __future__ import print_function
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Runs tests on timing history of targets'
+
+import os
+import shutil
+import tempfile
+import unittest
+from rsgc.ShortestPath import timing_history as th
+
+
+class TimingHistoryTests(unittest.TestCase):
+    def setUp(self):
+        """Initialize before every test."""
+        print ("Initializing tests")
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'timing_history.txt')
+
+    def tearDown(self):
+        """Clean up after each test."""
+        print ("Clearing out test suite")
+        shutil.rmtree(self.directory)
+
+    def test_record_and_average(self):
+        print ("Testing times of previous runs are averaged")
+        self.assertIsNone(th.TimingHistory(self.filename).get('/data/DB.db', 'org1', 'cpd1'))
+        th.record_time(self.filename, '/data/DB.db', 'org1', 'cpd1', 10)
+        th.record_time(self.filename, '/other/DB.db', 'org1', 'cpd1', 20)
+        history = th.TimingHistory(self.filename)
+        self.assertEqual(history.get('DB.db', 'org1', 'cpd1'), 15)
+        self.assertIsNone(history.get('DB.db', 'org2', 'cpd1'))
+
+    def test_compact(self):
+        print ("Testing history file keeps one line per target when it is read")
+        for count in range(3):
+            th.record_time(self.filename, 'DB.db', 'org1', 'cpd1', 8)
+        th.TimingHistory(self.filename)
+        with open(self.filename) as fin:
+            self.assertEqual(fin.read(), 'DB.db\torg1\tcpd1\t8.0\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+__author__ = 'Leanne Whitmore'
+__email__ = 'lwhitmo@sandia.gov'
+__description__ = 'Time to find all paths for targets in previous runs, used to run expensive targets first'
+
+import os
+
+HISTORY_WEIGHT = 0.5
+
+
+def _key(database, organism, target):
+    return (os.path.basename(database), organism, target)
+
+
+class TimingHistory(object):
+    """
+    Tab separated file (database, organism, target, seconds) that worker
+    processes append a line to for each target (record_time), times of a target are
+    averaged (weight HISTORY_WEIGHT for the newest time) when the file is read
+    """
+    def __init__(self, filename):
+        '''Initialize class'''
+        self.filename = filename
+        self.times = {}
+        lines = 0
+        if os.path.isfile(self.filename):
+            with open(self.filename) as fin:
+                for line in fin:
+                    larray = line.rstrip('\n').split('\t')
+                    if len(larray) != 4:
+                        continue
+                    try:
+                        seconds = float(larray[3])
+                    except ValueError:
+                        continue
+                    lines += 1
+                    key = tuple(larray[:3])
+                    if key in self.times:
+                        seconds = HISTORY_WEIGHT*seconds+(1-HISTORY_WEIGHT)*self.times[key]
+                    self.times[key] = seconds
+        if lines > 2*len(self.times):
+            self.compact()
+
+    def compact(self):
+        '''Rewrite file with one line per target'''
+        temp_filename = self.filename+'.tmp'
+        with open(temp_filename, 'w') as fout:
+            for key, seconds in self.times.items():
+                fout.write('\t'.join(key)+'\t'+str(seconds)+'\n')
+        os.replace(temp_filename, self.filename)
+
+    def get(self, database, organism, target):
+        '''Time of target in previous runs, None if target was not run before'''
+        return self.times.get(_key(database, organism, target))
+
+
+def record_time(filename, database, organism, target, seconds):
+    '''Add time of target to history file (one short line is appended so processes can write at the same time)'''
+    with open(filename, 'a') as fout:
+        fout.write('\t'.join(_key(database, organism, target))+'\t'+str(seconds)+'\n')
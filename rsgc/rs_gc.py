@@ -2,28 +2,31 @@ __author__ = 'Leanne Whitmore, Bernard Nguyen and Corey Hudson'
 __email__ = 'leanne382@gmail.com, bernguy@sandia.gov and cmhudso@sandia.gov'
 __description__ = 'Main code to RetSynth (RS)'
 
-from multiprocessing import Process
 import argparse
-from copy import deepcopy
 try:
     import pickle
 except:
     import cPickle as pickle
 import os
-import re
 import glob
 import time
 import shutil
 from timeit import default_timer as timer
 from rsgc.Parser import read_targets as rt
+from rsgc.Parser import read_startcompounds as rtsc
 from rsgc.Parser import generate_output as go
 from rsgc.Parser import structure_similarity as ss
 from rsgc.Parser import generate_html as gh
+from rsgc.Parser import run_journal as rj
 from rsgc.Visualization_chemdraw import reaction_files as rf
 from rsgc.Visualization_graphviz import SP_Graph_dot as spgd
 from rsgc.ShortestPath import extractinfo as ei
 from rsgc.ShortestPath import constraints as co
+from rsgc.ShortestPath import constraints_io as cio
 from rsgc.ShortestPath import integerprogram_pulp as ip_pulp
+from rsgc.ShortestPath import result_cache as rc
+from rsgc.ShortestPath import target_pool as tp
+from rsgc.ShortestPath import timing_history as th
 from rsgc.Database import initialize_database as init_db
 from rsgc.Database import build_kbase_db as bkdb
 from rsgc.Database import build_modelseed as bms
@@ -107,6 +110,11 @@ def parse_arguments():
                                                                 file for entire database',
                         required=False, type=str)    
 
+    parser.add_argument('-convert_dbc', '--convert_database_constraints', help='Convert pickled constraint \
+                                                                file given by --database_constraints to the binary \
+                                                                format, converted file is written to this path and used for the run',
+                        required=False, type=str)
+
 
 
     parser.add_argument('--inchidb', help='Retrieve InChis and use them as compound \
@@ -289,6 +297,27 @@ def parse_arguments():
                                                                 solver package)',
                         required=False, type=str, default=30)
 
+    parser.add_argument('-ttlim', '--target_time_limit', help='Time limit (minutes) for all solves of a target, \
+                                                                pathways identified before the limit are output and the \
+                                                                target is marked TIMEOUT (default: None, no limit)',
+                        required=False, type=str, default='None')
+
+    parser.add_argument('-solver', '--solver', help='Integer linear program solver backend, highs (default) keeps \
+                                                     the problem in memory and solves in process (requires scipy>=1.9) \
+                                                     glpk writes and solves an lp file with glpsol for every solve \
+                                                     (used when highs is not available)',
+                        required=False, type=str, choices=ip_pulp.solvers.SOLVERS, default='highs')
+
+    parser.add_argument('-search', '--search_mode', help='ilp (default) solves integer linear program, heuristic \
+                                                         uses a best-first search of the database network to quickly \
+                                                         find pathways (not guaranteed to be shortest), hybrid uses \
+                                                         the heuristic pathway as a starting solution for the ilp',
+                        required=False, type=str, choices=ip_pulp.gs.SEARCH_MODES, default='ilp')
+
+    parser.add_argument('-hk', '--heuristic_number_of_paths', help='Maximum number of pathways \
+                                                                    identified by heuristic search (default: 5)',
+                        required=False, type=int, default=5)
+
     parser.add_argument('-evalrxns', '--evaluate_reactions', help='Defines which type of reactions \
                                                                    (bio, chem, or all (default)) \
                                                                    to be evaluated in identifying \
@@ -308,6 +337,43 @@ def parse_arguments():
                                                  (True (default) or False)',
                         required=False, type=str, default='True')
 
+    parser.add_argument('-lzcy', '--lazy_cycles', help='Eliminate cycles during the solve with solver callbacks \
+                                                       instead of solving again for each cycle (True or False (default), \
+                                                       requires highs solver with highspy)',
+                        required=False, type=str, default='False')
+
+    parser.add_argument('-sthresh', '--solution_threshold', help='Maximum number of pathways identified \
+                                                                  for a target (default: 150)',
+                        required=False, type=int, default=150)
+
+    parser.add_argument('-cythresh', '--cycle_check_threshold', help='Maximum number of cycle checks \
+                                                                      for a target (default: 350)',
+                        required=False, type=int, default=350)
+
+    parser.add_argument('-rcache', '--result_cache', help='Directory of cache of pathways identified in previous runs, \
+                                                          targets solved before with the same database, organism and \
+                                                          parameters are not solved again (default: no cache)',
+                        required=False, type=str, default=None)
+
+    parser.add_argument('-rcache_size', '--result_cache_size', help='Maximum size (MB) of the result cache, least \
+                                                                    recently used pathways are removed (default: 500)',
+                        required=False, type=int, default=500)
+
+    parser.add_argument('-thist', '--timing_history', help='File of times to find all paths for targets in \
+                                                           previous runs, with more than one processor targets \
+                                                           expected to take longest are run first (default: no history)',
+                        required=False, type=str, default=None)
+
+    parser.add_argument('-oflush', '--output_flush_interval', help='Output files are written by one process that \
+                                                                    keeps them open, buffered records are written to \
+                                                                    the files every interval seconds (default: 5)',
+                        required=False, type=float, default=5)
+
+    parser.add_argument('-resume', '--resume', help='Resume the run in the output folder that stopped before \
+                                                     all targets were completed (parameters have to be the same), \
+                                                     completed targets are skipped and output files are appended to',
+                        required=False, action='store_true')
+
     parser.add_argument('-run_tan_thresh', '--run_tanimoto_threshold', help='Tells program to run tanimoto threshold analysis \
                                                                              identify strucutrally similar compounds in database to targets',
                          required=False, action='store_true')
@@ -363,6 +429,9 @@ def check_arguments(args):
                      without finding all multiple_solutions')
     if not args.targets:
         parser.error('Requires an input file of target compounds')
+    if args.convert_database_constraints and not args.database_constraints:
+        parser.error('--convert_database_constraints option requires that \
+                     --database_constraints option be also specified')
 
 def get_compartmentID_from_db(DB, compartment):
     '''Retrieves specified compartment ID'''
@@ -417,7 +486,8 @@ def read_in_and_generate_output_files(args, database):
         args.run_tanimoto_threshold = True
         verbose_print(args.verbose, 'STATUS:\tTarget not found in database. Trying to find structurally similar compounds')
     temp_imgs_PATH = get_new_temp_imgs_folder(args.output_path, 0)
-    OUTPUT = go.Output(DB, args.output_path, args.media_for_FBA, args.verbose, args.flux_balance_analysis, args.knockouts, args.timer_output, GC=args.gene_compatibility)
+    OUTPUT = go.Output(DB, args.output_path, args.media_for_FBA, args.verbose, args.flux_balance_analysis, args.knockouts, args.timer_output, GC=args.gene_compatibility,
+                       resume=args.resume)
     if args.run_tanimoto_threshold:
         verbose_print(args.verbose, 'STATUS:\t{} tanimoto threshold being used'.format(float(args.tanimoto_threshold)*100))
         cytosol_compartmentID = get_compartmentID_from_db(DB, 'cytosol')
@@ -510,7 +580,7 @@ def retrieve_database_info(args):
     allrxns = DB.get_all_reactions()
     return(allcpds, allrxns, database)
 
-def retrieve_constraints(args, allrxns, allcpds, ignore_reactions, database):
+def retrieve_constraints(args, allrxns, allcpds, ignore_reactions, database, output=None):
     '''
     Generates database constraints or uses previously generated
     database constraints (.constraints) file
@@ -518,56 +588,13 @@ def retrieve_constraints(args, allrxns, allcpds, ignore_reactions, database):
     DB = Q.Connector(database)
 
     def store_constraint_file(filename, LP):
-        '''store generated constraints into .constraints'''
-        
-        print ('STATUS:\tDumping newly generated variables...')
-
-        with open(filename, 'wb') as fout1:
-            
-            print ('STATUS:\tDumping LP structure...')
-            pickle.dump(LP.lp, fout1)
-            
-            print ('STATUS:\tDumping all compounds...')
-            pickle.dump(LP.allcpds, fout1)
-
-            print ('STATUS:\tDumping all reaction variables...')
-            pickle.dump(LP.variables, fout1)
-
-            print ('STATUS:\tDumping all reactions 1...')
-            pickle.dump(LP.allrxnsrev_dict_rev, fout1)
-  
-            print ('STATUS:\tDumping all reactions 2...')
-            pickle.dump(LP.allrxnsrev_dict, fout1)
-
-            print ('STATUS:\tDumping all reactions 3...')
-            pickle.dump(LP.allrxnsrev, fout1)
+        '''store generated constraints into .constraints (binary format)'''
+        cio.write_constraints_file(filename, LP.lp, LP.allcpds, LP.variables,
+                                   LP.allrxnsrev, LP.A_matrix, LP.pruned, LP.reversible_pairs)
 
     def unload_constraint_file(filename):
-        '''unload constraints from a .constraints'''
-
-        print ('STATUS:\tLoading pre-stored variables...')
-
-        with open(filename, 'rb') as fin1:
-            
-            print ('STATUS:\tLoading LP structure...')
-            lp = pickle.load(fin1)
-
-            print ('STATUS:\tLoading all compounds...')
-            allcompounds4matrix = pickle.load(fin1)
-
-            print ('STATUS:\tLoading all reaction variables...')
-            variables = pickle.load(fin1)
-
-            print ('STATUS:\tLoading all reactions 1...')
-            allrxnsrev_dict_rev = pickle.load(fin1)
-
-            print ('STATUS:\tLoading all reactions 2...')
-            allrxnsrev_dict = pickle.load(fin1)
-
-            print ('STATUS:\tLoading all reactions 3...')
-            allrxnsrev = pickle.load(fin1)
-
-        return (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev)
+        '''unload constraints from a .constraints (binary or pickled format)'''
+        return cio.load_constraints_file(filename, output)
 
     def load_preconstructed_constraint_files(media, mediatype, args):
         '''load defualt .constraint files'''
@@ -575,46 +602,49 @@ def retrieve_constraints(args, allrxns, allcpds, ignore_reactions, database):
         print ('WARNING:\tNo database constraint file specified using pre constructed database constraint file for database')
         if args.evaluate_reactions =='all':
 
-            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev) = unload_constraint_file(os.path.join(PATH, 'ConstructedDatabases', DEFAULT_DB_NAME + '.constraints'))
+            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs) = unload_constraint_file(os.path.join(PATH, 'ConstructedDatabases', DEFAULT_DB_NAME + '.constraints'))
             
-            return (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev)
+            return (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs)
 
         elif args.evaluate_reactions =='chem':
 
-            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev) = unload_constraint_file(os.path.join(PATH, 'ConstructedDatabases', DEFAULT_DB_NAME + '_chem.constraints'))
+            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs) = unload_constraint_file(os.path.join(PATH, 'ConstructedDatabases', DEFAULT_DB_NAME + '_chem.constraints'))
             
-            return (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev)  
+            return (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs)  
 
         elif args.evaluate_reactions =='bio':
 
-            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev) = unload_constraint_file(os.path.join(PATH, 'ConstructedDatabases', DEFAULT_DB_NAME + '_bio.constraints'))
+            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs) = unload_constraint_file(os.path.join(PATH, 'ConstructedDatabases', DEFAULT_DB_NAME + '_bio.constraints'))
             
-            return (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev)  
+            return (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs)  
 
 
 
     ###RETRIEVE SPECIFIED BY USER CONSTRAINTS###
     if args.generate_database_constraints:
-        LP = co.ConstructInitialLP(allrxns, allcpds, DB, ignore_reactions)
+        LP = co.ConstructInitialLP(allrxns, allcpds, DB, ignore_reactions,
+                                   presolve_cpds=DB.get_all_model_compounds())
         store_constraint_file(args.generate_database_constraints, LP)
 
     elif args.database_constraints:
-        (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev) = unload_constraint_file(args.database_constraints) 
+        (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs) = unload_constraint_file(args.database_constraints) 
         LP = co.ConstructInitialLP(allrxns, allcompounds4matrix, DB,
                                    ignore_reactions, lp, variables, allrxnsrev_dict_rev,
-                                   allrxnsrev_dict, allrxnsrev)
+                                   allrxnsrev_dict, allrxnsrev, A_matrix, pruned=pruned,
+                                   reversible_pairs=reversible_pairs)
     else:
         if args.media_for_FBA=='Carbon-D-Glucose':
             
-            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev) = load_preconstructed_constraint_files(args.media_for_FBA, 'GL', args)
+            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs) = load_preconstructed_constraint_files(args.media_for_FBA, 'GL', args)
         
         elif args.media_for_FBA=='Complete':
             
-            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev) = load_preconstructed_constraint_files(args.media_for_FBA, 'CP', args)
+            (lp, allcompounds4matrix, variables, allrxnsrev_dict_rev, allrxnsrev_dict, allrxnsrev, A_matrix, pruned, reversible_pairs) = load_preconstructed_constraint_files(args.media_for_FBA, 'CP', args)
         
             LP = co.ConstructInitialLP(allrxns, allcompounds4matrix, DB,
                                        ignore_reactions, lp, variables, allrxnsrev_dict_rev,
-                                       allrxnsrev_dict, allrxnsrev)
+                                       allrxnsrev_dict, allrxnsrev, A_matrix, pruned=pruned,
+                                       reversible_pairs=reversible_pairs)
         else: 
             print ('ERROR:\tNo identified pre constraint file...stopping run')
 
@@ -625,17 +655,54 @@ def construct_and_run_integerprogram(args, targets, output, database):
     Constructs ILP and solves it identifying shortest path to the target
     '''
     DB = Q.Connector(database)
+    if args.result_cache:
+        result_cache = rc.PathwayCache(args.result_cache, args.result_cache_size)
+    else:
+        result_cache = None
     if args.timer_output:
         IP = ip_pulp.IntergerProgram(DB, args.limit_reactions,
                                     args.limit_cycles, args.k_number_of_paths,
-                                    args.cycles, args.verbose, args.solver_time_limit, output)
+                                    args.cycles, args.verbose, args.solver_time_limit, output,
+                                    solver=args.solver, search_mode=args.search_mode,
+                                    heuristic_paths=args.heuristic_number_of_paths,
+                                    lazy_cycles=args.lazy_cycles,
+                                    solution_threshold=args.solution_threshold,
+                                    cycle_check_threshold=args.cycle_check_threshold,
+                                    result_cache=result_cache,
+                                    target_time_limit=args.target_time_limit)
     else:
         IP = ip_pulp.IntergerProgram(DB, args.limit_reactions,
                                      args.limit_cycles, args.k_number_of_paths,
-                                     args.cycles, args.verbose, args.solver_time_limit, args.timer_output)
+                                     args.cycles, args.verbose, args.solver_time_limit, args.timer_output,
+                                     solver=args.solver, search_mode=args.search_mode,
+                                     heuristic_paths=args.heuristic_number_of_paths,
+                                     lazy_cycles=args.lazy_cycles,
+                                     solution_threshold=args.solution_threshold,
+                                     cycle_check_threshold=args.cycle_check_threshold,
+                                     result_cache=result_cache,
+                                     target_time_limit=args.target_time_limit)
     
     return (IP)
 
+def prepare_run_journal(args, parameters):
+    '''
+    Write manifest of a new run or check the manifest of the run that is resumed and
+    remove output written after its last checkpoint, returns completed (target, organism)
+    '''
+    if not args.resume:
+        rj.write_manifest(args.output_path, parameters)
+        return set()
+    manifest = rj.read_manifest(args.output_path)
+    if manifest is None:
+        raise ValueError('ERROR:\tNo run to resume in {}'.format(args.output_path))
+    changed = sorted(key for key in set(manifest) | set(parameters) if manifest.get(key) != parameters.get(key))
+    if changed:
+        raise ValueError('ERROR:\tParameters are different from the run that is resumed: {}'.format(', '.join(changed)))
+    completed, sizes = rj.read_journal(args.output_path)
+    rj.truncate_outputs(args.output_path, sizes)
+    print ('STATUS:\tResuming run, {} targets were completed'.format(len(completed)))
+    return completed
+
 def _specific_target(target_id):
     '''Determines if there was a specified organism'''
     if target_id in ['', 'NA', 'N/A']:
@@ -643,9 +710,139 @@ def _specific_target(target_id):
     else:
         return True
 
+def group_targets_by_organism(targets):
+    '''
+    Order targets so targets of the same organism are run one after another
+    (organisms keep the order they first appear in the targets file)
+    '''
+    organism_order = {}
+    for target_info in targets:
+        organism_order.setdefault(target_info[2], len(organism_order))
+    return sorted(targets, key=lambda target_info: organism_order[target_info[2]])
+
+def organism_compounds(organism, DB, args):
+    '''Compounds and reactions of the target organism (start compounds and no reactions with --start_compounds)'''
+    if args.start_compounds:
+        return (rtsc.readfile_startcompounds(args.start_compounds), [])
+    return (DB.get_compounds_in_model(organism), DB.get_reactions_in_model(organism))
+
+def load_organism_profiles(targets, IP, database, args):
+    '''
+    Compute organism bound profiles before targets are run in separate
+    processes so each process starts with them
+    '''
+    DB = Q.Connector(database)
+    for organism in set(target_info[2] for target_info in targets):
+        if args.start_compounds or _specific_target(organism):
+            IP.organism_profile(*organism_compounds(organism, DB, args))
+
+def jobs_with_organism_compounds(jobs, database, args):
+    '''
+    Yields each job with compounds and reactions of its organism (None for targets without
+    organism), jobs are grouped by organism so compounds are retrieved once per organism
+    '''
+    DB = Q.Connector(database)
+    organism = None
+    for job in jobs:
+        target_info = job[0]
+        if not _specific_target(target_info[2]) and not args.start_compounds:
+            yield job, None, None
+            continue
+        if target_info[2] != organism:
+            organism = target_info[2]
+            incpds_active, inrxns_active = organism_compounds(organism, DB, args)
+        yield job, incpds_active, inrxns_active
+
+def producible_jobs(jobs, IP, database, args, output):
+    '''
+    Pre-filter targets with the network scope of the organism (compounds that can be
+    produced from the organism compounds, computed once per organism), targets that
+    can not be produced are output with a reason code without solving, returns
+    jobs that need to be solved
+    '''
+    start = timer()
+    scheduled = []
+    for job, incpds_active, inrxns_active in jobs_with_organism_compounds(jobs, database, args):
+        target_info = job[0]
+        if incpds_active is None:
+            scheduled.append(job)
+            continue
+        reason = IP.target_status(incpds_active, inrxns_active, target_info[0])
+        if reason is None or target_info[0] in incpds_active:
+            scheduled.append(job)
+        else:
+            for member_info in job:
+                output.output_shortest_paths(member_info, [], reason)
+                output.output_target_done(member_info)
+    end = timer()
+    verbose_print(args.verbose, 'STATUS:\t{} of {} target and metabolic cluster combinations can not be produced from organism compounds therefore not solving them'.format(len(jobs)-len(scheduled), len(jobs)))
+    if args.timer_output:
+        output.output_timer('Producibility pre-filter ({} of {} not producible)\t{}\t{}\n'.format(len(jobs)-len(scheduled), len(jobs), (end-start), (end-start)/60))
+    return scheduled
+
+def cluster_targets(targets, database, args):
+    '''
+    Group targets by metabolic cluster (organisms with the exact same compounds
+    and reactions), each job is a list of targets with the same compound whose
+    organisms are in the same cluster, only the first target is solved
+    '''
+    organism_cluster = {}
+    if not args.start_compounds:
+        DB = Q.Connector(database)
+        clusters = DB.get_uniq_metabolic_clusters()
+        if clusters != 'None':
+            for cluster in clusters:
+                for organism in DB.get_models_from_cluster(cluster):
+                    organism_cluster[organism] = cluster
+    jobs = []
+    job_index = {}
+    for target_info in targets:
+        if not _specific_target(target_info[2]) or target_info[2] not in organism_cluster:
+            jobs.append([target_info])
+            continue
+        key = (target_info[0], organism_cluster[target_info[2]])
+        if key in job_index:
+            jobs[job_index[key]].append(target_info)
+        else:
+            job_index[key] = len(jobs)
+            jobs.append([target_info])
+    verbose_print(args.verbose, 'STATUS:\t{} targets, solving {} target and metabolic cluster combinations'.format(len(targets), len(jobs)))
+    return jobs
+
+def order_jobs_by_expected_time(jobs, IP, database, args, output):
+    '''
+    Order jobs so jobs expected to take longest are run first, the expected time is the
+    time of the target in previous runs (--timing_history) or the size of the subnetwork
+    reachability pruning keeps for the target times the median time per reaction variable
+    of targets in the history (organism reaction count breaks ties)
+    '''
+    start = timer()
+    history = th.TimingHistory(args.timing_history) if args.timing_history else None
+    features = []
+    for job, incpds_active, inrxns_active in jobs_with_organism_compounds(jobs, database, args):
+        target_info = job[0]
+        if incpds_active is None:
+            features.append((0, 0, None))
+            continue
+        seconds = history.get(database, target_info[2], target_info[0]) if history else None
+        features.append((IP.subnetwork_size(incpds_active, target_info[0]), len(inrxns_active), seconds))
+    rates = sorted(seconds/size for size, count, seconds in features if seconds is not None and size)
+    rate = rates[len(rates)//2] if rates else 1
+    expected = [seconds if seconds is not None else rate*size for size, count, seconds in features]
+    order = sorted(range(len(jobs)), key=lambda index: (-expected[index], -features[index][1]))
+    end = timer()
+    verbose_print(args.verbose, 'STATUS:\tOrdered {} jobs by expected time ({} with time of previous runs)'.format(len(jobs), sum(1 for feature in features if feature[2] is not None)))
+    if args.timer_output:
+        output.output_timer('Ordering jobs by expected time\t{}\t{}\n'.format((end-start), (end-start)/60))
+    return [jobs[index] for index in order]
+
 def retrieve_shortestpath(target_info, IP, LP, database, args, output, temp_imgs_PATH, orgs_gbs=False,
-                          gbs_orgs=False, RGC=False, keggorganisms_ids=False, output_genecompdb=False):
-    '''Retrieve the shortest path for target organism'''
+                          gbs_orgs=False, RGC=False, keggorganisms_ids=False, output_genecompdb=False,
+                          cluster_members=()):
+    '''
+    Retrieve the shortest path for target organism, pathways are also output for
+    cluster_members (same target compound in organisms of the same metabolic cluster)
+    '''
     start = timer()
     DB = Q.Connector(database)
     verbose_print(args.verbose, "\nSTATUS:\tgetting path for {}".format(target_info))
@@ -656,82 +853,101 @@ def retrieve_shortestpath(target_info, IP, LP, database, args, output, temp_imgs
     if not _specific_target(target_info[2]) and not args.start_compounds:
         print ('WARNING:\tNo organism given therefore target {} compound will be skipped ... '.format(target_info[0]))
     else:
-        if args.start_compounds:
-            incpds_active = rtsc.readfile_startcompounds(args.start_compounds)
-            inrxns_active = []
-        else:
-            incpds_active = DB.get_compounds_in_model(target_info[2])
-            inrxns_active = DB.get_reactions_in_model(target_info[2])
+        incpds_active, inrxns_active = organism_compounds(target_info[2], DB, args)
 
         if target_info[0] in incpds_active: #Check if compound exists in organism
-            output.output_compound_natively_present_in_target_organism(target_info)
+            for member_info in [target_info]+list(cluster_members):
+                output.output_compound_natively_present_in_target_organism(member_info)
         else:
-            optimal_pathways = IP.run_glpk(LP, incpds_active, inrxns_active, target_info[0],
-                                           multiplesolutions=args.multiple_solutions)
-            if optimal_pathways:                    
-                uniq_externalrxns = []
-                for path in optimal_pathways:
-                    path_org = []
-                    for rxn in path:
-                        rxn = re.sub('_F$', '', rxn)
-                        rxn = re.sub('_R$', '', rxn)
-                        path_org.append(rxn)
-                    uniq_externalrxns.append(list(set(path_org) - set(inrxns_active)))
-                ex_info = ei.Extract_Information(optimal_pathways, incpds_active, inrxns_active, DB)
-                output.output_shortest_paths(target_info, ex_info.temp_rxns)
-
-
-                R = rf.ReactionFiles(args.output_path, DB, ex_info.temp_rxns,
-                                 target_info[0], target_info[2], incpds_active)
-                output.output_raw_solutions(target_info[0], target_info[2], R.ordered_paths,
-                                            ex_info.temp_rxns, ex_info.temp_external, incpds_active)
-
-                if args.flux_balance_analysis:
-                    opt_fba = run_flux_balance_analysis(target_info, ex_info,
-                                                        incpds_active, inrxns_active,
-                                                        args.media_for_FBA, args.knockouts,
-                                                        output, DB, args.verbose)
-
-                    R.generate_cdxml_files(RP=None, ranktype=None, fba_fluxes=opt_fba.fbasol.fluxes, show_rxn_info=args.show_rxn_info)
-                    
-                    if args.figures_graphviz:
-
-                        G = spgd.GraphDot(DB, args.output_path, incpds_active, inrxns_active,
-                                          temp_imgs_PATH, opt_fba.fbasol.fluxes)
-                        G.sc_graph(target_info[0], target_info[2], ex_info.temp_rxns, _images)
-
-                elif not args.flux_balance_analysis:
-                    R.generate_cdxml_files(RP=None, ranktype=None, fba_fluxes=None, show_rxn_info=args.show_rxn_info)
-
-                    if args.figures_graphviz:
-                        G = spgd.GraphDot(DB, args.output_path, incpds_active, inrxns_active, temp_imgs_PATH)
-                        G.sc_graph(target_info[0], target_info[2], ex_info.temp_rxns, _images)
-
-                if args.gene_compatibility:
-                    verbose_print(args.verbose, 'STATUS:\tOptimizing gene sequences for optimal pathway reaction enzymes...')
-                    enzymes = list(R.enzyme_set)
-                    if len(enzymes) != 0:
-                        output.generate_gc_directory()
-                        for enzyme in enzymes:
-                            verbose_print(args.verbose,'\nSTATUS:\tOptimizing gene compatibility for EC: %s' % enzyme)
-                            if os.path.isfile(os.path.join(output.GC_output_path, "geneseqs_{}_{}.txt".format(enzyme, target_info[2]))):
-                                print ("STATUS: already have sequence information for {} in {}".format(enzyme, target_info[2]))
-                            else:
-                                gce(enzyme, orgs_gbs, gbs_orgs, target_info[2], RGC, keggorganisms_ids, output_genecompdb,
-                                    output_directory=output.GC_output_path, user_cai_table=args.user_cai_table,
-                                    cai_optimal_threshold=args.cai_optimal_threshold)
-                    else:
-                        verbose_print(args.verbose, 'STATUS:')
-
+            if args.search_mode == 'heuristic':
+                optimal_pathways = IP.run_heuristic(LP, incpds_active, inrxns_active, target_info[0])
             else:
-                output.output_shortest_paths(target_info, [])
-                if args.flux_balance_analysis:
-                    verbose_print(args.verbose, 'WARNING:\tNo optimal path for %s in species %s therefore no flux balance will be performed' % (target_info[0], target_info[2]))
+                optimal_pathways = IP.iter_glpk(LP, incpds_active, inrxns_active, target_info[0],
+                                                multiplesolutions=args.multiple_solutions)
+            '''Pathways are output as they are identified (targets run in parallel output all pathways at once)'''
+            stream = args.processors == 1
+            ex_info = ei.Extract_Information([], incpds_active, inrxns_active, DB)
+            for count, path in enumerate(optimal_pathways):
+                os_dict = ex_info.add_pathway(count+1, path)
+                if stream and os_dict is not None:
+                    if len(ex_info.temp_rxns) == 1:
+                        output.output_shortest_paths_header(target_info)
+                    output.output_shortest_path_solution(count+1, os_dict)
+            for member_info in [target_info]+list(cluster_members):
+                output_pathways(member_info, ex_info, incpds_active, inrxns_active, DB, args, output,
+                                temp_imgs_PATH, _images, stream and member_info is target_info, IP.no_path_reason, IP.timed_out,
+                                orgs_gbs, gbs_orgs, RGC, keggorganisms_ids, output_genecompdb)
     end = timer()
     if args.timer_output:
        output.output_timer('Time to find all paths for {}\t{}\t{}\n'.format(target_info[0], (end-start), (end-start)/60))
+    if args.timing_history:
+        th.record_time(args.timing_history, database, target_info[2], target_info[0], end-start)
+    for member_info in [target_info]+list(cluster_members):
+        output.output_target_done(member_info)
     verbose_print(args.verbose, "\nINFO:\tTime to find all paths for "+str(target_info[0])+' '+str(end - start))
 
+def run_target_job(job, IP, LP, database, args, output, temp_imgs_PATH, orgs_gbs,
+                   gbs_orgs, RGC, keggorganisms_ids, output_genecompdb):
+    '''Retrieve shortest paths for a job of the target pool (first target of a metabolic cluster and its members)'''
+    retrieve_shortestpath(job[0], IP, LP, database, args, output, temp_imgs_PATH, orgs_gbs,
+                          gbs_orgs, RGC, keggorganisms_ids, output_genecompdb, job[1:])
+
+def output_pathways(target_info, ex_info, incpds_active, inrxns_active, DB, args, output, temp_imgs_PATH,
+                    _images, streamed, no_path_reason, timed_out, orgs_gbs, gbs_orgs, RGC, keggorganisms_ids, output_genecompdb):
+    '''Output pathways of target organism (streamed pathways are already in optimal_pathways.txt)'''
+    if ex_info.temp_rxns:
+        if not streamed:
+            output.output_shortest_paths(target_info, ex_info.temp_rxns)
+        if timed_out:
+            output.output_target_timeout(target_info, len(ex_info.temp_rxns))
+
+        R = rf.ReactionFiles(args.output_path, DB, ex_info.temp_rxns,
+                         target_info[0], target_info[2], incpds_active)
+        output.output_raw_solutions(target_info[0], target_info[2], R.ordered_paths,
+                                    ex_info.temp_rxns, ex_info.temp_external, incpds_active)
+
+        if args.flux_balance_analysis:
+            opt_fba = run_flux_balance_analysis(target_info, ex_info,
+                                                incpds_active, inrxns_active,
+                                                args.media_for_FBA, args.knockouts,
+                                                output, DB, args.verbose)
+
+            R.generate_cdxml_files(RP=None, ranktype=None, fba_fluxes=opt_fba.fbasol.fluxes, show_rxn_info=args.show_rxn_info)
+
+            if args.figures_graphviz:
+
+                G = spgd.GraphDot(DB, args.output_path, incpds_active, inrxns_active,
+                                  temp_imgs_PATH, opt_fba.fbasol.fluxes)
+                G.sc_graph(target_info[0], target_info[2], ex_info.temp_rxns, _images)
+
+        elif not args.flux_balance_analysis:
+            R.generate_cdxml_files(RP=None, ranktype=None, fba_fluxes=None, show_rxn_info=args.show_rxn_info)
+
+            if args.figures_graphviz:
+                G = spgd.GraphDot(DB, args.output_path, incpds_active, inrxns_active, temp_imgs_PATH)
+                G.sc_graph(target_info[0], target_info[2], ex_info.temp_rxns, _images)
+
+        if args.gene_compatibility:
+            verbose_print(args.verbose, 'STATUS:\tOptimizing gene sequences for optimal pathway reaction enzymes...')
+            enzymes = list(R.enzyme_set)
+            if len(enzymes) != 0:
+                output.generate_gc_directory()
+                for enzyme in enzymes:
+                    verbose_print(args.verbose,'\nSTATUS:\tOptimizing gene compatibility for EC: %s' % enzyme)
+                    if os.path.isfile(os.path.join(output.GC_output_path, "geneseqs_{}_{}.txt".format(enzyme, target_info[2]))):
+                        print ("STATUS: already have sequence information for {} in {}".format(enzyme, target_info[2]))
+                    else:
+                        gce(enzyme, orgs_gbs, gbs_orgs, target_info[2], RGC, keggorganisms_ids, output_genecompdb,
+                            output_directory=output.GC_output_path, user_cai_table=args.user_cai_table,
+                            cai_optimal_threshold=args.cai_optimal_threshold)
+            else:
+                verbose_print(args.verbose, 'STATUS:')
+
+    else:
+        output.output_shortest_paths(target_info, [], no_path_reason)
+        if args.flux_balance_analysis:
+            verbose_print(args.verbose, 'WARNING:\tNo optimal path for %s in species %s therefore no flux balance will be performed' % (target_info[0], target_info[2]))
+
 def run_flux_balance_analysis(target_info, ex_info, incpds_active,
                               inrxns, media, ko,
                               output, DB, verbose):
@@ -761,10 +977,16 @@ def main():
     '''Main class'''
     args = parse_arguments()
     check_arguments(args)
+    parameters = rj.manifest_parameters(args)
+
+    if args.convert_database_constraints:
+        cio.convert_constraints_file(args.database_constraints, args.convert_database_constraints)
+        args.database_constraints = args.convert_database_constraints
 
     verbose_print(args.verbose,'\nSTATUS:\tRetrieving database information...')
     all_db_compounds, all_db_reactions, database = retrieve_database_info(args)
     targets, ignore_reactions, output, temp_imgs_PATH = read_in_and_generate_output_files(args, database)
+    completed = prepare_run_journal(args, parameters)
     if args.gene_compatibility:
         orgs_gbs, gbs_orgs, R, keggorganisms_ids, output_genecompdb = gc(database, 
                                                                          output_directory=args.output_path,
@@ -776,41 +998,38 @@ def main():
         keggorganisms_ids=False
         output_genecompdb=False
 
-    args_targets = [targets[i:i+args.processors]
-            for i in range(0, len(targets), args.processors)]
-
     if targets:
+        targets = group_targets_by_organism(targets)
         verbose_print(args.verbose,'\nSTATUS:\tRetrieving reaction constraints...')
-        LP = retrieve_constraints(args, all_db_reactions, all_db_compounds, ignore_reactions, database)
+        LP = retrieve_constraints(args, all_db_reactions, all_db_compounds, ignore_reactions, database,
+                                  output if args.timer_output else None)
+        if args.start_compounds:
+            LP.restore_pruned(rtsc.readfile_startcompounds(args.start_compounds))
 
         verbose_print(args.verbose,'\nSTATUS:\tConstructing and running linear integer program...')
         IP = construct_and_run_integerprogram(args, targets, output, database)
-        
-        if args.processors > 1:
-            args_targets = [targets[i:i+args.processors]
-                    for i in range(0, len(targets), args.processors)]
-
-            for targets_sub in args_targets:
-                processes = []
-                for target in targets_sub:
-                    LPc=deepcopy(LP)
-                    processes.append(Process(target=retrieve_shortestpath, args=(target, IP, LPc, database, args,
-                                                                                 output, temp_imgs_PATH, orgs_gbs,
-                                                                                 gbs_orgs, R, keggorganisms_ids,
-                                                                                 output_genecompdb)))
-                    # retrieve_shortestpath(target, IP, LPc, database, args, output, temp_imgs_PATH)
-                for p in processes:
-                    p.start()
-                for p in processes:
-                    p.join()
-
-        elif args.processors == 1:
-            for target in targets:
-                LPc = deepcopy(LP)
-                retrieve_shortestpath(target, IP, LPc, database, args,
-                                       output, temp_imgs_PATH, orgs_gbs,
-                                       gbs_orgs, R, keggorganisms_ids,
-                                       output_genecompdb)
+        IP.load(LP)
+
+        output.start_writer(args.output_flush_interval, journal=True)
+        try:
+            remaining_targets = [target_info for target_info in targets if rj.target_key(target_info) not in completed]
+            jobs = producible_jobs(cluster_targets(remaining_targets, database, args), IP, database, args, output)
+            if args.processors > 1:
+                jobs = order_jobs_by_expected_time(jobs, IP, database, args, output)
+                load_organism_profiles([job[0] for job in jobs[:args.processors]], IP, database, args)
+                tp.run_target_pool(run_target_job, jobs, (IP, LP, database, args, output, temp_imgs_PATH,
+                                                          orgs_gbs, gbs_orgs, R, keggorganisms_ids,
+                                                          output_genecompdb),
+                                   args.processors, args.verbose, output if args.timer_output else None)
+
+            elif args.processors == 1:
+                for job in jobs:
+                    retrieve_shortestpath(job[0], IP, LP, database, args,
+                                           output, temp_imgs_PATH, orgs_gbs,
+                                           gbs_orgs, R, keggorganisms_ids,
+                                           output_genecompdb, job[1:])
+        finally:
+            output.stop_writer()
 
         if args.output_xlsx_format:
             output.convert_output_2_xlsx()